@@ -9,4 +9,10 @@ if not SECRET_KEY:
 #algorithm to sign token
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRES_MINUTES = 30
-REFRESH_TOKEN_EXPIRES_MINUTES = 15 * 24 * 60  # 15 days
\ No newline at end of file
+REFRESH_TOKEN_EXPIRES_MINUTES = 15 * 24 * 60  # 15 days
+# how often each worker reloads revoked JTIs
+REVOCATION_SYNC_SECONDS = 10
+# how often expired blacklist rows are deleted (a scheduled job, once per deployment)
+REVOCATION_PURGE_SECONDS = 300
+# access tokens kept verified in memory per worker (0 disables the cache)
+VERIFIED_TOKEN_CACHE_SIZE = 4096
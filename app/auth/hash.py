@@ -1,11 +1,120 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.exceptions import ServiceUnavailableException
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Passwords per pool task in a batch: a single login queued behind a batch
+# waits for at most this many hashes.
+BATCH_CHUNK_SIZE = 4
+
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a process pool so a burst of logins never stalls the event loop.
+
+    At most ``max_pending`` hashes may be running or queued at once; beyond that
+    callers get an immediate 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 8
+        # Batch tasks running at once, across every batch: one worker always
+        # stays free for single logins (unless there is only one).
+        self._batch_slots = asyncio.Semaphore(max(1, self.workers - 1))
+        self._executor: ProcessPoolExecutor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs an event loop and
+            # threads is unsafe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise ServiceUnavailableException(detail="Too many password operations, retry shortly")
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.latency_seconds_total += elapsed
+            self.latency_seconds_max = max(self.latency_seconds_max, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch in input order, ``BATCH_CHUNK_SIZE`` passwords per pool task.
+
+        At most ``workers - 1`` batch tasks are submitted at once, so a single
+        login or registration always finds a free worker. With a one-worker
+        pool it queues behind at most one small chunk, never the whole batch.
+        """
+        async def run(chunk: list[str]) -> list[str]:
+            async with self._batch_slots:
+                return await self._run(get_password_hashes, chunk)
+
+        chunks = [passwords[start:start + BATCH_CHUNK_SIZE] for start in range(0, len(passwords), BATCH_CHUNK_SIZE)]
+        results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_seconds_total": self.latency_seconds_total,
+            "latency_seconds_max": self.latency_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
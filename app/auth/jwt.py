@@ -1,15 +1,20 @@
+import hashlib
 import uuid
 import sys
+import time
+from collections import OrderedDict
 from datetime import timedelta, datetime, timezone
+from types import MappingProxyType
+from typing import Mapping
 
 from jose import jwt, JWTError
 from fastapi import Response
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import config
+from app import metrics
+from .revocation import revoked_tokens
 from app.schemas import User, TokenPair, JwtTokenSchema
 from app.exceptions import AuthFailedException
-from app.models import BlackListToken
 
 
 REFRESH_COOKIE_NAME = "refresh"
@@ -64,15 +69,68 @@ def create_token_pair(user: User) -> TokenPair:
     )
 
 
-async def decode_access_token(token: str, db: AsyncSession):
-    try:
-        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
-        black_list_token = await BlackListToken.find_by_id(db=db, id=payload[JTI])
-        if black_list_token:
-            raise JWTError("Token is blacklisted")
-    except JWTError:
+class VerifiedTokenCache:
+    """
+    LRU of access tokens whose signature and expiry already checked out.
+
+    Entries are keyed by a digest of the token, so raw tokens are not kept, and
+    each entry is dropped at the token's ``exp``. Cached claims are read-only
+    because every request presenting the token shares them. Revocation is not
+    cached: :func:`decode_access_token` checks it on every use.
+    """
+
+    def __init__(self, max_entries: int = config.VERIFIED_TOKEN_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[Mapping, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Mapping | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            claims, expire = entry
+            if expire > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: bytes, claims: Mapping) -> None:
+        if self.max_entries <= 0 or EXP not in claims:
+            return
+        self._entries[key] = (claims, float(claims[EXP]))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+async def decode_access_token(token: str) -> Mapping:
+    key = verified_tokens.key(token)
+    payload = verified_tokens.get(key)
+    if payload is None:
+        try:
+            payload = MappingProxyType(jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM]))
+        except JWTError:
+            raise AuthFailedException()
+        verified_tokens.set(key, payload)
+
+    if revoked_tokens.is_revoked(payload[JTI]):
         raise AuthFailedException()
-
     return payload
 
 
@@ -86,3 +144,12 @@ def refresh_token_state(token: str):
     return {"token": _create_access_token(payload=payload).token}
 
 
+
+
+def _verified_token_metrics():
+    yield from metrics.gauge("auth_verified_tokens", "Access tokens held verified in memory.", len(verified_tokens))
+    yield from metrics.gauge("auth_verified_token_hits_total", "Requests that skipped JWT verification.", verified_tokens.hits, "counter")
+    yield from metrics.gauge("auth_verified_token_misses_total", "Requests that ran JWT verification.", verified_tokens.misses, "counter")
+
+
+metrics.register_collector(_verified_token_metrics)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import config
+from app import jobs
+from app.database import DATABASE_ERRORS, SessionLocal
+from app.models import BlackListToken
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_timestamp(value: datetime) -> float:
+    # blacklisttokens.expire is stored as a naive UTC timestamp.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevokedTokenStore:
+    """
+    Per-process index of revoked token ids (JTIs), each kept until its ``exp``.
+
+    Logouts on this worker are visible immediately. Logouts on other workers
+    are picked up by :meth:`sync`, so they take effect here within
+    ``config.REVOCATION_SYNC_SECONDS``.
+    """
+
+    def __init__(self) -> None:
+        self._expires: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, jti: str, expire: datetime | float) -> None:
+        if isinstance(expire, datetime):
+            expire = _utc_timestamp(expire)
+        self._expires[str(jti)] = expire
+
+    def is_revoked(self, jti: str) -> bool:
+        expire = self._expires.get(str(jti))
+        if expire is None:
+            return False
+        if expire <= time.time():
+            # The token is expired anyway; jwt.decode rejects it on its own.
+            self._expires.pop(str(jti), None)
+            return False
+        return True
+
+    def prune(self) -> None:
+        now = time.time()
+        self._expires = {jti: exp for jti, exp in self._expires.items() if exp > now}
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Merge every still-valid row of ``blacklisttokens`` into the index."""
+        result = await db.execute(
+            select(BlackListToken.id, BlackListToken.expire).where(
+                BlackListToken.expire > datetime.utcnow()
+            )
+        )
+        for jti, expire in result:
+            self.add(jti, expire)
+        self.prune()
+
+
+revoked_tokens = RevokedTokenStore()
+
+
+async def purge_expired_tokens(db: AsyncSession) -> int:
+    """Bulk-delete blacklist rows whose token has expired; returns the row count."""
+    result = await db.execute(
+        delete(BlackListToken).where(BlackListToken.expire <= datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount
+
+
+@jobs.handler("auth.purge_expired_tokens")
+async def purge_expired_tokens_job(payload: dict) -> dict:
+    async with SessionLocal() as db:
+        return {"purged": await purge_expired_tokens(db)}
+
+
+# One purge per interval for the whole deployment rather than one per worker.
+jobs.schedule("auth.purge_expired_tokens", config.REVOCATION_PURGE_SECONDS)
+
+
+async def load_revoked_tokens(store: RevokedTokenStore = revoked_tokens) -> None:
+    async with SessionLocal() as db:
+        await store.sync(db)
+
+
+async def maintain_revoked_tokens(
+    store: RevokedTokenStore = revoked_tokens,
+    interval: float = config.REVOCATION_SYNC_SECONDS,
+) -> None:
+    """Background loop: refresh the index from Postgres (purging is a scheduled job)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await store.sync(db)
+        except DATABASE_ERRORS:
+            logger.exception("Revoked token sync failed")
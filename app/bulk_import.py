@@ -0,0 +1,180 @@
+"""
+Streaming bulk import of programs from CSV or NDJSON.
+
+The upload is read chunk by chunk and parsed into batches of ``BATCH_SIZE``
+rows. Each row is validated against ``schemas.ScholarshipCreate``, and every
+valid row of a batch goes to Postgres in one ``COPY``. Memory therefore stays
+bounded by one batch, whatever the upload size. Ids are generated here, so
+``COPY`` needs no ``RETURNING``.
+
+All valid rows commit together at the end. Invalid rows are skipped and
+listed in the report with their row number (1 = first data row).
+"""
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Iterable, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.exceptions import BadRequestException, NotFoundException
+
+BATCH_SIZE = 2000
+# A single line longer than this is rejected rather than buffered.
+MAX_RECORD_BYTES = 64 * 1024
+# The report lists at most this many failed rows; the count covers all of them.
+MAX_REPORTED_ERRORS = 1000
+
+COLUMNS = (
+    "id", "title", "description", "location", "application_link", "field_of_study",
+    "funding_type", "funding_amount", "duration", "status", "partner_id",
+)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+def detect_format(content_type: str | None) -> ImportFormat:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    raise BadRequestException(detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(pending) > MAX_RECORD_BYTES:
+            raise BadRequestException(detail=f"A line exceeds {MAX_RECORD_BYTES} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Rejoin physical lines into CSV records: a quoted field may span newlines."""
+    parts, quotes = [], 0
+    async for line in lines:
+        parts.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield "\n".join(parts)
+            parts, quotes = [], 0
+        elif sum(map(len, parts)) > MAX_RECORD_BYTES:
+            raise BadRequestException(detail=f"A record exceeds {MAX_RECORD_BYTES} bytes")
+    if parts:
+        yield "\n".join(parts)
+
+
+async def iter_batches(records: AsyncIterator[str]) -> AsyncIterator[list[str]]:
+    batch = []
+    async for record in records:
+        if not record.strip():
+            continue
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_csv_batch(header: list[str], batch: list[str]) -> Iterable[dict | str]:
+    for values in csv.reader(batch):
+        if len(values) != len(header):
+            yield f"Expected {len(header)} fields, got {len(values)}"
+            continue
+        # Empty cells count as missing, so defaults (e.g. status) still apply.
+        yield {name: value for name, value in zip(header, values) if value != ""}
+
+
+def parse_ndjson_batch(batch: list[str]) -> Iterable[dict | str]:
+    for line in batch:
+        try:
+            value = json.loads(line)
+        except ValueError as ex:
+            yield f"Invalid JSON: {ex}"
+            continue
+        yield value if isinstance(value, dict) else "Each line must be a JSON object"
+
+
+def validation_errors(ex: ValidationError) -> list[dict]:
+    return [{"field": ".".join(map(str, error["loc"])), "message": error["msg"]} for error in ex.errors()]
+
+
+async def copy_rows(db: AsyncSession, rows: list[tuple]) -> None:
+    """COPY one batch, plus empty rating summaries, inside the session's transaction."""
+    connection = await db.connection()
+    driver = (await connection.get_raw_connection()).driver_connection
+    await driver.copy_records_to_table("scholarships", records=rows, columns=COLUMNS)
+    await driver.copy_records_to_table(
+        models.ScholarshipRatingSummary.__tablename__,
+        records=[(row[0],) for row in rows],
+        columns=["scholarship_id"],
+    )
+
+
+async def import_programs(
+    db: AsyncSession, user_id: str, format: ImportFormat, chunks: AsyncIterator[bytes]
+) -> dict:
+    partner_id = await db.scalar(select(models.Partner.id).filter(models.Partner.user_id == user_id))
+    if partner_id is None:
+        raise NotFoundException(detail="Partner not found")
+
+    lines = iter_lines(chunks)
+    if format == "csv":
+        records = iter_csv_records(lines)
+        header_record = await anext(records, None)
+        if header_record is None:
+            raise BadRequestException(detail="The CSV upload is empty")
+        header = [name.strip() for name in next(csv.reader([header_record]))]
+        unknown = set(header) - set(schemas.ScholarshipCreate.model_fields)
+        if unknown:
+            raise BadRequestException(detail=f"Unknown CSV columns: {', '.join(sorted(unknown))}")
+    else:
+        records = lines
+
+    inserted = failed = row_number = 0
+    errors = []
+    async for batch in iter_batches(records):
+        parsed = parse_csv_batch(header, batch) if format == "csv" else parse_ndjson_batch(batch)
+        rows = []
+        for data in parsed:
+            row_number += 1
+            try:
+                if isinstance(data, str):
+                    row_errors = [{"field": None, "message": data}]
+                else:
+                    program = schemas.ScholarshipCreate.model_validate(data)
+                    rows.append((
+                        uuid.uuid4(), program.title, program.description, program.location,
+                        program.application_link, program.field_of_study, program.funding_type,
+                        program.funding_amount, program.duration, program.status, partner_id,
+                    ))
+                    continue
+            except ValidationError as ex:
+                row_errors = validation_errors(ex)
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "errors": row_errors})
+        if rows:
+            await copy_rows(db, rows)
+            inserted += len(rows)
+
+    await db.commit()
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
@@ -0,0 +1,163 @@
+"""
+Per-process cache of serialized read responses with strong ETags.
+
+Handlers that change cached data call :meth:`ResponseCache.invalidate` with the
+affected keys. Invalidation is local to the worker, so the TTL bounds how long
+another worker may keep serving a stale copy.
+
+GET handlers may load from a read replica that trails the primary. For
+``settle_seconds`` after an invalidation a key is therefore served without
+being cached again. Otherwise the first read after a write could store the
+replica's pre-write copy for a full TTL.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, NamedTuple
+
+from fastapi import Request, Response
+
+from app.responses import to_json
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_SECONDS = 30
+# Comfortably above normal replica lag; monitor_replica takes a lagging-out replica out of rotation.
+DEFAULT_SETTLE_SECONDS = 5
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.settle_seconds = settle_seconds
+        self._entries: OrderedDict[Hashable, CachedBody] = OrderedDict()
+        # Invalidated key or prefix -> monotonic time until which it is not cached.
+        self._settling: dict[Hashable, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.uncached_loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CachedBody | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Hashable, body: bytes) -> CachedBody:
+        entry = CachedBody(body, _etag(body), time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _settle(self, key: Hashable) -> None:
+        now = time.monotonic()
+        self._settling = {pending: until for pending, until in self._settling.items() if until > now}
+        self._settling[key] = now + self.settle_seconds
+
+    def settling(self, key: Hashable) -> bool:
+        """True for a while after ``key`` (or a prefix of it) was invalidated."""
+        now = time.monotonic()
+        return any(
+            until > now and (
+                pending == key
+                or isinstance(pending, tuple) and isinstance(key, tuple) and key[:len(pending)] == pending
+            )
+            for pending, until in self._settling.items()
+        )
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._settle(key)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_prefix(self, prefix: tuple) -> None:
+        """Drop every tuple key that starts with ``prefix`` (e.g. all pages of one listing)."""
+        self._settle(prefix)
+        size = len(prefix)
+        for key in [key for key in self._entries if isinstance(key, tuple) and key[:size] == prefix]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._settling.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "uncached_loads": self.uncached_loads,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore a W/ prefix.
+    return etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+
+
+async def cached_json_response(
+    request: Request,
+    key: Hashable,
+    load: Callable[[], Awaitable[object]],
+    cache: ResponseCache = response_cache,
+) -> Response:
+    """
+    Serve ``key`` from the cache, or ``await load()`` and cache its JSON encoding.
+
+    ``load`` returns validated models (or lists of them), which are encoded
+    without another pass through FastAPI. It should raise (e.g. a 404) rather
+    than return something that must not be cached. Right after an
+    invalidation the result is served but not stored; see the module docstring.
+    """
+    entry = cache.get(key)
+    status = "HIT"
+    if entry is None:
+        status = "MISS"
+        body = to_json(await load())
+        # Checked after the load, which may have started before the write.
+        if cache.settling(key):
+            cache.uncached_loads += 1
+            entry = CachedBody(body, _etag(body), 0)
+        else:
+            entry = cache.set(key, body)
+
+    headers = {"ETag": entry.etag, "X-Cache": status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
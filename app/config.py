@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    Runtime configuration, read from the environment (or a ``.env`` file).
+
+    Field names map to upper-case variables: ``DATABASE_URL``, ``DB_POOL_SIZE``...
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Required: there is no default, so credentials never live in the code.
+    database_url: str
+    # Read-only replica used by GET routes; unset means reads use the primary.
+    database_replica_url: str | None = None
+    db_replica_check_seconds: float = 5
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    # Seconds before a pooled connection is replaced; -1 keeps them forever.
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+    # Server-side statement_timeout for every connection; 0 disables it.
+    db_statement_timeout_ms: int = 0
+    db_echo: bool = False
+    # How often each worker checks for country requirement writes made elsewhere.
+    requirements_sync_seconds: float = 5
+    # Trending programs: how often each worker writes its interest counts and
+    # reloads the ranking, and how far back the ranking looks.
+    trending_flush_seconds: float = 10
+    trending_window_hours: int = 24
+    # How often each worker writes its buffered program view counts. A worker
+    # that dies loses at most this long of views; a clean shutdown loses none.
+    views_flush_seconds: float = 5
+    # Discord integration; the discussion routes answer 503 until both are set.
+    discord_bot_token: str | None = None
+    discord_guild_id: str | None = None
+    discord_api_url: str = "https://discord.com/api/v10"
+    discord_timeout_seconds: float = 10
+    discord_max_connections: int = 10
+    discord_max_retries: int = 3
+    discord_retry_backoff_seconds: float = 0.5
+    # A rate-limit wait longer than this fails fast with 503 instead of holding the request.
+    discord_max_rate_limit_wait: float = 5
+    # Background jobs. Worker tasks per process; 0 makes this process enqueue only.
+    jobs_workers: int = 4
+    jobs_poll_seconds: float = 1
+    jobs_max_attempts: int = 5
+    jobs_retry_backoff_seconds: float = 2
+    jobs_retry_backoff_max_seconds: float = 300
+    jobs_timeout_seconds: float = 60
+    # A job still running after its lease is presumed lost with its worker and requeued.
+    jobs_lease_seconds: float = 300
+    jobs_maintenance_seconds: float = 30
+    jobs_retention_hours: float = 168
+    jobs_shutdown_grace_seconds: float = 10
+    # Create missing tables on startup. Migrations only add to a schema that
+    # already exists, so this stays on until there is a baseline revision.
+    create_tables: bool = True
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,235 @@
+"""
+Discord API client shared by every request in the process.
+
+A single ``httpx.AsyncClient`` keeps a pool of keep-alive connections to
+Discord. Each call has a timeout and a bounded number of retries:
+
+* A 429 is retried after its ``retry_after`` (from the body, else the
+  ``Retry-After`` header). A global limit pauses every route; a route limit
+  pauses only that route.
+* After ``X-RateLimit-Remaining: 0``, later calls on the route first wait
+  out ``X-RateLimit-Reset-After`` instead of collecting a 429.
+* 5xx responses and connection errors back off exponentially.
+
+A wait longer than ``discord_max_rate_limit_wait`` is not slept through. The
+caller gets a 503 with ``Retry-After``. Other Discord errors surface as 502.
+
+Pass ``transport=httpx.MockTransport(handler)`` to run without the network.
+"""
+import asyncio
+import math
+import random
+import time
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+import httpx
+
+from app import metrics
+from app.config import Settings, get_settings
+from app.exceptions import BadGatewayException, ServiceUnavailableException
+
+T = TypeVar("T")
+
+# Expired per-route limits are dropped once this many routes are tracked.
+MAX_TRACKED_ROUTES = 1024
+
+
+class DiscordService:
+    def __init__(self, settings: Settings | None = None, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        # Settings are resolved on first use so importing this module reads nothing.
+        self._settings = settings
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._global_until = 0.0
+        self._route_until: dict[tuple[str, str], float] = {}
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    @property
+    def settings(self) -> Settings:
+        return self._settings or get_settings()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.settings.discord_bot_token and self.settings.discord_guild_id)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            settings = self.settings
+            self._client = httpx.AsyncClient(
+                base_url=settings.discord_api_url,
+                headers={"Authorization": f"Bot {settings.discord_bot_token}"},
+                timeout=httpx.Timeout(settings.discord_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=settings.discord_max_connections,
+                    max_keepalive_connections=settings.discord_max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        return self.settings.discord_retry_backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers.get("retry-after", 1))
+        except ValueError:
+            return 1.0
+
+    def _rate_limited(self, retry_after: float) -> ServiceUnavailableException:
+        self.failures += 1
+        return ServiceUnavailableException(
+            detail="Discord rate limit reached, retry later", retry_after=max(1, math.ceil(retry_after))
+        )
+
+    async def _wait_for_route(self, route: tuple[str, str]) -> None:
+        wait = max(self._global_until, self._route_until.get(route, 0.0)) - time.monotonic()
+        if wait > self.settings.discord_max_rate_limit_wait:
+            raise self._rate_limited(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _record_limits(self, route: tuple[str, str], response: httpx.Response) -> None:
+        now = time.monotonic()
+        headers = response.headers
+        if response.status_code == 429:
+            until = now + self._retry_after(response)
+            if headers.get("x-ratelimit-global", "").lower() == "true" or headers.get("x-ratelimit-scope") == "global":
+                self._global_until = max(self._global_until, until)
+            else:
+                self._route_until[route] = until
+        elif headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset-after" in headers:
+            try:
+                self._route_until[route] = now + float(headers["x-ratelimit-reset-after"])
+            except ValueError:
+                pass
+        if len(self._route_until) > MAX_TRACKED_ROUTES:
+            self._route_until = {key: until for key, until in self._route_until.items() if until > now}
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        if not self.configured:
+            raise ServiceUnavailableException(detail="Discord integration is not configured")
+        client = self._get_client()
+        route = (method, path)
+        max_retries = self.settings.discord_max_retries
+        for attempt in range(max_retries + 1):
+            if attempt:
+                self.retries += 1
+            await self._wait_for_route(route)
+            self.requests += 1
+            try:
+                response = await client.request(method, path, **kwargs)
+            except httpx.TransportError as ex:  # connection errors and timeouts
+                if attempt == max_retries:
+                    self.failures += 1
+                    raise BadGatewayException(detail=f"Discord is unreachable: {type(ex).__name__}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            self._record_limits(route, response)
+            if response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = self._retry_after(response)
+                if attempt == max_retries or retry_after > self.settings.discord_max_rate_limit_wait:
+                    raise self._rate_limited(retry_after)
+                continue  # _wait_for_route sleeps it out
+            if response.status_code >= 500 and attempt < max_retries:
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            if response.is_error:
+                self.failures += 1
+                try:
+                    error = response.json()
+                except ValueError:
+                    error = response.text
+                raise BadGatewayException(detail={"discord_status": response.status_code, "error": error})
+            return response
+
+    async def create_text_channel(self, name: str, topic: str) -> dict:
+        response = await self.request(
+            "POST",
+            f"/guilds/{self.settings.discord_guild_id}/channels",
+            json={"name": name, "type": 0, "topic": topic},  # type 0: text channel
+        )
+        return response.json()
+
+    async def delete_channel(self, channel_id: str) -> None:
+        await self.request("DELETE", f"/channels/{channel_id}")
+
+    def channel_link(self, channel_id: str) -> str:
+        return f"https://discord.com/channels/{self.settings.discord_guild_id}/{channel_id}"
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SingleFlight:
+    """
+    Runs concurrent calls that share a key once, giving every caller the result.
+
+    The call runs in its own task, so a caller that disconnects does not
+    cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def _finished(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved, even if every caller went away
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(fn())
+            flight.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(flight)
+
+
+discord_service = DiscordService()
+channel_creations = SingleFlight()
+
+
+def get_discord() -> DiscordService:
+    """Dependency for routes that talk to Discord; override it to inject a stand-in."""
+    if not discord_service.configured:
+        raise ServiceUnavailableException(detail="Discord integration is not configured")
+    return discord_service
+
+
+def _discord_metrics():
+    stats = discord_service.stats()
+    yield from metrics.gauge("discord_requests_total", "Requests sent to the Discord API.", stats["requests"], "counter")
+    yield from metrics.gauge("discord_retries_total", "Discord API requests that were retries.", stats["retries"], "counter")
+    yield from metrics.gauge("discord_rate_limited_total", "Discord API responses with status 429.", stats["rate_limited"], "counter")
+    yield from metrics.gauge("discord_failures_total", "Discord API calls that failed after retries.", stats["failures"], "counter")
+    yield from metrics.gauge(
+        "discord_channel_creations_coalesced_total", "Channel creations that joined one already in flight.",
+        channel_creations.coalesced, "counter",
+    )
+
+
+metrics.register_collector(_discord_metrics)
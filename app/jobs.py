@@ -0,0 +1,334 @@
+"""
+Postgres-backed background jobs; no broker needed.
+
+A route calls :func:`enqueue` inside its own transaction, so a job exists
+only if the route's writes commit. The route then returns immediately.
+
+Worker tasks started from the app lifespan claim due jobs with
+``FOR UPDATE SKIP LOCKED``. Any number of workers, in any number of
+processes, share the table without two of them taking the same job.
+
+Failure handling:
+
+* A handler that raises is retried with exponential backoff until
+  ``max_attempts``. The job is then marked ``failed`` with its last error.
+  :class:`PermanentJobError` fails it at once.
+* If a worker dies mid-job, the job stays ``running`` until its lease
+  (``jobs_lease_seconds``) runs out, and is then requeued. Handlers must
+  therefore tolerate running twice.
+* Enqueueing again with the same idempotency key returns the first job,
+  unless that job has ``failed``: it is then reset and queued again with
+  the new payload, keeping its id. Schedules opt out of that, so a failed
+  run stays failed until the next interval's key.
+* Worker and maintenance loops survive database outages: they log, wait
+  and try again.
+
+Handlers are registered with :func:`handler`. :func:`schedule` enqueues a
+kind periodically, once per interval across all processes.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import case, delete, event, func, null, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import metrics
+from app.config import Settings, get_settings
+from app.database import DATABASE_ERRORS, SessionLocal
+from app.models import Job
+from app.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+MAX_ERROR_LENGTH = 2000
+
+JobHandler = Callable[[dict], Awaitable[dict | None]]
+handlers: dict[str, JobHandler] = {}
+timeouts: dict[str, float] = {}
+schedules: dict[str, float] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails at once."""
+
+
+def handler(kind: str, timeout: float | None = None) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register the coroutine that runs jobs of ``kind``; it gets the payload and may return a result dict.
+
+    ``timeout`` replaces ``jobs_timeout_seconds`` for long batch jobs; their
+    lease is extended by the same amount.
+    """
+    def register(fn: JobHandler) -> JobHandler:
+        handlers[kind] = fn
+        if timeout is not None:
+            timeouts[kind] = timeout
+        return fn
+    return register
+
+
+def schedule(kind: str, every_seconds: float) -> None:
+    """Enqueue ``kind`` once per ``every_seconds``, however many processes run."""
+    schedules[kind] = every_seconds
+
+
+jobs_enqueued = Counter("jobs_enqueued_total", "Background jobs enqueued.", ("kind",))
+jobs_finished = Counter(
+    "jobs_finished_total", "Background job attempts by outcome (succeeded, retried, failed).", ("kind", "outcome")
+)
+job_duration = Histogram(
+    "job_duration_seconds", "Background job run time per attempt.", ("kind",), buckets=metrics.LATENCY_BUCKETS
+)
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    idempotency_key: str | None = None,
+    requeue_failed: bool = True,
+    delay: float = 0,
+    max_attempts: int | None = None,
+) -> uuid.UUID:
+    """
+    Add a job in ``db``'s transaction; returns its id.
+
+    A repeated key returns the existing job's id. A ``failed`` job with that
+    key is first reset to run again, so one dead attempt does not block the
+    key for the whole retention period, unless ``requeue_failed`` is false.
+    """
+    if kind not in handlers:
+        raise ValueError(f"No handler registered for job kind {kind!r}")
+    statement = insert(Job).values(
+        id=uuid.uuid4(),
+        kind=kind,
+        payload=payload or {},
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts or get_settings().jobs_max_attempts,
+        run_at=utcnow() + timedelta(seconds=delay),
+    )
+    if idempotency_key is not None and not requeue_failed:
+        statement = statement.on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+    elif idempotency_key is not None:
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[Job.idempotency_key],
+            set_={
+                "kind": new.kind, "payload": new.payload, "max_attempts": new.max_attempts, "run_at": new.run_at,
+                "status": QUEUED, "attempts": 0, "locked_by": None, "locked_at": None,
+                "last_error": None, "result": null(), "finished_at": None,
+            },
+            where=Job.status == FAILED,
+        )
+    job_id = await db.scalar(statement.returning(Job.id))
+    if job_id is None:
+        return await db.scalar(select(Job.id).filter(Job.idempotency_key == idempotency_key))
+
+    jobs_enqueued.labels(kind).inc()
+    if delay <= 0:
+        # Wake a local worker once the job is visible, instead of at its next poll.
+        event.listen(db.sync_session, "after_commit", lambda session: job_queue.wake(), once=True)
+    return job_id
+
+
+def _backoff(settings: Settings, attempts: int) -> float:
+    delay = settings.jobs_retry_backoff_seconds * 2 ** (attempts - 1)
+    return min(delay, settings.jobs_retry_backoff_max_seconds) * random.uniform(0.5, 1.0)
+
+
+def _describe(ex: Exception) -> str:
+    # HTTPException (raised by the service clients) keeps its message in detail.
+    return f"{type(ex).__name__}: {getattr(ex, 'detail', None) or ex}"[:MAX_ERROR_LENGTH]
+
+
+class JobQueue:
+    def __init__(self) -> None:
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._workers: list[asyncio.Task] = []
+        self._maintenance: asyncio.Task | None = None
+        self.running = 0
+        # Jobs per status, refreshed by the maintenance loop.
+        self.depth: dict[str, int] = {}
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self, settings: Settings | None = None) -> None:
+        settings = settings or get_settings()
+        if settings.jobs_workers <= 0:
+            return
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._work(f"{self.worker_id}/{number}", settings))
+            for number in range(settings.jobs_workers)
+        ]
+        self._maintenance = asyncio.create_task(self._maintain(settings))
+
+    async def stop(self, grace: float | None = None) -> None:
+        """Let running jobs finish for up to ``grace`` seconds, then cancel them."""
+        self._stopping = True
+        self.wake()
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+        if self._workers:
+            _, pending = await asyncio.wait(
+                self._workers, timeout=grace if grace is not None else get_settings().jobs_shutdown_grace_seconds
+            )
+            # Jobs cut off here stay running and are requeued when their lease expires.
+            for task in pending:
+                task.cancel()
+        self._workers, self._maintenance = [], None
+
+    async def claim(self, worker: str):
+        # A CTE, not ``id IN (subquery)``: Postgres may re-run a locking
+        # subquery under concurrency and update more rows than the LIMIT.
+        due = (
+            select(Job.id)
+            .filter(Job.status == QUEUED, Job.run_at <= utcnow())
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        async with SessionLocal() as db:
+            job = (await db.execute(
+                update(Job)
+                .where(Job.id == due.c.id)
+                .values(status=RUNNING, attempts=Job.attempts + 1, locked_by=worker, locked_at=utcnow())
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                .execution_options(synchronize_session=False)
+            )).first()
+            await db.commit()
+        return job
+
+    async def _finish(self, worker: str, job_id: uuid.UUID, **values) -> None:
+        async with SessionLocal() as db:
+            # Guarded by locked_by: a job whose lease expired may belong to another worker now.
+            await db.execute(
+                update(Job)
+                .filter(Job.id == job_id, Job.locked_by == worker)
+                .values(locked_by=None, locked_at=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def run(self, worker: str, job, settings: Settings) -> str:
+        started = time.perf_counter()
+        self.running += 1
+        try:
+            fn = handlers.get(job.kind)
+            if fn is None:
+                raise PermanentJobError(f"No handler registered for job kind {job.kind!r}")
+            async with asyncio.timeout(timeouts.get(job.kind, settings.jobs_timeout_seconds)):
+                result = await fn(dict(job.payload))
+        except Exception as ex:
+            error = _describe(ex)
+            if isinstance(ex, PermanentJobError) or job.attempts >= job.max_attempts:
+                outcome = FAILED
+                await self._finish(worker, job.id, status=FAILED, last_error=error, finished_at=utcnow())
+                logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.kind, job.attempts, error)
+            else:
+                outcome = "retried"
+                delay = _backoff(settings, job.attempts)
+                await self._finish(
+                    worker, job.id, status=QUEUED, last_error=error, run_at=utcnow() + timedelta(seconds=delay)
+                )
+                logger.warning("Job %s (%s) attempt %d failed, retrying in %.1fs: %s",
+                               job.id, job.kind, job.attempts, delay, error)
+        else:
+            outcome = SUCCEEDED
+            await self._finish(worker, job.id, status=SUCCEEDED, result=result, last_error=None, finished_at=utcnow())
+        finally:
+            self.running -= 1
+            job_duration.labels(job.kind).observe(time.perf_counter() - started)
+        jobs_finished.labels(job.kind, outcome).inc()
+        return outcome
+
+    async def _work(self, worker: str, settings: Settings) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                job = await self.claim(worker)
+                if job is not None:
+                    await self.run(worker, job, settings)
+                    continue
+            except DATABASE_ERRORS:
+                logger.exception("Job worker %s could not reach the jobs table", worker)
+            try:
+                async with asyncio.timeout(settings.jobs_poll_seconds):
+                    await self._wake.wait()
+            except TimeoutError:
+                pass
+
+    async def maintain(self, settings: Settings) -> None:
+        """Requeue expired leases, drop old finished jobs, enqueue schedules, count jobs per status."""
+        lease = timedelta(seconds=settings.jobs_lease_seconds)
+        if timeouts:
+            lease = case(
+                {kind: timedelta(seconds=timeout) + lease for kind, timeout in timeouts.items()},
+                value=Job.kind,
+                else_=lease,
+            )
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .filter(Job.status == RUNNING, Job.locked_at < utcnow() - lease)
+                .values(
+                    # A job that keeps taking its worker down must not loop forever.
+                    status=case((Job.attempts >= Job.max_attempts, FAILED), else_=QUEUED),
+                    finished_at=case((Job.attempts >= Job.max_attempts, utcnow()), else_=None),
+                    last_error="Lease expired: the worker running it stopped or timed out",
+                    locked_by=None,
+                    locked_at=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                delete(Job).filter(
+                    Job.status.in_((SUCCEEDED, FAILED)),
+                    Job.finished_at < utcnow() - timedelta(hours=settings.jobs_retention_hours),
+                )
+            )
+            now = time.time()
+            for kind, every in schedules.items():
+                # Maintenance runs many times per interval: a run that used up
+                # its attempts must not be reset by each pass.
+                await enqueue(db, kind, idempotency_key=f"{kind}@{int(now // every)}", requeue_failed=False)
+            await db.commit()
+            rows = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+            self.depth = dict(rows.all())
+
+    async def _maintain(self, settings: Settings) -> None:
+        while True:
+            try:
+                await self.maintain(settings)
+            except DATABASE_ERRORS:
+                logger.exception("Job maintenance failed")
+            await asyncio.sleep(settings.jobs_maintenance_seconds)
+
+
+job_queue = JobQueue()
+
+
+def _job_metrics():
+    yield from metrics.gauge("jobs_running", "Jobs running in this process.", job_queue.running)
+    yield from metrics.labelled_gauge(
+        "jobs", "Jobs in the table by status, as of the last maintenance pass.", "status",
+        {status: job_queue.depth.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)},
+    )
+
+
+metrics.register_collector(_job_metrics)
@@ -0,0 +1,201 @@
+"""
+In-process metrics, exposed through ``prometheus_client``.
+
+Recording is a few dict operations per request or statement. The text is
+only formatted when ``/metrics`` is scraped. Every value is per worker process,
+so a multi-worker deployment is scraped once per worker.
+"""
+import logging
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from prometheus_client import (
+    CONTENT_TYPE_PLAIN_0_0_4, REGISTRY, Counter, Histogram, disable_created_metrics, generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+
+from app.auth.hash import password_hasher
+from app.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = CONTENT_TYPE_PLAIN_0_0_4
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# The same statement text run this many times in one request is reported as a
+# likely N+1: a per-row lookup that should have been a join or an IN (...).
+N_PLUS_ONE_THRESHOLD = 5
+
+# A ``*_created`` timestamp per series only doubles the scrape size.
+disable_created_metrics()
+
+
+def gauge(name: str, help: str, value: float, type: str = "gauge") -> Iterable[Metric]:
+    """One unlabelled sample known only at scrape time; ``type`` is ``gauge`` or ``counter``."""
+    family = CounterMetricFamily if type == "counter" else GaugeMetricFamily
+    yield family(name, help, value=value)
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP responses by route and status code.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"), buckets=LATENCY_BUCKETS
+)
+db_statements_per_request = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request.", ("method", "route"),
+    buckets=STATEMENT_BUCKETS,
+)
+db_time_per_request = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per HTTP request.", ("method", "route"),
+    buckets=LATENCY_BUCKETS,
+)
+db_statements = Counter("db_statements_total", "SQL statements executed, inside or outside requests.")
+db_statement_time = Counter("db_statement_seconds_total", "Time spent executing SQL statements.")
+db_n_plus_one = Counter(
+    "db_n_plus_one_suspected_total",
+    f"Requests that ran one statement {N_PLUS_ONE_THRESHOLD}+ times (likely N+1 queries).",
+    ("method", "route"),
+)
+db_replica_fallbacks = Counter(
+    "db_replica_fallbacks_total", "Reads sent to the primary because the replica was unreachable."
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.",
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class _CallbackCollector:
+    def __init__(self, collect: Callable[[], Iterable[Metric]]) -> None:
+        self.collect = collect
+
+    def describe(self) -> Iterable[Metric]:
+        # Registering must not run the callback; its sources may not be ready yet.
+        return ()
+
+
+def register_collector(collector: Callable[[], Iterable[Metric]]) -> None:
+    """Add a callback producing metric families that are only known at scrape time."""
+    REGISTRY.register(_CallbackCollector(collector))
+
+
+class QueryStats:
+    __slots__ = ("statements", "seconds", "shapes")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        self.shapes: dict[str, int] = defaultdict(int)
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    db_statements.inc()
+    db_statement_time.inc(seconds)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+        stats.shapes[statement] += 1
+
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: QueryStats) -> None:
+    http_requests.labels(method, route, status).inc()
+    http_request_duration.labels(method, route).observe(seconds)
+    db_statements_per_request.labels(method, route).observe(stats.statements)
+    db_time_per_request.labels(method, route).observe(stats.seconds)
+    repeated = [(count, statement) for statement, count in stats.shapes.items() if count >= N_PLUS_ONE_THRESHOLD]
+    if repeated:
+        db_n_plus_one.labels(method, route).inc()
+        count, statement = max(repeated)
+        logger.warning("Likely N+1 on %s %s: ran %d times: %s", method, route, count, " ".join(statement.split())[:200])
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and attributes the SQL it runs to its route.
+
+    Routes are labelled by their path template (``/api/Programs/{id}``), never
+    the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _query_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            record_request(scope["method"], route, status, elapsed, stats)
+
+
+def labelled_gauge(name: str, help: str, label: str, values: dict) -> Iterable[Metric]:
+    family = GaugeMetricFamily(name, help, labels=(label,))
+    for key, value in values.items():
+        family.add_metric((str(key),), value)
+    yield family
+
+
+def pool_metrics(pools: dict) -> Iterable[Metric]:
+    """Gauges for each connection pool, labelled by role (``primary``/``replica``)."""
+    yield from labelled_gauge("db_pool_size", "Configured number of pooled connections.", "pool",
+                              {role: pool.size() for role, pool in pools.items()})
+    yield from labelled_gauge("db_pool_connections_in_use", "Connections currently checked out.", "pool",
+                              {role: pool.checkedout() for role, pool in pools.items()})
+    yield from labelled_gauge("db_pool_connections_idle", "Connections idle in the pool.", "pool",
+                              {role: pool.checkedin() for role, pool in pools.items()})
+    yield from labelled_gauge("db_pool_overflow", "Connections open beyond the pool size.", "pool",
+                              {role: max(pool.overflow(), 0) for role, pool in pools.items()})
+
+
+def _cache_metrics() -> Iterable[Metric]:
+    stats = response_cache.stats()
+    yield from gauge("response_cache_entries", "Responses held in the cache.", stats["entries"])
+    yield from gauge("response_cache_hits_total", "Response cache hits.", stats["hits"], "counter")
+    yield from gauge("response_cache_misses_total", "Response cache misses.", stats["misses"], "counter")
+    yield from gauge("response_cache_invalidations_total", "Cache entries dropped by writes.", stats["invalidations"], "counter")
+    yield from gauge(
+        "response_cache_uncached_loads_total", "Loads served uncached because a write had just invalidated the key.",
+        stats["uncached_loads"], "counter",
+    )
+
+
+def _password_hasher_metrics() -> Iterable[Metric]:
+    stats = password_hasher.stats()
+    yield from gauge("password_hash_in_flight", "Password hashes running or queued.", stats["in_flight"])
+    yield from gauge("password_hash_queue_depth", "Password hashes waiting for a worker.", stats["queue_depth"])
+    yield from gauge("password_hash_completed_total", "Password hashes completed.", stats["completed"], "counter")
+    yield from gauge("password_hash_rejected_total", "Password hashes rejected with 503.", stats["rejected"], "counter")
+    yield from gauge("password_hash_seconds_total", "Time spent on password hashes.", stats["latency_seconds_total"], "counter")
+
+
+register_collector(_cache_metrics)
+register_collector(_password_hasher_metrics)
+
+
+def render() -> str:
+    return generate_latest(REGISTRY).decode()
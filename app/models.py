@@ -1,11 +1,12 @@
 import datetime
 import enum
-from sqlalchemy import UUID, Boolean, Column, DateTime, Integer, String, ForeignKey, Text, Float, select
+from sqlalchemy import UUID, BigInteger, Boolean, Column, Computed, DateTime, Index, Integer, String, ForeignKey, Text, Float, UniqueConstraint, func, select, text
 from passlib.context import CryptContext
-from sqlalchemy.orm import relationship, Session
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column
-from app.auth.hash import verify_password
+from app.auth.hash import password_hasher
 from app.utils import utcnow
 from app.database import Base
 import uuid
@@ -30,15 +31,15 @@ class User(Base):
         user_type: Mapped[UserType] = mapped_column(default=UserType.STUDENT)
 
         @classmethod
-        async def find_by_email(cls, db: Session, email: str):
+        async def find_by_email(cls, db: AsyncSession, email: str):
             query = select(cls).where(cls.email == email)
-            result = db.execute(query)
+            result = await db.execute(query)
             return result.scalar_one_or_none()
 
         @classmethod
         async def authenticate(cls, db: AsyncSession, email: str, password: str):
             user = await cls.find_by_email(db=db, email=email)
-            if not user or not verify_password(password, user.password):
+            if not user or not await password_hasher.verify(password, user.password):
                 return False
             return user
         student_details = relationship("Student", back_populates="user", uselist=False)
@@ -49,18 +50,17 @@ class BlackListToken(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True, index=True, default=uuid.uuid4
     )
-    expire: Mapped[datetime.datetime]
+    expire: Mapped[datetime.datetime] = mapped_column(index=True)
     created_at: Mapped[datetime.datetime] = mapped_column(server_default=utcnow())
 
 class Student(Base):
     __tablename__ = "students"
     id: Mapped[uuid.UUID] = mapped_column(
             primary_key=True, index=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))  # Changed to UUID
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)  # Changed to UUID
     university = Column(String)
     username = Column(String)
     user = relationship("User", back_populates="student_details")
-    interested = Column(String, nullable=True, unique=True, default="")
 
 class Scholarship(Base):
     __tablename__ = "scholarships"
@@ -76,6 +76,16 @@ class Scholarship(Base):
     funding_amount = Column(Float)
     duration = Column(Integer)
     status = Column(String, default="open")
+    created_at = Column(DateTime, nullable=False, server_default=utcnow())
+    # Maintained by Postgres; deferred so listings never load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
 
     partner_id = Column(UUID(as_uuid=True), ForeignKey("partners.id"))
     partner = relationship("Partner", back_populates="scholarship_details")
@@ -85,16 +95,78 @@ class Scholarship(Base):
         cascade="all, delete-orphan", 
         backref="scholarship"
     )
+    # One row per program, joined into every program query so listings carry
+    # their rating without aggregating feedback.
+    rating_summary = relationship(
+        "ScholarshipRatingSummary",
+        uselist=False,
+        lazy="joined",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # Keyset pagination order for program listings.
+        Index("ix_scholarships_created_at_id", "created_at", "id"),
+        Index("ix_scholarships_search_vector", "search_vector", postgresql_using="gin"),
+        # Each listing filter followed by the keyset order, so a filtered page
+        # is a single index range scan.
+        Index("ix_scholarships_location_created_at_id", "location", "created_at", "id"),
+        Index("ix_scholarships_field_of_study_created_at_id", "field_of_study", "created_at", "id"),
+        Index("ix_scholarships_funding_type_created_at_id", "funding_type", "created_at", "id"),
+        # A partner's own programs (view analytics).
+        Index("ix_scholarships_partner_id", "partner_id"),
+    )
     
 
 
     
 
+class ScholarshipRatingSummary(Base):
+    """
+    Running rating totals for one program, kept in step with ``feedback`` by
+    app.ratings in the same transaction as each review write.
+    """
+    __tablename__ = "scholarship_rating_summary"
+    scholarship_id = Column(
+        UUID(as_uuid=True), ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True
+    )
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    # 0 for unrated programs so they sort last and the column stays indexable
+    # without NULL handling in the keyset.
+    average_rating = Column(
+        Float,
+        Computed(
+            "CASE WHEN rating_count > 0 THEN rating_sum::float8 / rating_count ELSE 0 END",
+            persisted=True,
+        ),
+    )
+
+    __table_args__ = (
+        # Sort and min_rating filter for program listings.
+        Index("ix_scholarship_rating_summary_average_rating", "average_rating", "scholarship_id"),
+    )
+
+    @property
+    def average(self) -> float | None:
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    @property
+    def histogram(self) -> dict[int, int]:
+        return {stars: getattr(self, f"stars_{stars}") for stars in range(1, 6)}
+
+
 class Partner(Base):
     __tablename__ = "partners"
     id: Mapped[uuid.UUID] = mapped_column(
             primary_key=True, index=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))  # Changed to UUID
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)  # Changed to UUID
     phone_number = Column(String)
     website = Column(String)
     address = Column(String)
@@ -104,13 +176,42 @@ class Partner(Base):
     scholarship_details = relationship("Scholarship", back_populates="partner", lazy="subquery")
 
 
+class StudentInterest(Base):
+    """A program a student follows; one row per pair, so marking twice is a no-op."""
+    __tablename__ = "student_interests"
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    scholarship_id = Column(
+        UUID(as_uuid=True), ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    created_at = Column(DateTime, nullable=False, server_default=utcnow())
+
+
+class ProgramInterestBucket(Base):
+    """Interest marks per program per hour, merged in by app.trending."""
+    __tablename__ = "program_interest_buckets"
+    bucket_start = Column(DateTime, primary_key=True)
+    scholarship_id = Column(UUID(as_uuid=True), primary_key=True)
+    # Net marks: an unmark subtracts from its mark's own hour, if still in the window.
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ProgramViewCount(Base):
+    """Total detail views per program, merged in by app.views."""
+    __tablename__ = "program_view_counts"
+    # No foreign key: a flush must not fail because a program was deleted
+    # since its views were counted. Readers join programs.
+    scholarship_id = Column(UUID(as_uuid=True), primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=False, server_default=utcnow())
+
+
 class Feedback(Base):
     __tablename__ = "feedback"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     scholarship_id = Column(
         UUID(as_uuid=True), 
         ForeignKey("scholarships.id", ondelete="CASCADE"), 
-        nullable=False
+        nullable=False,
     )
     student_id = Column(
         UUID(as_uuid=True), 
@@ -120,11 +221,18 @@ class Feedback(Base):
     rating = Column(Integer, nullable=False)  # Rating out of 5
     review = Column(String, nullable=True)  # Review text
     tips_on_applying = Column(String, nullable=True)  # Tips on applying for the scholarship
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    likes_count = Column(Integer, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow, server_default=utcnow())
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     likes = relationship("Likes", back_populates="feedback")
 
+    __table_args__ = (
+        # Keyset orders of the review listing, scoped to one program; they
+        # also serve plain lookups by scholarship_id.
+        Index("ix_feedback_scholarship_id_created_at_id", "scholarship_id", "created_at", "id"),
+        Index("ix_feedback_scholarship_id_likes_count_id", "scholarship_id", "likes_count", "id"),
+    )
+
 
 
 class Likes(Base):
@@ -137,6 +245,11 @@ class Likes(Base):
 
     feedback = relationship("Feedback", back_populates="likes")
 
+    __table_args__ = (
+        # One like per student per review; add_like relies on it for ON CONFLICT.
+        UniqueConstraint("feedback_id", "student_id", name="uq_likes_feedback_id_student_id"),
+    )
+
 
     
 class Discussion(Base):
@@ -156,7 +269,8 @@ class Tip(Base):
     scholarship_id = Column(
         UUID(as_uuid=True), 
         ForeignKey("scholarships.id", ondelete="CASCADE"), 
-        nullable=False
+        nullable=False,
+        index=True,
     )
     user_id = Column(String, nullable=False)
     date_shared = Column(DateTime)
@@ -172,3 +286,61 @@ class CountryRequirement(Base):
     mandatory = Column(Boolean, default=True)
 
 
+# One row per document type per country, compared case-insensitively like the
+# lookups. Bulk writes upsert against it; see app/requirements.py.
+Index(
+    "uq_country_requirements_country_document_type",
+    func.lower(CountryRequirement.country),
+    CountryRequirement.document_type,
+    unique=True,
+)
+
+
+class ReferenceDataVersion(Base):
+    """Write counter per reference table; workers reload their snapshot when it moves."""
+    __tablename__ = "reference_data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class Job(Base):
+    """A unit of background work; see app/jobs.py for its lifecycle."""
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    # queued -> running -> succeeded | failed; retries go back to queued.
+    status = Column(String, nullable=False, default="queued", server_default="queued")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False)
+    # Enqueueing again with the same key returns the existing job, or requeues it if failed.
+    idempotency_key = Column(String, unique=True)
+    run_at = Column(DateTime, nullable=False, server_default=utcnow())
+    locked_by = Column(String)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    result = Column(JSONB)
+    created_at = Column(DateTime, nullable=False, server_default=utcnow())
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Partial indexes: each serves one worker query and stays small.
+        Index("ix_jobs_due", "run_at", postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_leased", "locked_at", postgresql_where=text("status = 'running'")),
+        Index("ix_jobs_finished", "finished_at", postgresql_where=text("status IN ('succeeded', 'failed')")),
+    )
+
+
+class StudentRecommendation(Base):
+    """One entry of a student's precomputed top-K list; rebuilt by app.recommendations."""
+    __tablename__ = "student_recommendations"
+
+    # No foreign keys: a student or program deleted during a rebuild must not
+    # fail it. Reads join programs, and the next rebuild drops stale rows.
+    student_id = Column(UUID(as_uuid=True), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 is the best match
+    scholarship_id = Column(UUID(as_uuid=True), nullable=False)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, nullable=False, server_default=utcnow())
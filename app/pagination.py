@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import tuple_
+
+from app.exceptions import BadRequestException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort key of the last row of a page into an opaque token."""
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple:
+    """Unpack a token from :func:`encode_cursor`, one parser per sort column."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(values) != len(parsers):
+            raise ValueError("cursor arity mismatch")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError, binascii.Error):
+        raise BadRequestException(detail="Invalid cursor")
+
+
+def after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """Row-value predicate selecting rows strictly past the cursor position.
+
+    ``(a, b) > (x, y)`` lets Postgres seek straight into a composite index on
+    ``(a, b)``, so every page costs the same regardless of depth.
+    """
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
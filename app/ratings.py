@@ -0,0 +1,122 @@
+"""
+Maintenance of ``scholarship_rating_summary``.
+
+``record_rating`` and ``remove_rating`` run inside the transaction that writes
+the review, so the summary commits or rolls back with it. New programs get
+an empty row when they are created. Each is a single
+row-locking statement, which keeps concurrent reviews of one program exact.
+
+``rebuild_rating_summaries`` recomputes every row from ``feedback``. It backfills
+programs that predate the table and repairs drift. Run it as a command::
+
+    python -m app.ratings            # repair
+    python -m app.ratings --dry-run  # only report programs that are out of step
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.database import SessionLocal, dispose_engine, init_engine
+
+Summary = models.ScholarshipRatingSummary
+STAR_COLUMNS = {stars: f"stars_{stars}" for stars in range(1, 6)}
+COUNTER_COLUMNS = ("rating_count", "rating_sum", *STAR_COLUMNS.values())
+
+
+async def record_rating(db: AsyncSession, scholarship_id, rating: int) -> None:
+    stars = STAR_COLUMNS[rating]
+    table = Summary.__table__
+    await db.execute(
+        insert(Summary)
+        .values({"scholarship_id": scholarship_id, "rating_count": 1, "rating_sum": rating, stars: 1})
+        .on_conflict_do_update(
+            index_elements=[Summary.scholarship_id],
+            set_={
+                "rating_count": table.c.rating_count + 1,
+                "rating_sum": table.c.rating_sum + rating,
+                stars: table.c[stars] + 1,
+            },
+        )
+    )
+
+
+async def remove_rating(db: AsyncSession, scholarship_id, rating: int) -> None:
+    stars = STAR_COLUMNS.get(rating)
+    values = {
+        Summary.rating_count: func.greatest(Summary.rating_count - 1, 0),
+        Summary.rating_sum: func.greatest(Summary.rating_sum - rating, 0),
+    }
+    if stars:
+        column = Summary.__table__.c[stars]
+        values[column] = func.greatest(column - 1, 0)
+    await db.execute(
+        update(Summary)
+        .filter(Summary.scholarship_id == scholarship_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def computed_summaries():
+    """One row per program with its totals aggregated from ``feedback``."""
+    feedback = models.Feedback
+    return (
+        select(
+            models.Scholarship.id.label("scholarship_id"),
+            func.count(feedback.id).label("rating_count"),
+            func.coalesce(func.sum(feedback.rating), 0).label("rating_sum"),
+            *(
+                func.count(feedback.id).filter(feedback.rating == stars).label(column)
+                for stars, column in STAR_COLUMNS.items()
+            ),
+        )
+        .outerjoin(feedback, feedback.scholarship_id == models.Scholarship.id)
+        .group_by(models.Scholarship.id)
+    )
+
+
+async def rebuild_rating_summaries(db: AsyncSession, dry_run: bool = False) -> int:
+    """Bring every summary row in line with ``feedback``; return how many changed."""
+    computed = computed_summaries().subquery()
+    if dry_run:
+        stored = tuple_(*(func.coalesce(getattr(Summary, column), -1) for column in COUNTER_COLUMNS))
+        expected = tuple_(*(computed.c[column] for column in COUNTER_COLUMNS))
+        return await db.scalar(
+            select(func.count())
+            .select_from(computed)
+            .outerjoin(Summary, Summary.scholarship_id == computed.c.scholarship_id)
+            .filter(stored != expected)
+        )
+
+    statement = insert(Summary).from_select(["scholarship_id", *COUNTER_COLUMNS], select(computed))
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[Summary.scholarship_id],
+        set_={column: excluded[column] for column in COUNTER_COLUMNS},
+        # Only rewrite rows that drifted, so a repair of a healthy table is read-only.
+        where=tuple_(*(Summary.__table__.c[column] for column in COUNTER_COLUMNS))
+        != tuple_(*(excluded[column] for column in COUNTER_COLUMNS)),
+    ).returning(Summary.scholarship_id)
+    result = await db.execute(statement)
+    changed = len(result.all())
+    await db.commit()
+    return changed
+
+
+async def main(args) -> None:
+    init_engine()
+    async with SessionLocal() as db:
+        changed = await rebuild_rating_summaries(db, dry_run=args.dry_run)
+    await dispose_engine()
+    print(json.dumps({"dry_run": args.dry_run, "programs_out_of_step" if args.dry_run else "programs_repaired": changed}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild scholarship_rating_summary from feedback.")
+    parser.add_argument("--dry-run", action="store_true", help="count drifted programs without writing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,309 @@
+"""
+Personalized program recommendations, precomputed for every student.
+
+Each program becomes a feature vector with these parts:
+- one-hot blocks for field of study, location and funding type;
+- the standardized log funding amount;
+- the standardized duration.
+Each block is weighted by ``FEATURE_WEIGHTS``.
+
+A student's profile is the weighted sum of the programs they signalled:
+- each marked interest;
+- a liked review;
+- their own review, weighted by its rating. A poor rating pushes away.
+
+Scores are cosine similarities, computed as one matrix product per batch
+of students. Each student keeps the ``TOP_K`` best programs they have not
+already signalled.
+
+The rebuild runs as an hourly background job. It replaces the whole
+``student_recommendations`` table in one transaction, so readers see
+either the old lists or the new ones. A student's list is then served by
+one primary-key range scan. Students with no signal get no rows, and
+:func:`recommended_programs` falls back to the best-rated programs.
+
+    python -m app.recommendations   # rebuild now
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import TYPE_CHECKING, NamedTuple, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import jobs, models
+from app.database import SessionLocal, dispose_engine, init_engine
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# NumPy is imported inside the rebuild path only: the request path
+# (recommended_programs) never needs it, and importing it costs every
+# app start about 100ms.
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 50
+REBUILD_SECONDS = 3600
+REBUILD_TIMEOUT_SECONDS = 1800
+# Students scored per matrix product: a (batch x programs) float32 block.
+BATCH_SIZE = 256
+# Signals folded into profiles at a time, bounding the gathered feature rows.
+SIGNAL_CHUNK = 100_000
+COPY_BATCH_SIZE = 50_000
+
+CATEGORICAL = ("field_of_study", "location", "funding_type")
+FEATURE_WEIGHTS = {
+    "field_of_study": 1.0,
+    "location": 0.7,
+    "funding_type": 0.5,
+    "funding_amount": 0.3,
+    "duration": 0.3,
+}
+INTEREST_WEIGHT = 2.0
+LIKE_WEIGHT = 1.0
+REVIEW_WEIGHTS = {1: -1.0, 2: -0.5, 3: 0.5, 4: 1.0, 5: 1.5}
+
+
+class Signals(NamedTuple):
+    students: np.ndarray  # row of the student in the student list
+    programs: np.ndarray  # row of the program in the feature matrix
+    weights: np.ndarray
+
+
+class TopK(NamedTuple):
+    students: np.ndarray  # student row of each entry
+    ranks: np.ndarray  # 1 is the best match
+    programs: np.ndarray  # program row of each entry
+    scores: np.ndarray
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def program_features(programs: Sequence[tuple]) -> np.ndarray:
+    """
+    One L2-normalized row per program.
+
+    Each program is ``(field_of_study, location, funding_type, funding_amount, duration)``.
+    A missing category leaves its block empty rather than matching other missing values.
+    """
+    import numpy as np
+
+    count = len(programs)
+    blocks = []
+    for position, name in enumerate(CATEGORICAL):
+        values = [(program[position] or "").strip().casefold() for program in programs]
+        vocabulary = {value: index for index, value in enumerate(sorted(set(values) - {""}))}
+        codes = np.array([vocabulary.get(value, -1) for value in values], dtype=np.int64)
+        block = np.zeros((count, len(vocabulary)), dtype=np.float32)
+        present = np.flatnonzero(codes >= 0)
+        block[present, codes[present]] = FEATURE_WEIGHTS[name]
+        blocks.append(block)
+    for position, name in ((3, "funding_amount"), (4, "duration")):
+        column = np.array([program[position] or 0 for program in programs], dtype=np.float32)
+        if name == "funding_amount":
+            column = np.log1p(np.maximum(column, 0))
+        spread = column.std() or 1.0
+        blocks.append(((column - column.mean()) / spread * FEATURE_WEIGHTS[name])[:, None])
+    return _normalize(np.hstack(blocks).astype(np.float32))
+
+
+def student_profiles(features: np.ndarray, signals: Signals, student_count: int) -> np.ndarray:
+    """Weighted sum of each student's signalled programs, L2-normalized; zero rows have no signal."""
+    import numpy as np
+
+    profiles = np.zeros((student_count, features.shape[1]), dtype=np.float32)
+    for start in range(0, len(signals.weights), SIGNAL_CHUNK):
+        chunk = slice(start, start + SIGNAL_CHUNK)
+        np.add.at(
+            profiles, signals.students[chunk], features[signals.programs[chunk]] * signals.weights[chunk, None]
+        )
+    return _normalize(profiles)
+
+
+def top_k(features: np.ndarray, signals: Signals, student_count: int, k: int = TOP_K) -> TopK:
+    """Score every student with a profile against every program and keep the best ``k`` unseen."""
+    import numpy as np
+
+    profiles = student_profiles(features, signals, student_count)
+    k = min(k, features.shape[0])
+    active = np.flatnonzero(np.any(profiles != 0, axis=1))
+    order = np.argsort(signals.students, kind="stable")
+    seen_students, seen_programs = signals.students[order], signals.programs[order]
+    batch_row = np.full(student_count, -1, dtype=np.int64)
+
+    parts = []
+    for start in range(0, len(active) if k else 0, BATCH_SIZE):
+        rows = active[start:start + BATCH_SIZE]
+        scores = profiles[rows] @ features.T
+        # Signals are sorted by student, so this batch's are one contiguous slice.
+        lo = np.searchsorted(seen_students, rows[0], side="left")
+        hi = np.searchsorted(seen_students, rows[-1], side="right")
+        batch_row[rows] = np.arange(len(rows))
+        positions = batch_row[seen_students[lo:hi]]
+        hit = positions >= 0
+        scores[positions[hit], seen_programs[lo:hi][hit]] = -np.inf
+        batch_row[rows] = -1
+
+        # Partition on the scores themselves: negating first would copy the block.
+        best = np.argpartition(scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        ranked = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, ranked, axis=1)
+        best_scores = np.take_along_axis(best_scores, ranked, axis=1)
+        keep = np.isfinite(best_scores)
+        parts.append(TopK(
+            np.broadcast_to(rows[:, None], best.shape)[keep],
+            np.broadcast_to(np.arange(1, k + 1), best.shape)[keep],
+            best[keep],
+            best_scores[keep],
+        ))
+
+    if not parts:
+        empty = np.zeros(0, dtype=np.int64)
+        return TopK(empty, empty, empty, np.zeros(0, dtype=np.float32))
+    return TopK(*(np.concatenate(column) for column in zip(*parts)))
+
+
+async def load_inputs(db: AsyncSession) -> tuple[list, list, list, Signals]:
+    """Programs, students and every signal, as the rows and index arrays :func:`top_k` takes."""
+    import numpy as np
+
+    scholarship = models.Scholarship
+    programs = (await db.execute(select(
+        scholarship.id, scholarship.field_of_study, scholarship.location,
+        scholarship.funding_type, scholarship.funding_amount, scholarship.duration,
+    ))).all()
+    program_ids = [program.id for program in programs]
+    student_ids = (await db.scalars(select(models.Student.id))).all()
+    program_row = {program_id: row for row, program_id in enumerate(program_ids)}
+    student_row = {student_id: row for row, student_id in enumerate(student_ids)}
+
+    students, targets, weights = [], [], []
+
+    def add(student_id, program_id, weight: float) -> None:
+        student, program = student_row.get(student_id), program_row.get(program_id)
+        if student is not None and program is not None:
+            students.append(student)
+            targets.append(program)
+            weights.append(weight)
+
+    for student_id, program_id in await db.execute(
+        select(models.StudentInterest.student_id, models.StudentInterest.scholarship_id)
+    ):
+        add(student_id, program_id, INTEREST_WEIGHT)
+    for student_id, program_id in await db.execute(
+        select(models.Likes.student_id, models.Feedback.scholarship_id)
+        .join(models.Feedback, models.Feedback.id == models.Likes.feedback_id)
+    ):
+        add(student_id, program_id, LIKE_WEIGHT)
+    for student_id, program_id, rating in await db.execute(
+        select(models.Feedback.student_id, models.Feedback.scholarship_id, models.Feedback.rating)
+    ):
+        add(student_id, program_id, REVIEW_WEIGHTS.get(rating, 0.0))
+
+    signals = Signals(
+        np.array(students, dtype=np.int64), np.array(targets, dtype=np.int64), np.array(weights, dtype=np.float32)
+    )
+    return [tuple(program[1:]) for program in programs], program_ids, student_ids, signals
+
+
+def compute(programs: list, student_count: int, signals: Signals, k: int = TOP_K) -> TopK:
+    import numpy as np
+
+    if not programs:
+        empty = np.zeros(0, dtype=np.int64)
+        return TopK(empty, empty, empty, np.zeros(0, dtype=np.float32))
+    return top_k(program_features(programs), signals, student_count, k)
+
+
+async def rebuild_recommendations(db: AsyncSession, k: int = TOP_K) -> dict:
+    import numpy as np
+
+    started = time.perf_counter()
+    programs, program_ids, student_ids, signals = await load_inputs(db)
+    # Hand the connection back while NumPy works; the matrix products run
+    # in a thread so the event loop keeps serving requests.
+    await db.rollback()
+    loaded = time.perf_counter()
+    result = await asyncio.to_thread(compute, programs, len(student_ids), signals, k)
+    computed = time.perf_counter()
+
+    await db.execute(delete(models.StudentRecommendation))
+    connection = await db.connection()
+    driver = (await connection.get_raw_connection()).driver_connection
+    for start in range(0, len(result.scores), COPY_BATCH_SIZE):
+        chunk = slice(start, start + COPY_BATCH_SIZE)
+        await driver.copy_records_to_table(
+            models.StudentRecommendation.__tablename__,
+            records=[
+                (student_ids[student], int(rank), program_ids[program], float(score))
+                for student, rank, program, score in zip(
+                    result.students[chunk], result.ranks[chunk], result.programs[chunk], result.scores[chunk]
+                )
+            ],
+            columns=["student_id", "rank", "scholarship_id", "score"],
+        )
+    await db.commit()
+
+    report = {
+        "programs": len(program_ids),
+        "students": len(student_ids),
+        "signals": len(signals.weights),
+        "students_with_recommendations": int(np.unique(result.students).size),
+        "rows": len(result.scores),
+        "load_seconds": round(loaded - started, 3),
+        "compute_seconds": round(computed - loaded, 3),
+        "store_seconds": round(time.perf_counter() - computed, 3),
+    }
+    logger.info("Rebuilt recommendations: %s", report)
+    return report
+
+
+@jobs.handler("recommendations.rebuild", timeout=REBUILD_TIMEOUT_SECONDS)
+async def rebuild_recommendations_job(payload: dict) -> dict:
+    async with SessionLocal() as db:
+        return await rebuild_recommendations(db)
+
+
+jobs.schedule("recommendations.rebuild", REBUILD_SECONDS)
+
+
+async def recommended_programs(db: AsyncSession, student_id: uuid.UUID | None, limit: int) -> list[tuple]:
+    """``(program, score)`` pairs, best first; empty when the student has no precomputed list."""
+    if student_id is None:
+        return []
+    recommendation = models.StudentRecommendation
+    result = await db.execute(
+        select(models.Scholarship, recommendation.score, recommendation.computed_at)
+        .join(recommendation, recommendation.scholarship_id == models.Scholarship.id)
+        .filter(recommendation.student_id == student_id)
+        .order_by(recommendation.rank)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def main(args) -> None:
+    init_engine()
+    async with SessionLocal() as db:
+        report = await rebuild_recommendations(db, k=args.top_k)
+    await dispose_engine()
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild student_recommendations from program features and student signals.")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Bulk registration of a student cohort in one transaction.
+
+Every row is validated against ``schemas.UserRegister`` first. Rows that fail
+validation, are not students, or conflict are skipped and reported with their
+row number (1 = first row). A conflict is an email that is already
+registered or that an earlier row of the batch claimed. Existing emails are
+looked up before hashing, so conflicts cost no bcrypt time.
+
+The remaining passwords are hashed across every password worker at once.
+``users`` and ``students`` then get one multi-row ``INSERT`` each, and a
+single commit. An email registered concurrently, between the lookup and the
+insert, is caught by ``ON CONFLICT DO NOTHING`` and reported like any other
+conflict.
+"""
+import uuid
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.auth.hash import password_hasher
+from app.bulk_import import validation_errors
+
+MAX_COHORT_SIZE = 1000
+
+EMAIL_TAKEN = "Email already registered"
+
+
+def _failure(row: int, message: str, field: str | None = None) -> dict:
+    return {"row": row, "errors": [{"field": field, "message": message}]}
+
+
+async def register_cohort(db: AsyncSession, rows: list[dict[str, Any]]) -> dict:
+    errors = []
+    accepted: dict[str, tuple[int, schemas.UserRegister]] = {}
+    for row, data in enumerate(rows, start=1):
+        try:
+            registration = schemas.UserRegister.model_validate(data)
+        except ValidationError as ex:
+            errors.append({"row": row, "errors": validation_errors(ex)})
+            continue
+        if registration.user_type != schemas.UserTypeEnum.student:
+            errors.append(_failure(row, "Only students can be registered in bulk", "user_type"))
+        elif registration.email in accepted:
+            errors.append(_failure(row, f"{EMAIL_TAKEN} by row {accepted[registration.email][0]}", "email"))
+        else:
+            accepted[registration.email] = (row, registration)
+
+    if accepted:
+        taken = await db.scalars(select(models.User.email).filter(models.User.email.in_(accepted)))
+        for email in taken:
+            errors.append(_failure(accepted.pop(email)[0], EMAIL_TAKEN, "email"))
+        # Hand the connection back while hashing, which can take seconds.
+        await db.rollback()
+
+    registered = []
+    if accepted:
+        pending = list(accepted.values())
+        hashes = await password_hasher.hash_many([registration.password for _, registration in pending])
+        users = [
+            {
+                "id": uuid.uuid4(),
+                "email": registration.email,
+                "full_name": registration.full_name,
+                "password": hashed,
+                "is_active": False,
+                "user_type": models.UserType.STUDENT,
+            }
+            for (_, registration), hashed in zip(pending, hashes)
+        ]
+        inserted = dict((await db.execute(
+            pg_insert(models.User)
+            .values(users)
+            .on_conflict_do_nothing(index_elements=[models.User.email])
+            .returning(models.User.email, models.User.id)
+        )).all())
+        students = []
+        for row, registration in pending:
+            user_id = inserted.get(registration.email)
+            if user_id is None:
+                errors.append(_failure(row, EMAIL_TAKEN, "email"))
+                continue
+            registered.append({"row": row, "id": user_id, "email": registration.email})
+            students.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "university": registration.university,
+                "username": registration.username,
+            })
+        if students:
+            await db.execute(insert(models.Student).values(students))
+        await db.commit()
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "registered": len(registered),
+        "failed": len(errors),
+        "users": registered,
+        "errors": errors,
+    }
@@ -0,0 +1,163 @@
+"""
+In-process snapshot of ``country_requirements``.
+
+The table is small and read far more often than it is written. Each worker
+therefore holds all of it in memory, and ``GET /requirements/{country}`` is a
+dict lookup returning a body encoded at load time, with no database work.
+
+A snapshot is never modified. A reload builds a new one and swaps the
+reference, so a reader sees either the old map or the new one, never a
+partial one.
+
+Every write bumps ``reference_data_versions['country_requirements']`` in its
+own transaction. The worker that wrote reloads straight after committing.
+Other workers compare versions every ``requirements_sync_seconds`` (one
+primary-key read) and reload only when the version has moved.
+"""
+import asyncio
+import hashlib
+import logging
+import uuid
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import metrics, models, schemas
+from app.config import get_settings
+from app.database import DATABASE_ERRORS, SessionLocal
+from app.responses import to_json
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = "country_requirements"
+
+
+class CountryEntry(NamedTuple):
+    requirements: tuple[schemas.CountryRequirementResponse, ...]
+    body: bytes
+    etag: str
+
+
+class RequirementsSnapshot(NamedTuple):
+    version: int | None  # None until the first load
+    countries: Mapping[str, CountryEntry]
+
+    def get(self, country: str) -> CountryEntry | None:
+        return self.countries.get(country.casefold())
+
+
+def build_snapshot(version: int, rows: Iterable[models.CountryRequirement]) -> RequirementsSnapshot:
+    grouped: dict[str, list[schemas.CountryRequirementResponse]] = {}
+    for row in rows:
+        requirement = schemas.CountryRequirementResponse.model_validate(row, from_attributes=True)
+        grouped.setdefault(requirement.country.casefold(), []).append(requirement)
+
+    countries = {}
+    for country, requirements in grouped.items():
+        requirements.sort(key=lambda requirement: requirement.document_type)
+        body = to_json(requirements)
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        countries[country] = CountryEntry(tuple(requirements), body, etag)
+    return RequirementsSnapshot(version, MappingProxyType(countries))
+
+
+async def current_version(db: AsyncSession) -> int:
+    version = await db.scalar(
+        select(models.ReferenceDataVersion.version).filter(models.ReferenceDataVersion.name == VERSION_NAME)
+    )
+    return version or 0
+
+
+async def bump_version(db: AsyncSession) -> int:
+    """Count a write; call it in the writing transaction, before the commit."""
+    version = models.ReferenceDataVersion
+    return await db.scalar(
+        insert(version)
+        .values(name=VERSION_NAME, version=1)
+        .on_conflict_do_update(index_elements=[version.name], set_={"version": version.version + 1})
+        .returning(version.version)
+    )
+
+
+async def upsert_requirements(
+    db: AsyncSession, country: str, requirements: Iterable[schemas.CountryRequirementCreate]
+) -> int:
+    """Insert or update one country's requirements in one statement; returns the row count."""
+    # ON CONFLICT may not touch one row twice in a statement, so a repeated
+    # document type keeps its last entry. Sorted for a stable row-lock order.
+    by_type = {requirement.document_type: requirement for requirement in requirements}
+    rows = [
+        {"id": uuid.uuid4(), "country": country, "document_type": document_type,
+         "description": requirement.description, "mandatory": requirement.mandatory}
+        for document_type, requirement in sorted(by_type.items())
+    ]
+    if not rows:
+        return 0
+
+    table = models.CountryRequirement
+    statement = insert(table).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[func.lower(table.country), table.document_type],
+        set_={"description": statement.excluded.description, "mandatory": statement.excluded.mandatory},
+    ))
+    await bump_version(db)
+    return len(rows)
+
+
+class RequirementsStore:
+    def __init__(self) -> None:
+        self.snapshot = RequirementsSnapshot(None, MappingProxyType({}))
+        self.reloads = 0
+
+    def get(self, country: str) -> CountryEntry | None:
+        return self.snapshot.get(country)
+
+    async def sync(self, db: AsyncSession) -> bool:
+        """Reload if the stored version moved; returns whether it did."""
+        # Read the version before the rows. A write committing in between then
+        # leaves rows newer than the version, and the next sync reloads again.
+        version = await current_version(db)
+        if version == self.snapshot.version:
+            return False
+        result = await db.execute(select(models.CountryRequirement))
+        self.snapshot = build_snapshot(version, result.scalars())
+        self.reloads += 1
+        return True
+
+
+requirements_store = RequirementsStore()
+
+
+async def load_requirements(store: RequirementsStore = requirements_store) -> None:
+    async with SessionLocal() as db:
+        await store.sync(db)
+
+
+async def maintain_requirements(store: RequirementsStore = requirements_store, interval: float | None = None) -> None:
+    """Background loop: pick up writes made by other workers."""
+    interval = interval or get_settings().requirements_sync_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await store.sync(db)
+        except DATABASE_ERRORS:
+            logger.exception("Country requirements snapshot sync failed")
+
+
+def _snapshot_metrics():
+    snapshot = requirements_store.snapshot
+    yield from metrics.gauge(
+        "requirements_snapshot_version", "Version of the loaded country requirements snapshot.",
+        snapshot.version if snapshot.version is not None else -1,
+    )
+    yield from metrics.gauge("requirements_snapshot_countries", "Countries in the loaded snapshot.", len(snapshot.countries))
+    yield from metrics.gauge(
+        "requirements_snapshot_reloads_total", "Country requirements snapshot reloads.", requirements_store.reloads, "counter"
+    )
+
+
+metrics.register_collector(_snapshot_metrics)
@@ -0,0 +1,23 @@
+"""
+JSON responses written straight from validated Pydantic models.
+
+For a route that returns data, FastAPI validates it against the
+``response_model``, dumps it to Python objects, and then encodes those. A
+route that already holds validated models can skip the first two steps:
+:func:`model_response` has pydantic-core write the JSON bytes in one pass.
+Such routes keep their ``response_model``, which still documents the body in
+OpenAPI.
+"""
+from typing import Any, Mapping
+
+import pydantic_core
+from fastapi import Response
+
+
+def to_json(value: Any) -> bytes:
+    """Encode models, or lists and dicts of them, to JSON bytes."""
+    return pydantic_core.to_json(value)
+
+
+def model_response(value: Any, status_code: int = 200, headers: Mapping[str, str] | None = None) -> Response:
+    return Response(content=to_json(value), status_code=status_code, media_type="application/json", headers=headers)
@@ -1,27 +1,39 @@
-from asyncio.log import logger
-from typing import Annotated, List
+from typing import Annotated, List, Literal, Mapping, NamedTuple
 from datetime import datetime
+import uuid
 from fastapi import (
     APIRouter,
     HTTPException,
     Depends,
-    BackgroundTasks,
     Request,
     Response,
     Cookie,
+    Body,
+    Query,
     status,
 )
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError
-import requests
-from sqlalchemy import UUID, delete, select
+import orjson
+from sqlalchemy import UUID, BigInteger, delete, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import contains_eager
 from pydantic import UUID4, BaseModel, ValidationError
-from app import schemas, models
+from app import (
+    bulk_import, database, jobs, schemas, models, metrics, pagination, ratings, recommendations, registration,
+    requirements, trending,
+)
+from app.trending import trending_programs
+from app.views import view_counter
 from app.auth import jwt
-from app.auth.hash import get_password_hash, verify_password
+from app.auth.hash import password_hasher
+from app.auth.revocation import revoked_tokens
+from app.cache import cached_json_response, etag_matches, response_cache
+from app.config import get_settings
+from app.discord_client import DiscordService, channel_creations, discord_service, get_discord
 from app.auth.jwt import (
     create_token_pair,
     refresh_token_state,
@@ -30,8 +42,10 @@ from app.auth.jwt import (
     JTI,
     EXP,
 )
-from app.database import get_db
-from app.exceptions import BadRequestException, NotFoundException
+from app.database import get_db, get_primary_db, read_sessionmaker
+from app.responses import model_response
+from app.exceptions import BadGatewayException, BadRequestException, NotFoundException, ServiceUnavailableException
+from app.utils import utcnow
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 from fastapi.security import OAuth2PasswordRequestForm
@@ -39,55 +53,89 @@ class TokenData(BaseModel):
     user_id: str
     user_type: str  # 'PARTNER', 'STUDENT', etc.
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    try:
-        logger.info(f"Received token: {token}")
 
-        payload = await jwt.decode_access_token(token, db)
-        logger.info(f"Decoded token payload: {payload}")
-        
-        user = TokenData(**payload)  # Parse user data from the token
-        logger.info(f"User data parsed from token: {user}")
-        
-        return user
-    except JWTError:
-        logger.error("Invalid token error")
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+class AuthContext(NamedTuple):
+    token: str
+    claims: Mapping  # verified JWT payload, read-only
+    user: TokenData
+
+
+async def get_auth_context(token: str = Depends(oauth2_scheme)) -> AuthContext:
+    """
+    The verified bearer token, its claims and the user they describe.
+
+    FastAPI resolves a dependency once per request, so a route and its other
+    dependencies share this result instead of decoding the token again.
+    Verification itself is cached across requests by ``jwt.verified_tokens``.
+    """
+    claims = await jwt.decode_access_token(token)
+    return AuthContext(token, claims, TokenData(**claims))
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    # Not layered on get_auth_context: every dependency level costs FastAPI
+    # tens of microseconds to resolve, and most routes only need the user.
+    return (await get_auth_context(token)).user
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
+
+async def get_optional_user(token: str | None = Depends(optional_oauth2_scheme)) -> TokenData | None:
+    """The caller when a bearer token is sent, None for anonymous requests."""
+    if not token:
+        return None
+    return (await get_auth_context(token)).user
 
 #users
 @router.post("/register", response_model=schemas.User,tags=["users"])
 async def register(
     data: schemas.UserRegister,
-    bg_task: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     # Hash password and prepare user data
     user_data = data.dict(exclude={"confirm_password", "university", "username", "phone_number", "website", "address", "country"})
-    user_data["password"] = get_password_hash(user_data["password"])
+    user_data["password"] = await password_hasher.hash(user_data["password"])
     user_data["user_type"] = data.user_type if data.user_type else "student"
 
     # Create the user
-    user = models.User(**user_data)
+    user = models.User(id=uuid.uuid4(), **user_data)
     user.is_active = False
-    await user.save(db=db)
 
     # Create student or partner based on the user_type
     if user.user_type == models.UserType.STUDENT:
         student_data = schemas.StudentCreate(user_id=user.id, university=data.university, username=data.username)
-        student = models.Student(**student_data.dict())
-        db.add(student)
-        db.commit()
+        db.add(models.Student(**student_data.dict()))
 
     elif user.user_type == models.UserType.PARTNER:
         partner_data = schemas.PartnerCreate(user_id=user.id, phone_number=data.phone_number, website=data.website, address=data.address, country=data.country)
-        partner = models.Partner(**partner_data.dict())
-        db.add(partner)
-        db.commit()
+        db.add(models.Partner(**partner_data.dict()))
 
+    # One commit for the user and its profile: both rows exist or neither does.
+    await user.save(db=db)
     return schemas.User.from_orm(user)
 
 
-@router.post("/login", tags=["users"])
+@router.post("/register/cohort", response_model=schemas.CohortRegistrationReport, tags=["users"])
+async def register_cohort(
+    rows: List[dict] = Body(..., max_length=registration.MAX_COHORT_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """
+    Register up to ``MAX_COHORT_SIZE`` students in one transaction.
+
+    Each row is a ``UserRegister`` body. Invalid rows and email conflicts are
+    skipped and listed in ``errors``; every other row is registered.
+    """
+    if current_user.user_type != 'partner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only partners can register students in bulk"
+        )
+    return await registration.register_cohort(db, rows)
+
+
+@router.post("/login", response_model=schemas.LoginResponse, tags=["users"])
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),  # Handles username/password and grant_type
     db: AsyncSession = Depends(get_db),
@@ -103,14 +151,13 @@ async def login(
     # Generate token pair
     token_pair = create_token_pair(user=schemas.User.from_orm(user))
 
-    return {
-        "access_token": token_pair.access.token,
-        "refresh_token": token_pair.refresh.token,  # Include refresh token in the response
-        "token_type": "bearer",
-    }
+    return schemas.LoginResponse(
+        access_token=token_pair.access.token,
+        refresh_token=token_pair.refresh.token,  # Include refresh token in the response
+    )
 
 
-@router.post("/refresh",tags=["users"])
+@router.post("/refresh", response_model=schemas.AccessTokenResponse, tags=["users"])
 async def refresh(refresh: Annotated[str | None, Cookie()] = None):
     print(refresh)
     if not refresh:
@@ -119,15 +166,16 @@ async def refresh(refresh: Annotated[str | None, Cookie()] = None):
 
 @router.post("/logout", response_model=schemas.SuccessResponseScheme,tags=["users"])
 async def logout(
-    token: Annotated[str, Depends(oauth2_scheme)],
+    auth: Annotated[AuthContext, Depends(get_auth_context)],
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    payload = await decode_access_token(token=token, db=db)
+    payload = auth.claims
     black_listed = models.BlackListToken(
         id=payload[JTI], expire=datetime.utcfromtimestamp(payload[EXP])
     )
     await black_listed.save(db=db)
+    revoked_tokens.add(payload[JTI], payload[EXP])
     return {"msg": "Successfully logged out"}
 
 @router.post("/password-reset", response_model=schemas.SuccessResponseScheme,tags=["users"])
@@ -136,40 +184,40 @@ async def password_reset_token(
     data: schemas.PasswordResetSchema,
     db: AsyncSession = Depends(get_db),
 ):
-    payload = await decode_access_token(token=token, db=db)
+    payload = await decode_access_token(token=token)
     user = await models.User.find_by_id(db=db, id=payload[SUB])
     if not user:
         raise NotFoundException(detail="User not found")
 
-    user.password = get_password_hash(data.password)
+    user.password = await password_hasher.hash(data.password)
     await user.save(db=db)
 
     return {"msg": "Password succesfully updated"}
 
 @router.post("/password-update", response_model=schemas.SuccessResponseScheme,tags=["users"])
 async def password_update(
-    token: Annotated[str, Depends(oauth2_scheme)],
+    auth: Annotated[AuthContext, Depends(get_auth_context)],
     data: schemas.PasswordUpdateSchema,
     db: AsyncSession = Depends(get_db),
 ):
-    payload = await decode_access_token(token=token, db=db)
+    payload = auth.claims
     user = await models.User.find_by_id(db=db, id=payload[SUB])
     if not user:
         raise NotFoundException(detail="User not found")
 
     # raise Validation error
-    if not verify_password(data.old_password, user.password):
+    if not await password_hasher.verify(data.old_password, user.password):
         try:
             schemas.OldPasswordErrorSchema(old_password=False)
         except ValidationError as e:
             raise RequestValidationError(e.raw_errors)
-    user.password = get_password_hash(data.password)
+    user.password = await password_hasher.hash(data.password)
     await user.save(db=db)
 
     return {"msg": "Successfully updated"}
 
 #Programs
-@router.post("/Programs/",tags=["Programs"])
+@router.post("/Programs/", response_model=schemas.ScholarshipDetail, tags=["Programs"])
 async def create_scholarship(
     scholarship_data: schemas.ScholarshipCreate,
     db: AsyncSession = Depends(get_db),
@@ -181,7 +229,7 @@ async def create_scholarship(
             detail="You do not have permission to add scholarships"
         )
     
-    partner = db.execute(
+    partner = await db.execute(
         select(models.Partner).filter(models.Partner.user_id == current_user.user_id)
     )
     partner = partner.scalars().first()
@@ -201,49 +249,302 @@ async def create_scholarship(
         funding_amount=scholarship_data.funding_amount,
         duration=scholarship_data.duration,
         status=scholarship_data.status,
-        partner_id=partner.id  # Associate the scholarship with the partner
+        partner_id=partner.id,  # Associate the scholarship with the partner
+        rating_summary=models.ScholarshipRatingSummary(),
     )
     
     db.add(scholarship)
-    db.commit()
-    db.refresh(scholarship)
-    return scholarship
-
-@router.get("/api/Programs",tags=["Programs"])
-async def get_scholarships(db: AsyncSession = Depends(get_db)):
-    try:
-        result = db.execute(select(models.Scholarship))
-        scholarships = result.scalars().all()
-        return scholarships
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    await db.commit()
+    await db.refresh(scholarship)
+    return schemas.ScholarshipDetail.model_validate(scholarship)
 
 
-@router.get("/api/Programs/filters",tags=["Programs"])
-async def get_scholarships_by_filters(
-    location: str = None,
-    field_of_study: str = None,
-    funding_type: str = None,
-    db: AsyncSession = Depends(get_db)
+@router.post("/Programs/import", response_model=schemas.BulkImportReport, tags=["Programs"])
+async def import_scholarships(
+    request: Request,
+    format: Literal["csv", "ndjson"] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
-    query = select(models.Scholarship)
+    """
+    Create many programs from a CSV (header row required) or NDJSON upload.
+
+    Valid rows are loaded with COPY in streaming batches and committed together.
+    Rows that fail validation are skipped and listed in ``errors``.
+    """
+    if current_user.user_type != 'partner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to add scholarships"
+        )
+    format = format or bulk_import.detect_format(request.headers.get("content-type"))
+    return await bulk_import.import_programs(db, current_user.user_id, format, request.stream())
+
+def filter_scholarships(query, location: str = None, field_of_study: str = None, funding_type: str = None):
     if location:
         query = query.filter(models.Scholarship.location == location)
     if field_of_study:
         query = query.filter(models.Scholarship.field_of_study == field_of_study)
     if funding_type:
         query = query.filter(models.Scholarship.funding_type == funding_type)
-    
-    scholarships =  db.execute(query)
-    return scholarships.scalars().all()
+    return query
+
+
+async def paginate_scholarships(
+    db: AsyncSession,
+    query,
+    cursor: str | None,
+    limit: int,
+    include_total: bool,
+    sort: str = "created_at",
+    min_rating: float | None = None,
+) -> schemas.ScholarshipPage:
+    """
+    Keyset page over ``(created_at, id)``, or best-rated first over
+    ``(average_rating, id)``; the cursor composes with any filters on ``query``.
+    """
+    summary = models.ScholarshipRatingSummary
+    if sort == "rating" or min_rating is not None:
+        # Every program has a summary row (see app.ratings), so the inner join
+        # drops nothing and lets the rating index drive the scan.
+        query = query.join(models.Scholarship.rating_summary).options(contains_eager(models.Scholarship.rating_summary))
+    if min_rating is not None:
+        query = query.filter(summary.average_rating >= min_rating)
+
+    if sort == "rating":
+        sort_key, parsers, descending = (summary.average_rating, summary.scholarship_id), (float, uuid.UUID), True
+    else:
+        sort_key, parsers, descending = (models.Scholarship.created_at, models.Scholarship.id), (datetime.fromisoformat, uuid.UUID), False
+
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    if cursor:
+        query = query.filter(pagination.after(sort_key, pagination.decode_cursor(cursor, *parsers), descending=descending))
+
+    order_by = [key.desc() for key in sort_key] if descending else sort_key
+    result = await db.execute(query.order_by(*order_by).limit(limit + 1))
+    scholarships = result.unique().scalars().all()
+
+    next_cursor = None
+    if len(scholarships) > limit:
+        scholarships = scholarships[:limit]
+        last = scholarships[-1]
+        if sort == "rating":
+            next_cursor = pagination.encode_cursor((repr(last.rating_summary.average_rating), last.id))
+        else:
+            next_cursor = pagination.encode_cursor((last.created_at.isoformat(), last.id))
+
+    return schemas.ScholarshipPage(items=scholarships, next_cursor=next_cursor, total=total)
+
+
+@router.get("/api/Programs", response_model=schemas.ScholarshipPage, tags=["Programs"])
+async def get_scholarships(
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    include_total: bool = False,
+    sort: Literal["created_at", "rating"] = "created_at",
+    min_rating: float = Query(None, ge=0, le=5),
+    db: AsyncSession = Depends(get_db),
+):
+    return model_response(await paginate_scholarships(
+        db, select(models.Scholarship), cursor, limit, include_total, sort=sort, min_rating=min_rating
+    ))
 
-@router.get("/api/Programs/{id}",tags=["Programs"])
-async def get_scholarship(id: UUID4, db: AsyncSession = Depends(get_db)):
-    scholarship =  db.execute(select(models.Scholarship).filter(models.Scholarship.id == id))
-    scholarship = scholarship.scalars().first()
-    if not scholarship:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scholarship not found")
-    return scholarship
+
+@router.get("/api/Programs/filters", response_model=schemas.ScholarshipPage, tags=["Programs"])
+async def get_scholarships_by_filters(
+    location: str = None,
+    field_of_study: str = None,
+    funding_type: str = None,
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    include_total: bool = False,
+    sort: Literal["created_at", "rating"] = "created_at",
+    min_rating: float = Query(None, ge=0, le=5),
+    db: AsyncSession = Depends(get_db)
+):
+    query = filter_scholarships(select(models.Scholarship), location, field_of_study, funding_type)
+    return model_response(
+        await paginate_scholarships(db, query, cursor, limit, include_total, sort=sort, min_rating=min_rating)
+    )
+
+@router.get("/api/Programs/search", response_model=schemas.ScholarshipPage, tags=["Programs"])
+async def search_scholarships(
+    q: str = Query(..., min_length=1, max_length=200),
+    location: str = None,
+    field_of_study: str = None,
+    funding_type: str = None,
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over program titles and descriptions, best match first.
+    """
+    ts_query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank(models.Scholarship.search_vector, ts_query)
+    sort_key = (rank, models.Scholarship.id)
+
+    query = select(models.Scholarship, rank.label("rank")).filter(
+        models.Scholarship.search_vector.op("@@")(ts_query)
+    )
+    query = filter_scholarships(query, location, field_of_study, funding_type)
+    if cursor:
+        query = query.filter(pagination.after(sort_key, pagination.decode_cursor(cursor, float, uuid.UUID), descending=True))
+
+    result = await db.execute(query.order_by(*(key.desc() for key in sort_key)).limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = pagination.encode_cursor((repr(rows[-1].rank), rows[-1].Scholarship.id))
+
+    return model_response(schemas.ScholarshipPage(items=[row.Scholarship for row in rows], next_cursor=next_cursor))
+
+
+@router.get("/api/Programs/recommended", response_model=schemas.RecommendationList, tags=["Programs"])
+async def get_recommended_scholarships(
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=recommendations.TOP_K),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """
+    Programs for the signed-in student, best match first, from the list
+    precomputed by the hourly recommendations job. Until a student has marked
+    an interest, liked or reviewed anything, the best-rated programs are
+    returned instead.
+    """
+    student_id = await db.scalar(select(models.Student.id).filter(models.Student.user_id == current_user.user_id))
+    rows = await recommendations.recommended_programs(db, student_id, limit)
+    if rows:
+        items = [
+            schemas.RecommendedProgram.model_validate(row.Scholarship).model_copy(update={"score": row.score})
+            for row in rows
+        ]
+        return model_response(schemas.RecommendationList(items=items, personalized=True, computed_at=rows[0].computed_at))
+
+    page = await paginate_scholarships(db, select(models.Scholarship), None, limit, False, sort="rating")
+    items = [schemas.RecommendedProgram.model_validate(program, from_attributes=True) for program in page.items]
+    return model_response(schemas.RecommendationList(items=items, personalized=False))
+
+
+@router.get("/api/Programs/trending", response_model=schemas.TrendingList, tags=["Programs"])
+async def get_trending_scholarships(
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=trending.MAX_TRENDING),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Programs with the most interest marks over the last
+    ``TRENDING_WINDOW_HOURS``, from the ranking each worker reloads every
+    ``TRENDING_FLUSH_SECONDS``.
+    """
+    ranking = trending_programs.top(limit)
+    programs = {}
+    if ranking:
+        result = await db.execute(
+            select(models.Scholarship).filter(models.Scholarship.id.in_([entry.scholarship_id for entry in ranking]))
+        )
+        programs = {program.id: program for program in result.scalars()}
+    items = [
+        schemas.TrendingProgram.model_validate(programs[entry.scholarship_id]).model_copy(
+            update={"interests": entry.interests}
+        )
+        # A program deleted since the last reload drops out here.
+        for entry in ranking if entry.scholarship_id in programs
+    ]
+    return model_response(schemas.TrendingList(items=items, refreshed_at=trending_programs.refreshed_at))
+
+
+@router.get("/api/Programs/views", response_model=schemas.ProgramViewsPage, tags=["Programs"])
+async def get_program_views(
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """
+    Detail view counts of the signed-in partner's programs, most viewed
+    first. Counts trail live traffic by up to ``VIEWS_FLUSH_SECONDS``.
+    """
+    if current_user.user_type != 'partner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only partners can see program views"
+        )
+    partner_id = await db.scalar(select(models.Partner.id).filter(models.Partner.user_id == current_user.user_id))
+    if partner_id is None:
+        raise NotFoundException(detail="Partner not found")
+
+    views = func.coalesce(models.ProgramViewCount.views, literal(0, BigInteger))
+    sort_key = (views, models.Scholarship.id)
+    query = (
+        select(models.Scholarship.id, models.Scholarship.title, views.label("views"))
+        .outerjoin(models.ProgramViewCount, models.ProgramViewCount.scholarship_id == models.Scholarship.id)
+        .filter(models.Scholarship.partner_id == partner_id)
+    )
+    if cursor:
+        seen, last_id = pagination.decode_cursor(cursor, int, uuid.UUID)
+        query = query.filter(pagination.after(sort_key, (literal(seen, BigInteger), last_id), descending=True))
+    rows = (await db.execute(query.order_by(*(key.desc() for key in sort_key)).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = pagination.encode_cursor((rows[-1].views, rows[-1].id))
+    items = [
+        schemas.ProgramViews(id=row.id, title=row.title, views=row.views + view_counter.pending_for(row.id))
+        for row in rows
+    ]
+    return model_response(schemas.ProgramViewsPage(items=items, next_cursor=next_cursor))
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+@router.get("/api/Programs/export", tags=["Programs"])
+async def export_scholarships(
+    location: str = None,
+    field_of_study: str = None,
+    funding_type: str = None,
+):
+    """
+    Stream the whole (optionally filtered) catalog as NDJSON, one program per line.
+    """
+    table = models.Scholarship.__table__
+    columns = [table.c[name] for name in schemas.Scholarship.model_fields if name in table.c]
+    query = filter_scholarships(select(*columns), location, field_of_study, funding_type)
+    query = query.order_by(models.Scholarship.created_at, models.Scholarship.id)
+
+    async def ndjson_lines():
+        # The session is owned by the generator rather than ``get_db`` so it
+        # stays open for as long as the response is being streamed.
+        async with read_sessionmaker()() as db:
+            result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                # default=str covers asyncpg's own UUID type, which orjson does not know.
+                yield b"".join(orjson.dumps(row._asdict(), default=str) + b"\n" for row in rows)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/api/Programs/{id}", response_model=schemas.ScholarshipDetail, tags=["Programs"])
+async def get_scholarship(id: UUID4, request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        scholarship = await db.execute(select(models.Scholarship).filter(models.Scholarship.id == id))
+        scholarship = scholarship.scalars().first()
+        if not scholarship:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scholarship not found")
+        return schemas.ScholarshipDetail.model_validate(scholarship).model_copy(
+            update={"views": await view_counter.views(db, id)}
+        )
+
+    response = await cached_json_response(request, ("program", str(id)), load)
+    # Counted in memory only, after the 404 check; see app.views.
+    view_counter.record(id)
+    return response
 @router.put("/api/Program/{id}", response_model=schemas.ScholarshipCreate,tags=["Programs"])
 async def update_scholarship(
     id: UUID4,
@@ -251,7 +552,7 @@ async def update_scholarship(
     db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user)
 ):
-    scholarship =  db.execute(select(models.Scholarship).filter(models.Scholarship.id == id))
+    scholarship = await db.execute(select(models.Scholarship).filter(models.Scholarship.id == id))
     scholarship = scholarship.scalars().first()
     if not scholarship:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scholarship not found")
@@ -262,17 +563,18 @@ async def update_scholarship(
     for key, value in scholarship_data.dict(exclude_unset=True).items():
         setattr(scholarship, key, value)
 
-    db.commit()
-    db.refresh(scholarship)
-    return scholarship
+    await db.commit()
+    response_cache.invalidate(("program", str(id)))
+    await db.refresh(scholarship)
+    return schemas.ScholarshipCreate.model_validate(scholarship)
 
-@router.delete("/api/Programs/{id}", tags=["Programs"])
-def delete_scholarship(
+@router.delete("/api/Programs/{id}", response_model=schemas.MessageResponse, tags=["Programs"])
+async def delete_scholarship(
     id: UUID4,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user)
 ):
-    scholarship_query = db.execute(
+    scholarship_query = await db.execute(
         select(models.Scholarship).filter(models.Scholarship.id == id)
     )
     scholarship = scholarship_query.scalars().first()
@@ -291,29 +593,31 @@ def delete_scholarship(
         )
 
     
-    db.delete(scholarship)
-    db.commit()
+    await db.delete(scholarship)
+    await db.commit()
+    response_cache.invalidate(("program", str(id)), ("tips", str(id)))
+    response_cache.invalidate_prefix(("reviews", str(id)))
 
     return {"message": "Scholarship deleted successfully"}
 
 #Reviews 
 import random
 
-@router.post("/Reviews/", tags=["Reviews"])
-def create_feedback(
+@router.post("/Reviews/", response_model=schemas.Review, tags=["Reviews"])
+async def create_feedback(
     feedback_data: schemas.FeedbackCreate,
-    db: Session = Depends(get_db),  # Use a synchronous `Session`
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     # Retrieve the student record
-    student_query = db.execute(
+    student_query = await db.execute(
         select(models.Student).filter(models.Student.user_id == current_user.user_id)
     )
     student = student_query.scalars().first()
     
     # Assign a random student ID if no student is found
     if not student:
-        random_student_query = db.execute(select(models.Student.id))
+        random_student_query = await db.execute(select(models.Student.id))
         random_student_ids = random_student_query.scalars().all()
         if not random_student_ids:
             raise HTTPException(
@@ -325,7 +629,7 @@ def create_feedback(
         student_id = student.id
     
     # Retrieve the scholarship record
-    scholarship_query = db.execute(
+    scholarship_query = await db.execute(
         select(models.Scholarship).filter(models.Scholarship.id == feedback_data.scholarship_id)
     )
     scholarship = scholarship_query.scalars().first()
@@ -346,22 +650,94 @@ def create_feedback(
         created_at=datetime.utcnow(),
     )
     db.add(feedback)
-    db.commit()
-    db.refresh(feedback)
-    return feedback
+    await ratings.record_rating(db, feedback_data.scholarship_id, feedback_data.rating)
+    await db.commit()
+    response_cache.invalidate(("program", str(feedback_data.scholarship_id)))
+    response_cache.invalidate_prefix(("reviews", str(feedback_data.scholarship_id)))
+    await db.refresh(feedback)
+    return schemas.Review.model_validate(feedback)
 
-@router.get("/api/Reviews/{scholarship_id}",tags=["Reviews"])
-async def get_feedback(id: UUID4, db: AsyncSession = Depends(get_db)):
-    feedback =  db.execute(select(models.Feedback).filter(models.Feedback.scholarship_id == id))
-    feedback = feedback.scalars().first()
-    if not feedback:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scholarship not found")
-    return feedback
+REVIEW_SORT_PARSERS = {"created_at": datetime.fromisoformat, "likes_count": int}
 
-@router.delete("/api/Reviews/{id}",tags=["Reviews"])
+
+async def list_reviews(
+    db: AsyncSession, scholarship_id: UUID4, sort: str, cursor: str | None, limit: int, user_id: str | None
+) -> schemas.ReviewPage:
+    """
+    One keyset page of a program's reviews, newest or most liked first, plus
+    two set-based lookups for the whole page: author usernames and, for a
+    signed-in user, which of the reviews they liked.
+    """
+    feedback = models.Feedback
+    sort_key = (getattr(feedback, sort), feedback.id)
+    query = select(feedback).filter(feedback.scholarship_id == scholarship_id)
+    if cursor:
+        values = pagination.decode_cursor(cursor, REVIEW_SORT_PARSERS[sort], uuid.UUID)
+        query = query.filter(pagination.after(sort_key, values, descending=True))
+
+    result = await db.execute(query.order_by(*(key.desc() for key in sort_key)).limit(limit + 1))
+    reviews = result.scalars().all()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        last_value = getattr(reviews[-1], sort)
+        next_cursor = pagination.encode_cursor(
+            (last_value.isoformat() if sort == "created_at" else last_value, reviews[-1].id)
+        )
+    if not reviews:
+        return schemas.ReviewPage(items=[], next_cursor=None)
+
+    authors = dict((await db.execute(
+        select(models.Student.id, models.Student.username)
+        .filter(models.Student.id.in_({review.student_id for review in reviews}))
+    )).all())
+
+    liked = set()
+    if user_id is not None:
+        liked = set((await db.scalars(
+            select(models.Likes.feedback_id).filter(
+                models.Likes.feedback_id.in_([review.id for review in reviews]),
+                models.Likes.student_id.in_(select(models.Student.id).filter(models.Student.user_id == user_id)),
+            )
+        )).all())
+
+    items = [
+        schemas.Review.model_validate(review).model_copy(
+            update={"author": authors.get(review.student_id), "liked_by_me": review.id in liked}
+        )
+        for review in reviews
+    ]
+    return schemas.ReviewPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/api/Reviews/{scholarship_id}", response_model=schemas.ReviewPage, tags=["Reviews"])
+async def get_feedback(
+    scholarship_id: UUID4,
+    request: Request,
+    sort: Literal["created_at", "likes_count"] = "created_at",
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData | None = Depends(get_optional_user),
+):
+    """
+    A program's reviews, newest (``sort=created_at``) or most liked
+    (``sort=likes_count``) first. Anonymous pages are cached; signed-in
+    requests are not, because ``liked_by_me`` differs per user.
+    """
+    if current_user is not None:
+        return model_response(await list_reviews(db, scholarship_id, sort, cursor, limit, current_user.user_id))
+
+    async def load():
+        return await list_reviews(db, scholarship_id, sort, cursor, limit, None)
+
+    return await cached_json_response(request, ("reviews", str(scholarship_id), sort, cursor, limit), load)
+
+@router.delete("/api/Reviews/{id}", response_model=schemas.MessageResponse, tags=["Reviews"])
 async def delete_feedback(id: UUID4, db: AsyncSession = Depends(get_db),current_user: TokenData = Depends(get_current_user),):
     
-    feedback = db.execute(select(models.Feedback).filter(models.Feedback.id == id))
+    feedback = await db.execute(select(models.Feedback).filter(models.Feedback.id == id))
     feedback = feedback.scalars().first()
     
     if not feedback:
@@ -374,68 +750,113 @@ async def delete_feedback(id: UUID4, db: AsyncSession = Depends(get_db),current_
         )
 
    
-    db.execute(delete(models.Likes).filter(models.Likes.feedback_id == id))
+    await db.execute(delete(models.Likes).filter(models.Likes.feedback_id == id))
     
    
-    db.delete(feedback)
-    db.commit()  # Commit the transaction
+    await db.delete(feedback)
+    await ratings.remove_rating(db, feedback.scholarship_id, feedback.rating)
+    await db.commit()  # Commit the transaction
+    response_cache.invalidate(("program", str(feedback.scholarship_id)))
+    response_cache.invalidate_prefix(("reviews", str(feedback.scholarship_id)))
     
     return {"message": "Feedback deleted successfully"}
-@router.post("/Reviews/{feedback_id}/like",tags=["Reviews"])
-async def add_like(
-    feedback_id: UUID4,
-    db: AsyncSession = Depends(get_db),
-    current_user: TokenData = Depends(get_current_user),
-):
-   
-    feedback_query = db.execute(
-        select(models.Feedback).filter(models.Feedback.id == feedback_id)
-    )
-    feedback = feedback_query.scalars().first()
-    if not feedback:
+async def raise_like_failure(db: AsyncSession, feedback_id: UUID4, user_id: str, liked: bool):
+    """Explain why a like/unlike statement touched no row. Only runs on the failure path."""
+    result = await db.execute(select(
+        select(models.Feedback.id).filter(models.Feedback.id == feedback_id).exists(),
+        select(models.Student.id).filter(models.Student.user_id == user_id).exists(),
+    ))
+    feedback_exists, student_exists = result.one()
+    if not feedback_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Feedback not found"
         )
-
-    
-    student_query = db.execute(
-        select(models.Student).filter(models.Student.user_id == current_user.user_id)
-    )
-    student = student_query.scalars().first()
-    if not student:
+    if not student_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found for the current user"
         )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="You have already liked this feedback" if liked else "You have not liked this feedback"
+    )
 
-    
-    like_query = db.execute(
-        select(models.Likes).filter(
-            models.Likes.feedback_id == feedback_id,
-            models.Likes.student_id == student.id,
+
+@router.post("/Reviews/{feedback_id}/like", response_model=schemas.LikeResponse, tags=["Reviews"])
+async def add_like(
+    feedback_id: UUID4,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    # One statement: insert the like unless it exists, and bump the counter
+    # only when a row was actually inserted.
+    inserted = (
+        insert(models.Likes)
+        .from_select(
+            ["id", "feedback_id", "student_id", "created_at"],
+            select(func.gen_random_uuid(), models.Feedback.id, models.Student.id, utcnow())
+            .join(models.Student, true())
+            .filter(
+                models.Feedback.id == feedback_id,
+                models.Student.user_id == current_user.user_id,
+            ),
         )
+        .on_conflict_do_nothing(constraint="uq_likes_feedback_id_student_id")
+        .returning(models.Likes.feedback_id)
+        .cte("inserted")
     )
-    existing_like = like_query.scalars().first()
-    if existing_like:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already liked this feedback"
-        )
-
-    
-    like = models.Likes(
-        feedback_id=feedback_id,
-        student_id=student.id
+    result = await db.execute(
+        update(models.Feedback)
+        .filter(models.Feedback.id.in_(select(inserted.c.feedback_id)))
+        .values(likes_count=func.coalesce(models.Feedback.likes_count, 0) + 1)
+        .returning(models.Feedback.likes_count, models.Feedback.scholarship_id)
+        .execution_options(synchronize_session=False)
     )
-    db.add(like)
+    updated = result.first()
+    if updated is None:
+        await db.rollback()
+        await raise_like_failure(db, feedback_id, current_user.user_id, liked=True)
+    await db.commit()
+    likes_count, scholarship_id = updated
+    response_cache.invalidate_prefix(("reviews", str(scholarship_id)))
 
-    
-    feedback.likes_count += 1
-    db.commit()
-    db.refresh(feedback)
+    return {"message": "Like added successfully", "likes_count": likes_count}
 
-    return {"message": "Like added successfully", "likes_count": models.Feedback.likes_count}
+
+@router.delete("/Reviews/{feedback_id}/like", response_model=schemas.LikeResponse, tags=["Reviews"])
+async def remove_like(
+    feedback_id: UUID4,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    deleted = (
+        delete(models.Likes)
+        .filter(
+            models.Likes.feedback_id == feedback_id,
+            models.Likes.student_id.in_(
+                select(models.Student.id).filter(models.Student.user_id == current_user.user_id)
+            ),
+        )
+        .returning(models.Likes.feedback_id)
+        .cte("deleted")
+    )
+    result = await db.execute(
+        update(models.Feedback)
+        .filter(models.Feedback.id.in_(select(deleted.c.feedback_id)))
+        .values(likes_count=func.greatest(func.coalesce(models.Feedback.likes_count, 0) - 1, 0))
+        .returning(models.Feedback.likes_count, models.Feedback.scholarship_id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.first()
+    if updated is None:
+        await db.rollback()
+        await raise_like_failure(db, feedback_id, current_user.user_id, liked=False)
+    await db.commit()
+    likes_count, scholarship_id = updated
+    response_cache.invalidate_prefix(("reviews", str(scholarship_id)))
+
+    return {"message": "Like removed successfully", "likes_count": likes_count}
 
 
 
@@ -446,69 +867,125 @@ class Scholarship(BaseModel):
     id: str
     title: str
 
-@router.post("/create-channel/", tags=["Discussions"])
+async def open_discussion_channel(discord: DiscordService, scholarship: Scholarship, user_id: str) -> dict:
+    channel = await discord.create_text_channel(
+        name=scholarship.title.replace(" ", "-").lower(),
+        topic=f"Discussion channel for {scholarship.title}",
+    )
+    # A session of its own: the creation is shared by every waiting caller and
+    # must not depend on the request that happened to start it.
+    async with database.SessionLocal() as db:
+        db.add(models.Discussion(
+            user_id=user_id,  # Link the discussion to the user
+            scholarship_id=scholarship.id,  # Link the discussion to the scholarship
+            channel_id=channel["id"],  # Discord channel ID
+        ))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # Another worker saved a channel for this program first: keep
+            # theirs and remove the one just created, off the request path.
+            await jobs.enqueue(db, "discord.delete_channel", {"channel_id": channel["id"]})
+            await db.commit()
+            existing = await db.scalar(
+                select(models.Discussion).filter(models.Discussion.scholarship_id == scholarship.id)
+            )
+            if existing is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="You already have a discussion channel",
+                )
+            return {"status": "Channel already exists", "channel_link": discord.channel_link(existing.channel_id)}
+
+    return {"status": "Channel created", "channel_link": discord.channel_link(channel["id"])}
+
+
+@router.post(
+    "/create-channel/",
+    response_model=schemas.ChannelLink,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.ChannelQueued}},
+    tags=["Discussions"],
+)
 async def create_channel(
     scholarship: Scholarship, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),  # Authorization handled here
+    discord: DiscordService = Depends(get_discord),
 ):
     """
     Create a Discord channel for a scholarship or retrieve the existing one.
     """
     # Check if a discussion already exists for the scholarship
-    existing_discussion = db.query(models.Discussion).filter(
-        models.Discussion.scholarship_id == scholarship.id
-    ).first()
+    existing_discussion = await db.execute(
+        select(models.Discussion).filter(models.Discussion.scholarship_id == scholarship.id)
+    )
+    existing_discussion = existing_discussion.scalars().first()
     
     if existing_discussion:
         # If the channel already exists, return the link
-        channel_id = existing_discussion.channel_id
-        channel_link = f"https://discord.com/channels/{DISCORD_GUILD_ID}/{channel_id}"
-        return {"status": "Channel already exists", "channel_link": channel_link}
-    
-    # Create a new Discord channel
-    url = f"https://discord.com/api/v10/guilds/{DISCORD_GUILD_ID}/channels"
-    headers = {
-        "Authorization": f"Bot {DISCORD_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "name": scholarship.title.replace(" ", "-").lower(),  # Channel name
-        "type": 0,  # Text channel
-        "topic": f"Discussion channel for {scholarship.title}"
-    }
-    
-    response = requests.post(url, json=payload, headers=headers)
-    
-    if response.status_code == 201:
-        # Save the new discussion to the database
-        channel_data = response.json()
-        new_discussion = models.Discussion(
-            user_id=current_user.user_id,  # Link the discussion to the user
-            scholarship_id=scholarship.id,  # Link the discussion to the scholarship
-            channel_id=channel_data["id"],  # Discord channel ID
+        return {"status": "Channel already exists", "channel_link": discord.channel_link(existing_discussion.channel_id)}
+
+    # Hand the connection back before waiting: the shared creation needs one
+    # of its own, and many waiters could otherwise drain the pool.
+    await db.close()
+    try:
+        # Concurrent requests for the same program share one creation.
+        return await channel_creations.run(
+            scholarship.id, lambda: open_discussion_channel(discord, scholarship, current_user.user_id)
+        )
+    except (ServiceUnavailableException, BadGatewayException):
+        # Discord is rate limiting or down: let a background job retry.
+        job_id = await jobs.enqueue(
+            db,
+            "discord.create_channel",
+            {"scholarship_id": scholarship.id, "title": scholarship.title, "user_id": current_user.user_id},
+            idempotency_key=f"discord.create_channel:{scholarship.id}",
+        )
+        await db.commit()
+        return model_response(
+            schemas.ChannelQueued(status="Channel creation queued", job_id=job_id),
+            status_code=status.HTTP_202_ACCEPTED,
         )
-        db.add(new_discussion)
-        db.commit()
-        
-        # Return the newly created channel's link
-        channel_link = f"https://discord.com/channels/{DISCORD_GUILD_ID}/{channel_data['id']}"
-        return {"status": "Channel created", "channel_link": channel_link}
-    else:
-        # Handle Discord API errors
-        raise HTTPException(status_code=response.status_code, detail=response.json())
 
-@router.get("/discussions/{scholarship_id}", tags=["Discussions"])
+
+@jobs.handler("discord.create_channel")
+async def create_channel_job(payload: dict) -> dict:
+    scholarship = Scholarship(id=payload["scholarship_id"], title=payload["title"])
+    async with database.SessionLocal() as db:
+        existing = await db.scalar(
+            select(models.Discussion).filter(models.Discussion.scholarship_id == scholarship.id)
+        )
+    if existing is not None:
+        return {"status": "Channel already exists", "channel_link": discord_service.channel_link(existing.channel_id)}
+    try:
+        return await channel_creations.run(
+            scholarship.id, lambda: open_discussion_channel(discord_service, scholarship, payload["user_id"])
+        )
+    except HTTPException as ex:
+        if ex.status_code < 500:
+            raise jobs.PermanentJobError(ex.detail)
+        raise
+
+
+@jobs.handler("discord.delete_channel")
+async def delete_channel_job(payload: dict) -> None:
+    await discord_service.delete_channel(payload["channel_id"])
+
+
+@router.get("/discussions/{scholarship_id}", response_model=schemas.ChannelLink, tags=["Discussions"])
 async def get_discussion_by_scholarship_id(
     scholarship_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),  # Authorization handled here
+    discord: DiscordService = Depends(get_discord),
 ):
     
     
-    scholarship = db.query(models.Scholarship).filter(
-        models.Scholarship.id == scholarship_id
-    ).first()
+    scholarship = await db.execute(
+        select(models.Scholarship).filter(models.Scholarship.id == scholarship_id)
+    )
+    scholarship = scholarship.scalars().first()
     
     if not scholarship:
         raise HTTPException(
@@ -516,9 +993,10 @@ async def get_discussion_by_scholarship_id(
             detail="Scholarship not found"
         )
     
-    existing_discussion = db.query(models.Discussion).filter(
-        models.Discussion.scholarship_id == scholarship_id
-    ).first()
+    existing_discussion = await db.execute(
+        select(models.Discussion).filter(models.Discussion.scholarship_id == scholarship_id)
+    )
+    existing_discussion = existing_discussion.scalars().first()
     
     if not existing_discussion:
         raise HTTPException(
@@ -527,40 +1005,87 @@ async def get_discussion_by_scholarship_id(
         )
     
     # Return the discussion link
-    channel_id = existing_discussion.channel_id
-    channel_link = f"https://discord.com/channels/{DISCORD_GUILD_ID}/{channel_id}"
-    return {"status": "Discussion found", "channel_link": channel_link}
+    return {"status": "Discussion found", "channel_link": discord.channel_link(existing_discussion.channel_id)}
+
+async def raise_interest_failure(db: AsyncSession, scholarship_id: UUID4, user_id: str):
+    """Explain why marking an interest inserted nothing, unless it was already marked."""
+    result = await db.execute(select(
+        select(models.Scholarship.id).filter(models.Scholarship.id == scholarship_id).exists(),
+        select(models.Student.id).filter(models.Student.user_id == user_id).exists(),
+    ))
+    scholarship_exists, student_exists = result.one()
+    if not student_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    if not scholarship_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scholarship not found")
+
 
-@router.post("/Programs/mark-interest/{scholarship_id}",tags=["Programs"])
+@router.post("/Programs/mark-interest/{scholarship_id}", response_model=schemas.MessageResponse, tags=["Programs"])
 async def add_interest(
-    scholarship_id: str,  
+    scholarship_id: UUID4,
     db: AsyncSession = Depends(get_db),  
     current_user: TokenData = Depends(get_current_user),  
 ):
+    # One statement; marking the same program again is a no-op.
+    result = await db.execute(
+        insert(models.StudentInterest)
+        .from_select(
+            ["student_id", "scholarship_id"],
+            select(models.Student.id, models.Scholarship.id)
+            .join(models.Scholarship, true())
+            .filter(
+                models.Student.user_id == current_user.user_id,
+                models.Scholarship.id == scholarship_id,
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["student_id", "scholarship_id"])
+        .returning(models.StudentInterest.created_at)
+    )
+    inserted = result.first()
+    await db.commit()
+    if inserted is None:
+        await raise_interest_failure(db, scholarship_id, current_user.user_id)
+        return {"message": "Interest already marked"}
+
+    # Counted in the bucket of the stored mark time, which removal reads back.
+    trending_programs.record(scholarship_id, now=inserted.created_at)
+    return {"message": "Interest successfully marked"}
 
-    student = db.execute(select(models.Student).filter(models.Student.user_id == current_user.user_id))
-    student = student.scalars().first()
-
-    if not student:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-
-   
 
-    student.interested = scholarship_id
-  
-    db.commit()
+@router.delete("/Programs/mark-interest/{scholarship_id}", response_model=schemas.MessageResponse, tags=["Programs"])
+async def remove_interest(
+    scholarship_id: UUID4,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    result = await db.execute(
+        delete(models.StudentInterest)
+        .filter(
+            models.StudentInterest.scholarship_id == scholarship_id,
+            models.StudentInterest.student_id.in_(
+                select(models.Student.id).filter(models.Student.user_id == current_user.user_id)
+            ),
+        )
+        .returning(models.StudentInterest.created_at)
+    )
+    removed = result.first()
+    await db.commit()
+    if removed is None:
+        await raise_interest_failure(db, scholarship_id, current_user.user_id)
+        return {"message": "Interest was not marked"}
 
-    return {"message": "Interest successfully marked"}
+    trending_programs.unrecord(scholarship_id, removed.created_at, get_settings().trending_window_hours)
+    return {"message": "Interest successfully removed"}
 
 
 
 
 
 #requirements
-@router.post("/requirements", tags=["Requirements"])
-def add_country_requirement(
+@router.post("/requirements", response_model=schemas.RequirementsUpserted, tags=["Requirements"])
+async def add_country_requirement(
     requirement: schemas.CountryRequirementsCreate,  # Accept a list of requirements
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.user_type != "partner":
@@ -569,49 +1094,44 @@ def add_country_requirement(
             detail="You do not have permission to delete this scholarship"
         )
     try:
-        
-        for req in requirement.requirements:
-            new_requirement = models.CountryRequirement(
-                country=requirement.country,  
-                document_type=req.document_type,
-                description=req.description,
-                mandatory=req.mandatory,
-            )
-            db.add(new_requirement)
-        
-        
-        db.commit()
-        
-        # If successful, return the list of created requirements
-        db.refresh(new_requirement)
-        return {"status": "Requirements added successfully.", "country": requirement.country}
-    
+        # Existing document types for the country are updated in place.
+        upserted = await requirements.upsert_requirements(db, requirement.country, requirement.requirements)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-@router.get("/requirements/{country}", tags=["Requirements"])
-def get_requirements_by_country(
-    country: str,
-    db: Session = Depends(get_db),
-):
-    result = db.execute(
-        select(models.CountryRequirement).filter(models.CountryRequirement.country.ilike(country))
-    )
-    requirements = result.scalars().all()
-    if not requirements:
+    await requirements.requirements_store.sync(db)
+    return {
+        "status": "Requirements added successfully.",
+        "country": requirement.country,
+        "upserted": upserted,
+        "version": requirements.requirements_store.snapshot.version,
+    }
+
+@router.get("/requirements/{country}", tags=["Requirements"], response_model=List[schemas.CountryRequirementResponse])
+async def get_requirements_by_country(country: str, request: Request):
+    # Served from the in-process snapshot: no database round trip.
+    entry = requirements.requirements_store.get(country)
+    if entry is None:
         raise HTTPException(
             status_code=404, detail=f"No requirements found for the country: {country}"
         )
-    return requirements
+    headers = {"ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 @router.put("/requirements/{requirement_id}", tags=["Requirements"], response_model=schemas.CountryRequirementResponse)
-def update_country_requirement(
+async def update_country_requirement(
     requirement_id: UUID4,  
     updated_data: schemas.CountryRequirementUpdate,  
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    requirement = db.query(models.CountryRequirement).filter(models.CountryRequirement.id == requirement_id).first()
+    requirement = await db.execute(
+        select(models.CountryRequirement).filter(models.CountryRequirement.id == requirement_id)
+    )
+    requirement = requirement.scalars().first()
     if not requirement:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -626,25 +1146,38 @@ def update_country_requirement(
     
     for key, value in updated_data.dict(exclude_unset=True).items():
         setattr(requirement, key, value)
+    # Read before the commit: a rollback expires the instance.
+    country, document_type = requirement.country, requirement.document_type
     
     try:
-        db.commit()
-        db.refresh(requirement)
-        return requirement  
+        await requirements.bump_version(db)
+        await db.commit()
+        await requirements.requirements_store.sync(db)
+        await db.refresh(requirement)
+        return schemas.CountryRequirementResponse.model_validate(requirement)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{country} already has a {document_type} requirement",
+        )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred: {str(e)}",
         )
 
 @router.delete("/requirements/{requirement_id}", tags=["Requirements"], response_model=schemas.CountryRequirementResponse)
-def delete_country_requirement(
+async def delete_country_requirement(
     requirement_id: UUID4,  
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    requirement = db.query(models.CountryRequirement).filter(models.CountryRequirement.id == requirement_id).first()
+    requirement = await db.execute(
+        select(models.CountryRequirement).filter(models.CountryRequirement.id == requirement_id)
+    )
+    requirement = requirement.scalars().first()
     if current_user.user_type != "partner":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -657,13 +1190,15 @@ def delete_country_requirement(
         )
     
     try:
-        db.delete(requirement)
-        db.commit()
+        await db.delete(requirement)
+        await requirements.bump_version(db)
+        await db.commit()
+        await requirements.requirements_store.sync(db)
 
-        return schemas.CountryRequirementResponse(**requirement.__dict__)  
+        return schemas.CountryRequirementResponse.model_validate(requirement)
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred: {str(e)}",
@@ -671,7 +1206,7 @@ def delete_country_requirement(
 
 
 #tips
-@router.post("/tips", tags=["Tips"])
+@router.post("/tips", response_model=schemas.TipSaved, tags=["Tips"])
 async def create_tip(
     tip_data: schemas.TipCreate,
     db: AsyncSession = Depends(get_db),
@@ -685,7 +1220,7 @@ async def create_tip(
         )
     
     
-    scholarship = db.execute(
+    scholarship = await db.execute(
         select(models.Scholarship).filter(models.Scholarship.id == tip_data.scholarship_id)
     )
     scholarship = scholarship.scalars().first()
@@ -705,31 +1240,35 @@ async def create_tip(
     )
 
     db.add(tip)
-    db.commit()
-    db.refresh(tip)
+    await db.commit()
+    response_cache.invalidate(("tips", str(tip_data.scholarship_id)))
+    await db.refresh(tip)
 
     return {"message": "Tip successfully shared", "tip_id": tip.id}
 @router.get("/tips/{scholarship_id}", tags=["Tips"], response_model=List[schemas.TipResponse])
 async def get_tips_by_scholarship(
     scholarship_id: UUID4,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    
-    result =  db.execute(
-        select(models.Tip).filter(models.Tip.scholarship_id == scholarship_id)
-    )
-    tips = result.scalars().all()
-
-    if not tips:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No tips found for the scholarship ID: {scholarship_id}"
+    async def load():
+        result = await db.execute(
+            select(models.Tip).filter(models.Tip.scholarship_id == scholarship_id)
         )
+        tips = result.scalars().all()
+
+        if not tips:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No tips found for the scholarship ID: {scholarship_id}"
+            )
+
+        return [schemas.TipResponse.model_validate(tip, from_attributes=True) for tip in tips]
 
-    return tips
+    return await cached_json_response(request, ("tips", str(scholarship_id)), load)
 
 
-@router.put("/tips/{tip_id}", tags=["Tips"])
+@router.put("/tips/{tip_id}", response_model=schemas.TipSaved, tags=["Tips"])
 async def update_tip(
     tip_id: UUID4,
     update_data: schemas.TipUpdate,
@@ -740,7 +1279,7 @@ async def update_tip(
     Update an existing tip. Only the user who created the tip can update it.
     """
    
-    result = db.execute(
+    result = await db.execute(
         select(models.Tip).filter(models.Tip.id == tip_id)
     )
     tip = result.scalars().first()
@@ -766,7 +1305,47 @@ async def update_tip(
         tip.content = update_data.content
 
     
-    db.commit()
-    db.refresh(tip)
+    await db.commit()
+    response_cache.invalidate(("tips", str(tip.scholarship_id)))
+    await db.refresh(tip)
 
     return {"message": "Tip successfully updated", "tip_id": tip.id}
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobStatus, tags=["Jobs"])
+async def get_job(
+    job_id: UUID4,
+    db: AsyncSession = Depends(get_primary_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Progress of background work a route accepted with 202."""
+    job = await db.get(models.Job, job_id)
+    if job is None:
+        raise NotFoundException(detail="Job not found")
+    return schemas.JobStatus.model_validate(job)
+
+
+@router.get("/metrics", tags=["Monitoring"], include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/health/ready", response_model=schemas.Readiness, tags=["Monitoring"])
+async def readiness(response: Response):
+    """
+    Ready while the primary answers and its pool still has a free connection.
+    Replica problems are reported but do not fail the check: reads fall back.
+    """
+    pools = {}
+    for role, target in (("primary", database.engine), ("replica", database.replica_engine)):
+        if target is None:
+            continue
+        pool = database.pool_status(target)
+        # A saturated pool would make the ping itself queue for pool_timeout.
+        pool["reachable"] = pool["saturation"] < 1 and await database.ping(target)
+        pools[role] = pool
+
+    ready = bool(pools) and pools["primary"]["reachable"]
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "unavailable", "pools": pools}
@@ -1,8 +1,8 @@
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel, UUID4, root_validator, validator, EmailStr
+from pydantic import BaseModel, Field, UUID4, root_validator, validator, EmailStr
 
 class UserTypeEnum(str, Enum):
     student = "student"
@@ -93,26 +93,133 @@ class ScholarshipCreate(BaseModel):
     class Config:
         orm_mode = True
 
+class ImportRowError(BaseModel):
+    field: Optional[str] = None  # None when the whole row is unreadable
+    message: str
+
+
+class ImportRowReport(BaseModel):
+    row: int  # 1 is the first data row
+    errors: List[ImportRowError]
+
+
+class BulkImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowReport]
+    errors_truncated: bool  # True when more rows failed than are listed
+
+
+class RegisteredUser(BaseModel):
+    row: int
+    id: UUID4
+    email: EmailStr
+
+
+class CohortRegistrationReport(BaseModel):
+    registered: int
+    failed: int
+    users: List[RegisteredUser]
+    errors: List[ImportRowReport]  # validation failures and email conflicts
+
+
 class FeedbackCreate(BaseModel):
     scholarship_id: UUID4
-    rating: int  
+    rating: int = Field(..., ge=1, le=5)
     review: str  
     tips_on_applying: str  
 
+class RatingSummary(BaseModel):
+    rating_count: int
+    rating_sum: int
+    average: Optional[float] = None  # None until the program has a review
+    histogram: Dict[int, int]  # stars (1-5) -> number of reviews
+
+    class Config:
+        from_attributes = True
+
+
+class Review(BaseModel):
+    id: UUID4
+    scholarship_id: UUID4
+    student_id: UUID4
+    rating: int
+    review: Optional[str] = None
+    tips_on_applying: Optional[str] = None
+    created_at: datetime
+    likes_count: int = 0
+    author: Optional[str] = None  # the reviewer's username
+    liked_by_me: bool = False  # always False for anonymous requests
+
+    class Config:
+        from_attributes = True
+
+
+class ReviewPage(BaseModel):
+    items: List[Review]
+    next_cursor: Optional[str] = None  # None on the last page
+
+
 class Scholarship(BaseModel):
+    # Output schema: every column but id is nullable, and one legacy NULL
+    # must not fail validation of a whole page.
     id: UUID4
-    title: str
-    description: str
-    location: str
-    application_link: str
-    field_of_study: str
-    funding_type: str
-    funding_amount: float
-    duration: int
-    status: str = "open"
+    title: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    application_link: Optional[str] = None
+    field_of_study: Optional[str] = None
+    funding_type: Optional[str] = None
+    funding_amount: Optional[float] = None
+    duration: Optional[int] = None
+    status: Optional[str] = "open"
+    rating_summary: Optional[RatingSummary] = None
 
     class Config:
         orm_mode = True
+        from_attributes = True
+
+
+class ScholarshipDetail(Scholarship):
+    partner_id: Optional[UUID4] = None
+    created_at: datetime
+    views: int = 0  # detail views; may trail by the flush interval and cache TTL
+
+
+class ProgramViews(BaseModel):
+    id: UUID4
+    title: Optional[str] = None
+    views: int
+
+
+class ProgramViewsPage(BaseModel):
+    items: List[ProgramViews]
+    next_cursor: Optional[str] = None  # None on the last page
+
+
+class RecommendedProgram(Scholarship):
+    score: Optional[float] = None  # similarity to the student's profile; None for fallback items
+
+
+class RecommendationList(BaseModel):
+    items: List[RecommendedProgram]
+    personalized: bool  # False: the student has no signals yet, so best-rated programs
+    computed_at: Optional[datetime] = None  # when the personalized list was rebuilt
+
+
+class TrendingProgram(Scholarship):
+    interests: int = 0  # net interest marks within the window
+
+
+class TrendingList(BaseModel):
+    items: List[TrendingProgram]
+    refreshed_at: Optional[datetime] = None  # when this worker last reloaded the ranking
+
+
+class ScholarshipPage(BaseModel):
+    items: List[Scholarship]
+    next_cursor: Optional[str] = None  # None on the last page
+    total: Optional[int] = None  # Only computed when include_total=true
 
 class TipCreate(BaseModel):
     title: str
@@ -169,6 +276,22 @@ class CountryRequirementUpdate(BaseModel):
     class Config:
         orm_mode = True
 
+class JobStatus(BaseModel):
+    id: UUID
+    kind: str
+    status: str  # queued, running, succeeded or failed
+    attempts: int
+    max_attempts: int
+    run_at: datetime  # next attempt, while queued
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class JwtTokenSchema(BaseModel):
     token: str
     payload: dict
@@ -188,6 +311,60 @@ class SuccessResponseScheme(BaseModel):
     msg: str
 
 
+class MessageResponse(BaseModel):
+    message: str
+
+
+class LoginResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+
+class AccessTokenResponse(BaseModel):
+    token: str
+
+
+class LikeResponse(MessageResponse):
+    likes_count: int
+
+
+class TipSaved(MessageResponse):
+    tip_id: UUID4
+
+
+class ChannelLink(BaseModel):
+    status: str
+    channel_link: str
+
+
+class ChannelQueued(BaseModel):
+    status: str
+    job_id: UUID4  # poll GET /jobs/{job_id}
+
+
+class RequirementsUpserted(BaseModel):
+    status: str
+    country: str
+    upserted: int
+    version: int  # reference data version after the write
+
+
+class PoolStatus(BaseModel):
+    size: int
+    max_overflow: int
+    in_use: int
+    idle: int
+    overflow: int
+    saturation: float
+    reachable: bool
+
+
+class Readiness(BaseModel):
+    status: str  # ready or unavailable
+    pools: Dict[str, PoolStatus]
+
+
 class BlackListToken(BaseModel):
     id: UUID4
     expire: datetime
@@ -0,0 +1,189 @@
+"""
+Trending programs: the most interest marks over a sliding window.
+
+Marking an interest only bumps a counter in this worker's memory, keyed by
+program and hour. Every ``trending_flush_seconds`` the maintenance loop
+does two things:
+1. It merges the pending counts into ``program_interest_buckets`` with one
+   upsert.
+2. It reloads the top programs over the last ``trending_window_hours``. The
+   query sums a few hourly buckets through the primary key.
+The endpoint serves that snapshot from memory. No request runs a
+``GROUP BY`` over interests, and a mark shows in the ranking within one
+flush interval.
+
+Pending counts are flushed once more on shutdown. A crashed worker loses at
+most one interval of marks from the ranking. The marks themselves are safe
+in ``student_interests``. Buckets older than the window are deleted by a
+scheduled job.
+"""
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import jobs, metrics, models
+from app.config import Settings, get_settings
+from app.database import DATABASE_ERRORS, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+BUCKET = timedelta(hours=1)
+# Programs kept in the ranking snapshot; the endpoint's limit is capped here.
+MAX_TRENDING = 100
+PURGE_SECONDS = 3600
+
+
+class TrendingEntry(NamedTuple):
+    scholarship_id: uuid.UUID
+    interests: int
+
+
+def bucket_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def window_start(window_hours: int, now: datetime | None = None) -> datetime:
+    """Start of the oldest bucket the ranking counts."""
+    return bucket_start(now or datetime.utcnow()) - BUCKET * (window_hours - 1)
+
+
+class TrendingPrograms:
+    def __init__(self) -> None:
+        # (bucket start, program) -> marks not yet written to Postgres.
+        self._pending: Counter[tuple[datetime, uuid.UUID]] = Counter()
+        self.ranking: tuple[TrendingEntry, ...] = ()
+        self.refreshed_at: datetime | None = None
+        self.flushes = 0
+        self.flush_failures = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, scholarship_id: uuid.UUID, delta: int = 1, now: datetime | None = None) -> None:
+        self._pending[(bucket_start(now or datetime.utcnow()), scholarship_id)] += delta
+
+    def unrecord(
+        self, scholarship_id: uuid.UUID, marked_at: datetime, window_hours: int, now: datetime | None = None
+    ) -> None:
+        """
+        Take back a removed mark from the bucket it was counted in.
+
+        A mark older than the window no longer counts in the ranking. It is
+        left alone: subtracting it from a current bucket would understate the
+        program's recent marks.
+        """
+        if bucket_start(marked_at) >= window_start(window_hours, now):
+            self.record(scholarship_id, -1, now=marked_at)
+
+    def top(self, limit: int) -> tuple[TrendingEntry, ...]:
+        return self.ranking[:limit]
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Merge pending counts into their buckets in one statement; returns the rows written."""
+        pending = {key: delta for key, delta in self._pending.items() if delta}
+        self._pending = Counter()
+        if not pending:
+            return 0
+        bucket = models.ProgramInterestBucket
+        statement = insert(bucket).values([
+            {"bucket_start": start, "scholarship_id": scholarship_id, "count": delta}
+            for (start, scholarship_id), delta in pending.items()
+        ])
+        try:
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=[bucket.bucket_start, bucket.scholarship_id],
+                set_={"count": bucket.count + statement.excluded["count"]},
+            ))
+            await db.commit()
+        except BaseException:
+            # Any failure keeps the counts for the next flush, including a
+            # dropped connection or cancellation at shutdown. Marks made
+            # meanwhile add up.
+            self._pending.update(pending)
+            self.flush_failures += 1
+            raise
+        self.flushes += 1
+        return len(pending)
+
+    async def refresh(self, db: AsyncSession, window_hours: int) -> None:
+        bucket = models.ProgramInterestBucket
+        since = window_start(window_hours)
+        total = func.sum(bucket.count).label("interests")
+        rows = await db.execute(
+            select(bucket.scholarship_id, total)
+            .filter(bucket.bucket_start >= since)
+            .group_by(bucket.scholarship_id)
+            .having(total > 0)
+            .order_by(total.desc(), bucket.scholarship_id)
+            .limit(MAX_TRENDING)
+        )
+        self.ranking = tuple(TrendingEntry(scholarship_id, int(count)) for scholarship_id, count in rows)
+        self.refreshed_at = datetime.utcnow()
+
+    async def sync(self, db: AsyncSession, settings: Settings | None = None) -> None:
+        settings = settings or get_settings()
+        await self.flush(db)
+        await self.refresh(db, settings.trending_window_hours)
+
+
+trending_programs = TrendingPrograms()
+
+
+async def load_trending(store: TrendingPrograms = trending_programs) -> None:
+    async with SessionLocal() as db:
+        await store.refresh(db, get_settings().trending_window_hours)
+
+
+async def maintain_trending(store: TrendingPrograms = trending_programs, interval: float | None = None) -> None:
+    """Background loop: write this worker's counts and reload the ranking."""
+    interval = interval or get_settings().trending_flush_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await store.sync(db)
+        except DATABASE_ERRORS:
+            logger.exception("Trending programs sync failed")
+
+
+async def flush_trending(store: TrendingPrograms = trending_programs) -> None:
+    """Final flush on shutdown."""
+    try:
+        async with SessionLocal() as db:
+            await store.flush(db)
+    except DATABASE_ERRORS:
+        logger.exception("Trending programs final flush failed; %d counts lost", store.pending)
+
+
+@jobs.handler("trending.purge_buckets")
+async def purge_buckets_job(payload: dict) -> dict:
+    bucket = models.ProgramInterestBucket
+    cutoff = bucket_start(datetime.utcnow()) - BUCKET * get_settings().trending_window_hours
+    async with SessionLocal() as db:
+        result = await db.execute(delete(bucket).filter(bucket.bucket_start < cutoff))
+        await db.commit()
+    return {"purged": result.rowcount}
+
+
+jobs.schedule("trending.purge_buckets", PURGE_SECONDS)
+
+
+def _trending_metrics():
+    yield from metrics.gauge("trending_pending_counts", "Program-hour counts waiting for the next flush.", trending_programs.pending)
+    yield from metrics.gauge("trending_flushes_total", "Interest count flushes to Postgres.", trending_programs.flushes, "counter")
+    yield from metrics.gauge(
+        "trending_flush_failures_total", "Interest count flushes that failed and were retried.",
+        trending_programs.flush_failures, "counter",
+    )
+    yield from metrics.gauge("trending_ranked_programs", "Programs in the loaded trending ranking.", len(trending_programs.ranking))
+
+
+metrics.register_collector(_trending_metrics)
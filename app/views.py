@@ -0,0 +1,120 @@
+"""
+Write-behind program view counters.
+
+``GET /api/Programs/{id}`` is the hottest read, so it must not write. A
+view only bumps a counter in this worker's memory. Every
+``views_flush_seconds`` the maintenance loop merges all pending counts into
+``program_view_counts`` with one multi-row
+``INSERT ... ON CONFLICT DO UPDATE``. However many views arrive, each
+worker writes at most once per interval.
+
+Loss window: pending counts are flushed once more on shutdown, so a clean
+restart loses nothing. A worker killed without shutdown loses at most the
+views of its last ``views_flush_seconds``. A failed flush keeps its counts
+for the next one.
+
+Readers add this worker's pending counts to the stored total, so other
+workers' views show up within one interval. The program detail body is
+also cached (see app.cache), so its count can trail by the cache TTL too.
+"""
+import asyncio
+import logging
+import uuid
+from collections import Counter
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import metrics, models
+from app.config import get_settings
+from app.database import DATABASE_ERRORS, SessionLocal
+from app.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self) -> None:
+        self._pending: Counter[uuid.UUID] = Counter()
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_failures = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, scholarship_id: uuid.UUID) -> None:
+        self._pending[scholarship_id] += 1
+        self.recorded += 1
+
+    def pending_for(self, scholarship_id: uuid.UUID) -> int:
+        return self._pending.get(scholarship_id, 0)
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Merge pending counts in one statement; returns the programs written."""
+        pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        table = models.ProgramViewCount
+        statement = insert(table).values([
+            {"scholarship_id": scholarship_id, "views": views} for scholarship_id, views in pending.items()
+        ])
+        try:
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=[table.scholarship_id],
+                set_={"views": table.views + statement.excluded.views, "updated_at": utcnow()},
+            ))
+            await db.commit()
+        except BaseException:
+            # Any failure puts the counts back, including a dropped connection
+            # or cancellation at shutdown. Views recorded meanwhile add up.
+            self._pending.update(pending)
+            self.flush_failures += 1
+            raise
+        self.flushes += 1
+        return len(pending)
+
+    async def views(self, db: AsyncSession, scholarship_id: uuid.UUID) -> int:
+        stored = await db.scalar(
+            select(models.ProgramViewCount.views).filter(models.ProgramViewCount.scholarship_id == scholarship_id)
+        )
+        return (stored or 0) + self.pending_for(scholarship_id)
+
+
+view_counter = ViewCounter()
+
+
+async def maintain_views(counter: ViewCounter = view_counter, interval: float | None = None) -> None:
+    """Background loop: write this worker's view counts."""
+    interval = interval or get_settings().views_flush_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await counter.flush(db)
+        except DATABASE_ERRORS:
+            logger.exception("Program view count flush failed")
+
+
+async def flush_views(counter: ViewCounter = view_counter) -> None:
+    """Final flush on shutdown."""
+    try:
+        async with SessionLocal() as db:
+            await counter.flush(db)
+    except DATABASE_ERRORS:
+        logger.exception("Program view count final flush failed; %d programs' counts lost", counter.pending)
+
+
+def _view_metrics():
+    yield from metrics.gauge("program_views_recorded_total", "Program detail views counted by this worker.", view_counter.recorded, "counter")
+    yield from metrics.gauge("program_views_pending", "Programs with views waiting for the next flush.", view_counter.pending)
+    yield from metrics.gauge("program_views_flushes_total", "View count flushes to Postgres.", view_counter.flushes, "counter")
+    yield from metrics.gauge(
+        "program_views_flush_failures_total", "View count flushes that failed and were retried.",
+        view_counter.flush_failures, "counter",
+    )
+
+
+metrics.register_collector(_view_metrics)
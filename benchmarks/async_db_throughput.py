@@ -0,0 +1,117 @@
+"""Concurrent-request throughput: blocking Session vs AsyncSession.
+
+Two throwaway FastAPI apps serve the same ``async def`` route that runs a slow
+query (``pg_sleep``). The "sync" app uses a blocking psycopg2 ``Session`` the
+way the routers used to; the "async" app uses an ``AsyncSession`` configured
+like ``app.database``. Both pools are sized to the concurrency level so only
+event-loop blocking differs, and both apps are driven in-process with the same
+number of concurrent httpx requests.
+
+    python -m benchmarks.async_db_throughput --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+
+DATABASE_URL = get_settings().database_url
+
+SLOW_QUERY = text("SELECT pg_sleep(:seconds)")
+
+
+def build_sync_app(seconds: float, pool_size: int) -> FastAPI:
+    sync_engine = create_engine(
+        DATABASE_URL.replace("+asyncpg", "+psycopg2"),
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+
+    def get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    bench = FastAPI()
+
+    @bench.get("/slow")
+    async def slow(db: Session = Depends(get_db)):
+        db.execute(SLOW_QUERY, {"seconds": seconds})
+        return {"ok": True}
+
+    return bench
+
+
+def build_async_app(seconds: float, pool_size: int) -> FastAPI:
+    async_engine = create_async_engine(DATABASE_URL, pool_size=pool_size, max_overflow=0)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    bench = FastAPI()
+
+    @bench.get("/slow")
+    async def slow(db: AsyncSession = Depends(get_db)):
+        await db.execute(SLOW_QUERY, {"seconds": seconds})
+        return {"ok": True}
+
+    return bench
+
+
+async def drive(bench: FastAPI, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=bench)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.get("/slow")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {"seconds": round(elapsed, 3), "rps": round(requests / elapsed, 1)}
+
+
+async def main(args) -> None:
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "query_seconds": args.query_seconds,
+        "sync_session": await drive(
+            build_sync_app(args.query_seconds, args.concurrency),
+            args.requests,
+            args.concurrency,
+        ),
+        "async_session": await drive(
+            build_async_app(args.query_seconds, args.concurrency),
+            args.requests,
+            args.concurrency,
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query-seconds", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
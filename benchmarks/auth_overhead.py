@@ -0,0 +1,96 @@
+"""Bearer-token authentication cost per request, with and without the verified-token cache.
+
+It times ``decode_access_token`` on its own, first with the cache disabled
+(a full HMAC check and jose parse every call) and then warm. It then times
+requests through a bare FastAPI app whose route depends on
+``get_current_user``. Subtracting an unauthenticated twin route leaves only
+the auth overhead. No database is needed.
+
+    python -m benchmarks.auth_overhead --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app import schemas
+from app.auth.jwt import create_token_pair, decode_access_token, verified_tokens
+from app.routers import TokenData, get_current_user
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/anonymous")
+    async def anonymous():
+        return {}
+
+    @app.get("/authenticated")
+    async def authenticated(user: TokenData = Depends(get_current_user)):
+        return {}
+
+    return app
+
+
+async def time_decode(token: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await decode_access_token(token)
+    return (time.perf_counter() - started) / iterations
+
+
+async def time_requests(client: httpx.AsyncClient, path: str, headers: dict, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+    return (time.perf_counter() - started) / requests
+
+
+async def main(args) -> None:
+    logging.disable(logging.INFO)
+    user = schemas.User(id=uuid.uuid4(), email="bench@example.com", full_name="Bench", user_type="student")
+    token = create_token_pair(user).access.token
+    headers = {"Authorization": f"Bearer {token}"}
+    max_entries = verified_tokens.max_entries
+
+    verified_tokens.max_entries = 0
+    verified_tokens.clear()
+    decode_cold = await time_decode(token, args.iterations)
+    verified_tokens.max_entries = max_entries
+    await decode_access_token(token)
+    decode_warm = await time_decode(token, args.iterations)
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await time_requests(client, "/anonymous", {}, 200)  # warm up
+        anonymous = await time_requests(client, "/anonymous", {}, args.requests)
+        verified_tokens.max_entries = 0
+        verified_tokens.clear()
+        cold = await time_requests(client, "/authenticated", headers, args.requests)
+        verified_tokens.max_entries = max_entries
+        warm = await time_requests(client, "/authenticated", headers, args.requests)
+
+    print(json.dumps({
+        "iterations": args.iterations,
+        "decode_us_uncached": round(decode_cold * 1e6, 2),
+        "decode_us_cached": round(decode_warm * 1e6, 2),
+        "requests": args.requests,
+        "request_us_anonymous": round(anonymous * 1e6, 1),
+        "auth_overhead_us_uncached": round((cold - anonymous) * 1e6, 1),
+        "auth_overhead_us_cached": round((warm - anonymous) * 1e6, 1),
+        "cache_hits": verified_tokens.hits,
+        "cache_misses": verified_tokens.misses,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    asyncio.run(main(parser.parse_args()))
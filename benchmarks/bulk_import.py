@@ -0,0 +1,126 @@
+"""Bulk program import: throughput and memory for a large CSV or NDJSON upload.
+
+Seeds one partner, then streams ``--rows`` generated programs to
+``POST /Programs/import`` in 64KB chunks. The body is generated as it is sent and
+never held whole, so peak RSS shows what the import itself keeps in memory.
+Every ``--bad-every``-th row is invalid and has to come back in the error report.
+Seeded rows are removed at the end.
+
+    python -m benchmarks.bulk_import --rows 100000 --format csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import resource
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app import models, schemas
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+from app.main import app
+
+CHUNK_BYTES = 64 * 1024
+FIELDS = ("title", "description", "location", "application_link", "field_of_study",
+          "funding_type", "funding_amount", "duration")
+
+
+def program(i: int, tag: str, bad: bool) -> dict:
+    return {
+        "title": f"Import {tag} {i}",
+        "description": f"Generated program {i}, with a comma and \"quotes\"\nover two lines.",
+        "location": ("Paris", "Berlin", "Tunis", "Montreal")[i % 4],
+        "application_link": f"https://example.com/apply/{i}",
+        "field_of_study": ("CS", "Math", "Biology")[i % 3],
+        "funding_type": ("full", "partial")[i % 2],
+        "funding_amount": "not a number" if bad else 1000 + i,
+        "duration": 6 + i % 30,
+    }
+
+
+async def body(rows: int, format: str, tag: str, bad_every: int):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS, lineterminator="\n")
+    if format == "csv":
+        writer.writeheader()
+    for i in range(rows):
+        row = program(i, tag, bad_every and (i + 1) % bad_every == 0)
+        if format == "csv":
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    user = {"id": uuid.uuid4(), "email": f"import-{tag}@example.com", "full_name": "Importer",
+            "password": "-", "user_type": models.UserType.PARTNER}
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), [user])
+        partner_id = await db.scalar(
+            insert(models.Partner).values(id=uuid.uuid4(), user_id=user["id"]).returning(models.Partner.id)
+        )
+        await db.commit()
+    token = create_token_pair(schemas.User(**user)).access.token
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "text/csv" if args.format == "csv" else "application/x-ndjson",
+    }
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/Programs/import", headers=headers, content=body(args.rows, args.format, tag, args.bad_every)
+        )
+        elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = response.json()
+    expected_failed = args.rows // args.bad_every if args.bad_every else 0
+    report = {
+        "rows": args.rows,
+        "format": args.format,
+        "status": response.status_code,
+        "inserted": result.get("inserted"),
+        "failed": result.get("failed"),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(args.rows / elapsed),
+        # ru_maxrss is in KB on Linux.
+        "peak_rss_mb": round(rss_after / 1024, 1),
+        "peak_rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        "exact": result.get("inserted") == args.rows - expected_failed and result.get("failed") == expected_failed,
+    }
+
+    async with SessionLocal() as db:
+        # Rating summaries go with their programs (ON DELETE CASCADE).
+        await db.execute(delete(models.Scholarship).filter(models.Scholarship.partner_id == partner_id))
+        await db.execute(delete(models.Partner).filter(models.Partner.id == partner_id))
+        await db.execute(delete(models.User).filter(models.User.id == user["id"]))
+        await db.commit()
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+    return 0 if response.status_code == 200 and report["exact"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--bad-every", type=int, default=1000, help="make every Nth row invalid (0: none)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,107 @@
+"""Cohort registration: throughput of POST /register/cohort against one-by-one /register.
+
+Seeds one partner, then registers ``--students`` students in one cohort call.
+Every ``--duplicate-every``-th row reuses an earlier email and must come back
+as a conflict, and one row reuses an email registered beforehand. For
+comparison, ``--single`` students are then registered through ``/register``.
+Seeded users are removed at the end.
+
+    python -m benchmarks.cohort_registration --students 1000 --single 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from app import models, schemas
+from app.auth.hash import password_hasher
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+from app.main import app
+
+
+def student(tag: str, i: int) -> dict:
+    return {
+        "email": f"cohort-{tag}-{i}@example.com",
+        "full_name": f"Student {i}",
+        "user_type": "student",
+        "password": f"pass-{i}",
+        "confirm_password": f"pass-{i}",
+        "university": "Benchmark University",
+        "username": f"cohort-{tag}-{i}",
+    }
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    partner = {"id": uuid.uuid4(), "email": f"cohort-{tag}@example.com", "full_name": "Registrar",
+               "password": "-", "user_type": models.UserType.PARTNER}
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), [partner])
+        await db.commit()
+    headers = {"Authorization": f"Bearer {create_token_pair(schemas.User(**partner)).access.token}"}
+
+    rows = [student(tag, i) for i in range(args.students)]
+    duplicates = 0
+    for i in range(args.duplicate_every, len(rows), args.duplicate_every or len(rows) + 1):
+        rows[i] = {**rows[i], "email": rows[i - 1]["email"]}
+        duplicates += 1
+    rows.append({**student(tag, "x"), "email": partner["email"]})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        started = time.perf_counter()
+        response = await client.post("/register/cohort", headers=headers, json=rows)
+        cohort_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        single = [
+            await client.post("/register", json=student(tag, f"single-{i}")) for i in range(args.single)
+        ]
+        single_seconds = time.perf_counter() - started
+
+    result = response.json()
+    async with SessionLocal() as db:
+        emails = select(models.User.id).filter(models.User.email.like(f"cohort-{tag}-%"))
+        students = len((await db.scalars(
+            select(models.Student.id).filter(models.Student.user_id.in_(emails))
+        )).all())
+        await db.execute(delete(models.Student).filter(models.Student.user_id.in_(emails)))
+        await db.execute(delete(models.User).filter(models.User.email.like(f"cohort-{tag}%")))
+        await db.commit()
+    password_hasher.shutdown()
+    await engine.dispose()
+
+    expected = args.students - duplicates
+    report = {
+        "students": args.students,
+        "status": response.status_code,
+        "registered": result.get("registered"),
+        "failed": result.get("failed"),
+        "cohort_seconds": round(cohort_seconds, 3),
+        "cohort_students_per_second": round(args.students / cohort_seconds),
+        "single_statuses": sorted({r.status_code for r in single}),
+        "single_students_per_second": round(args.single / single_seconds) if args.single else None,
+        "hash_workers": password_hasher.workers,
+        "exact": result.get("registered") == expected
+        and result.get("failed") == duplicates + 1
+        and students == expected + args.single,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if response.status_code == 200 and report["exact"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=50, help="students registered one by one for comparison")
+    parser.add_argument("--duplicate-every", type=int, default=100, help="every Nth row repeats an email (0: none)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,152 @@
+"""Discord channel creation against a mocked Discord API: coalescing and rate limits.
+
+The real ``DiscordService`` runs on an ``httpx.MockTransport`` that adds
+``--latency`` to every call. The mock rejects the first create with a route 429
+and announces an exhausted bucket (``X-RateLimit-Remaining: 0``) on every
+success. The run then has:
+
+* ``--callers`` concurrent requests for one program, which must coalesce into
+  one channel with a single link;
+* ``--programs`` programs created in parallel, one channel each;
+* a permanently failing guild, which must give up after the configured
+  retries with a 502.
+
+No network access is needed. Seeded discussions are removed at the end.
+
+    python -m benchmarks.discord_channels --callers 50 --programs 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app import models, schemas
+from app.auth.jwt import create_token_pair
+from app.config import Settings
+from app.database import SessionLocal, init_engine
+from app.discord_client import DiscordService, channel_creations, get_discord
+from app.main import app
+
+FAILING_GUILD = "500"
+
+
+class MockDiscord:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: dict[str, int] = {}
+        self.channels: dict[str, str] = {}
+        self.rejected_first = False
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        key = f"{request.method} {request.url.path}"
+        self.calls[key] = self.calls.get(key, 0) + 1
+        if request.url.path.endswith(f"/guilds/{FAILING_GUILD}/channels"):
+            return httpx.Response(503, json={"message": "unavailable"})
+        if request.method == "POST":
+            if not self.rejected_first:
+                self.rejected_first = True
+                return httpx.Response(429, json={"retry_after": 0.2, "global": False},
+                                      headers={"X-RateLimit-Scope": "user"})
+            channel_id = str(uuid.uuid4().int >> 64)
+            self.channels[channel_id] = json.loads(request.content)["name"]
+            return httpx.Response(201, json={"id": channel_id},
+                                  headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.05"})
+        if request.method == "DELETE":
+            self.channels.pop(request.url.path.rsplit("/", 1)[-1], None)
+            return httpx.Response(200, json={})
+        return httpx.Response(404, json={"message": "unknown route"})
+
+
+def service(mock: MockDiscord, guild_id: str) -> DiscordService:
+    settings = Settings(discord_bot_token="test", discord_guild_id=guild_id,
+                        discord_retry_backoff_seconds=0.01, discord_max_retries=2)
+    return DiscordService(settings=settings, transport=httpx.MockTransport(mock))
+
+
+def headers() -> dict:
+    user = schemas.User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:8]}@example.com",
+                        full_name="Caller", user_type="student")
+    return {"Authorization": f"Bearer {create_token_pair(user).access.token}"}
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    mock = MockDiscord(args.latency)
+    discord = service(mock, "1")
+    app.dependency_overrides[get_discord] = lambda: discord
+    tag = uuid.uuid4().hex[:8]
+    shared_id = f"discord-{tag}-shared"
+    program_ids = [f"discord-{tag}-{i}" for i in range(args.programs)]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        caller = headers()
+        started = time.perf_counter()
+        shared = await asyncio.gather(*(
+            client.post("/create-channel/", headers=caller, json={"id": shared_id, "title": f"Shared {tag}"})
+            for _ in range(args.callers)
+        ))
+        shared_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parallel = await asyncio.gather(*(
+            client.post("/create-channel/", headers=headers(), json={"id": program_id, "title": f"Program {i}"})
+            for i, program_id in enumerate(program_ids)
+        ))
+        parallel_seconds = time.perf_counter() - started
+
+        app.dependency_overrides[get_discord] = lambda: service(mock, FAILING_GUILD)
+        failing = await client.post("/create-channel/", headers=headers(), json={"id": f"discord-{tag}-failing", "title": "Failing"})
+    app.dependency_overrides.pop(get_discord)
+
+    async with SessionLocal() as db:
+        saved = await db.scalar(
+            select(func.count()).select_from(models.Discussion)
+            .filter(models.Discussion.scholarship_id.in_([shared_id, *program_ids]))
+        )
+        await db.execute(delete(models.Discussion).filter(models.Discussion.scholarship_id.like(f"discord-{tag}-%")))
+        await db.commit()
+    await discord.aclose()
+    await engine.dispose()
+
+    shared_links = {response.json().get("channel_link") for response in shared}
+    report = {
+        "callers": args.callers,
+        "shared_seconds": round(shared_seconds, 3),
+        "shared_statuses": sorted({response.status_code for response in shared}),
+        "shared_links": len(shared_links),
+        "coalesced": channel_creations.coalesced,
+        "programs": args.programs,
+        "parallel_seconds": round(parallel_seconds, 3),
+        "parallel_statuses": sorted({response.status_code for response in parallel}),
+        "failing_status": failing.status_code,
+        "discord_calls": mock.calls,
+        "channels_created": len(mock.channels),
+        "discussions_saved": saved,
+        "client": discord.stats(),
+    }
+    print(json.dumps(report, indent=2))
+    ok = (
+        report["shared_statuses"] == [200] and report["shared_links"] == 1
+        and report["parallel_statuses"] == [200]
+        and report["channels_created"] == saved == args.programs + 1
+        and failing.status_code == 502
+        and mock.calls.get(f"POST /api/v10/guilds/{FAILING_GUILD}/channels") == 3
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--programs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every mocked Discord call")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,169 @@
+"""EXPLAIN regression check: fail if any route query needs a sequential scan.
+
+Seeds a few thousand rows, drives the read and lookup routes in-process, and
+captures every SELECT/UPDATE/DELETE the app sends to Postgres. Each captured
+statement is then re-planned with ``enable_seqscan = off``: the planner still
+falls back to a Seq Scan when no index can serve the query, so any Seq Scan
+left in the plan is a missing index.
+
+Run it against a disposable database; it writes rows through the public API.
+
+    python -m benchmarks.explain_check
+"""
+import asyncio
+import json
+import logging
+import sys
+import uuid
+
+import httpx
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import init_engine
+from app.main import app
+
+# Tables loaded whole on purpose: the country requirements snapshot reload.
+WHOLE_TABLE_READS = {"country_requirements"}
+
+SEED_SCHOLARSHIPS = text(
+    """
+    INSERT INTO scholarships (id, title, description, location, application_link,
+                              field_of_study, funding_type, funding_amount, duration,
+                              status, partner_id)
+    SELECT gen_random_uuid(), 'Program ' || i, 'Seeded program number ' || i,
+           'country-' || (i % 40), 'https://example.com/' || i, 'field-' || (i % 25),
+           CASE WHEN i % 2 = 0 THEN 'full' ELSE 'partial' END,
+           i * 10, 12, 'open', :partner_id
+    FROM generate_series(1, :rows) AS i
+    """
+)
+
+# Programs created through the API get a summary row; give the seeded ones one too.
+SEED_RATING_SUMMARIES = text(
+    """
+    INSERT INTO scholarship_rating_summary (scholarship_id, rating_count, rating_sum)
+    SELECT id, 1, (abs(hashtext(id::text)) % 5) + 1 FROM scholarships
+    ON CONFLICT (scholarship_id) DO NOTHING
+    """
+)
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def seed(client: httpx.AsyncClient, engine: AsyncEngine, tag: str) -> dict:
+    async def register(**data):
+        data = {"password": "secret", "confirm_password": "secret", "full_name": tag, **data}
+        response = await client.post("/register", json=data)
+        response.raise_for_status()
+        response = await client.post("/login", data={"username": data["email"], "password": "secret"})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    partner = await register(
+        email=f"partner-{tag}@example.com", user_type="partner", phone_number="1",
+        website="https://example.com", address="1 Main St", country="Tunisia",
+    )
+    student = await register(
+        email=f"student-{tag}@example.com", user_type="student",
+        university="University", username=f"student-{tag}",
+    )
+    program = {
+        "title": "Robotics fellowship", "description": "Robotics research funding",
+        "location": "country-1", "application_link": "https://example.com",
+        "field_of_study": "field-1", "funding_type": "full",
+        "funding_amount": 1000, "duration": 12,
+    }
+    response = await client.post("/Programs/", headers=partner, json=program)
+    response.raise_for_status()
+    scholarship = response.json()
+
+    async with engine.begin() as conn:
+        await conn.execute(SEED_SCHOLARSHIPS, {"rows": 5000, "partner_id": scholarship["partner_id"]})
+        await conn.execute(SEED_RATING_SUMMARIES)
+        await conn.execute(text("ANALYZE"))
+
+    return {"partner": partner, "student": student, "scholarship_id": scholarship["id"]}
+
+
+async def drive(client: httpx.AsyncClient, seeded: dict) -> None:
+    partner, student, scholarship_id = seeded["partner"], seeded["student"], seeded["scholarship_id"]
+
+    review = await client.post("/Reviews/", headers=student, json={
+        "scholarship_id": scholarship_id, "rating": 5, "review": "Great", "tips_on_applying": "Apply early",
+    })
+    feedback_id = review.json()["id"]
+    await client.post(f"/Reviews/{feedback_id}/like", headers=student)
+    await client.post("/tips", headers=student, json={
+        "title": "Tip", "content": "Be concise", "scholarship_id": scholarship_id,
+    })
+    await client.post("/requirements", headers=partner, json={
+        "country": "Tunisia", "requirements": [{"document_type": "passport", "description": None, "mandatory": True}],
+    })
+
+    page = (await client.get("/api/Programs", params={"limit": 5})).json()
+    await client.get("/api/Programs", params={"limit": 5, "cursor": page["next_cursor"]})
+    await client.get("/api/Programs", params={"limit": 5, "sort": "rating"})
+    await client.get("/api/Programs", params={"limit": 5, "min_rating": 4})
+    await client.get("/api/Programs/filters", params={"location": "country-3"})
+    await client.get("/api/Programs/filters", params={"field_of_study": "field-3"})
+    await client.get("/api/Programs/filters", params={"funding_type": "full"})
+    await client.get("/api/Programs/search", params={"q": "robotics"})
+    await client.get(f"/api/Programs/{scholarship_id}")
+    await client.get(f"/api/Reviews/{scholarship_id}")
+    await client.get(f"/api/Reviews/{scholarship_id}", params={"sort": "likes_count"}, headers=student)
+    await client.get(f"/tips/{scholarship_id}")
+    await client.get("/requirements/tunisia")
+    await client.post(f"/Programs/mark-interest/{scholarship_id}", headers=student)
+
+
+async def main() -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    captured = {}
+    capturing = False
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing and not executemany and statement.lstrip().split(None, 1)[0].upper() in {"SELECT", "UPDATE", "DELETE"}:
+            captured.setdefault(statement, parameters)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+
+    # Route errors are not this check's concern; only the SQL they emit is.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        seeded = await seed(client, engine, uuid.uuid4().hex[:8])
+        capturing = True
+        await drive(client, seeded)
+        capturing = False
+
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    failures, report = [], []
+    async with engine.connect() as conn:
+        for statement, parameters in captured.items():
+            transaction = await conn.begin()
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()[0]["Plan"]
+            await transaction.rollback()
+
+            seq_scans = sorted({
+                node["Relation Name"] for node in plan_nodes(plan)
+                if node["Node Type"] == "Seq Scan" and node["Relation Name"] not in WHOLE_TABLE_READS
+            })
+            report.append({"statement": " ".join(statement.split()), "seq_scans": seq_scans})
+            if seq_scans:
+                failures.append(report[-1])
+
+    await engine.dispose()
+    print(json.dumps({"statements": len(report), "failures": failures}, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
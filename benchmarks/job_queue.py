@@ -0,0 +1,150 @@
+"""Background job queue: throughput and exactly-once completion under competing workers.
+
+Enqueues ``--jobs`` jobs of a test kind. Every ``--fail-every``-th job fails
+on its first attempt, and one job fails permanently. Each job is also
+enqueued a second time under the same idempotency key.
+
+Two independent ``JobQueue`` instances then drain the table, standing in for
+two app processes that share it through ``FOR UPDATE SKIP LOCKED``. The run
+fails unless:
+
+* every job succeeded exactly once, with the expected retries;
+* the permanent failure is ``failed`` after one attempt;
+* a job whose worker "died" is requeued once its lease expires.
+
+Test jobs are removed at the end.
+
+    python -m benchmarks.job_queue --jobs 2000 --workers 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from app import jobs, models
+from app.config import get_settings
+from app.database import SessionLocal, init_engine
+from app.utils import utcnow
+
+KIND = "benchmark.job_queue"
+runs: Counter = Counter()
+
+
+@jobs.handler(KIND)
+async def benchmark_job(payload: dict) -> dict:
+    runs[payload["n"]] += 1
+    await asyncio.sleep(payload.get("sleep", 0))
+    if payload.get("permanent"):
+        raise jobs.PermanentJobError("cannot succeed")
+    if payload.get("fail_first") and runs[payload["n"]] == 1:
+        raise RuntimeError("transient failure")
+    return {"n": payload["n"]}
+
+
+async def main(args) -> int:
+    logging.disable(logging.ERROR)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    settings = get_settings().model_copy(update={
+        "jobs_workers": args.workers // 2, "jobs_retry_backoff_seconds": 0.05, "jobs_poll_seconds": 0.05,
+        "jobs_maintenance_seconds": 3600,
+    })
+
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        ids = set()
+        for n in range(args.jobs):
+            payload = {"n": n, "fail_first": bool(args.fail_every) and n % args.fail_every == 0}
+            for _ in range(2):  # the duplicate must collapse onto the first job
+                ids.add(await jobs.enqueue(db, KIND, payload, idempotency_key=f"{KIND}:{tag}:{n}"))
+        permanent_id = await jobs.enqueue(db, KIND, {"n": -1, "permanent": True}, idempotency_key=f"{KIND}:{tag}:permanent")
+        await db.commit()
+    enqueue_seconds = time.perf_counter() - started
+
+    queues = [jobs.JobQueue(), jobs.JobQueue()]
+    for number, queue in enumerate(queues):
+        queue.worker_id += f"-bench{number}"
+    started = time.perf_counter()
+    for queue in queues:
+        queue.start(settings)
+    job_ids = [*ids, permanent_id]
+    while True:
+        async with SessionLocal() as db:
+            pending = await db.scalar(
+                select(func.count()).select_from(models.Job)
+                .filter(models.Job.id.in_(job_ids), models.Job.status.in_((jobs.QUEUED, jobs.RUNNING)))
+            )
+        if not pending or time.perf_counter() - started > args.timeout:
+            break
+        await asyncio.sleep(0.05)
+    drain_seconds = time.perf_counter() - started
+
+    for queue in queues:
+        await queue.stop(grace=5)
+
+    # A job whose worker died: claimed, never finished, lease long expired.
+    queue = queues[0]
+    async with SessionLocal() as db:
+        orphan_id = await jobs.enqueue(db, KIND, {"n": -2}, idempotency_key=f"{KIND}:{tag}:orphan")
+        await db.commit()
+    await queue.claim("bench-dead-worker")
+    async with SessionLocal() as db:
+        await db.execute(update(models.Job).filter(models.Job.id == orphan_id).values(locked_at=utcnow() - timedelta(hours=1)))
+        await db.commit()
+    await queue.maintain(settings)
+    reclaimed = await queue.claim(f"{queue.worker_id}/0")
+    orphan_status = await queue.run(f"{queue.worker_id}/0", reclaimed, settings) if reclaimed else None
+
+    async with SessionLocal() as db:
+        statuses = dict((await db.execute(
+            select(models.Job.status, func.count()).filter(models.Job.id.in_(ids)).group_by(models.Job.status)
+        )).all())
+        attempts = await db.scalar(select(func.sum(models.Job.attempts)).filter(models.Job.id.in_(ids)))
+        permanent = (await db.execute(
+            select(models.Job.status, models.Job.attempts).filter(models.Job.id == permanent_id)
+        )).one()
+        await db.execute(delete(models.Job).filter(models.Job.kind == KIND))
+        await db.commit()
+    await engine.dispose()
+
+    expected_retries = len([n for n in range(args.jobs) if args.fail_every and n % args.fail_every == 0])
+    report = {
+        "jobs": args.jobs,
+        "distinct_jobs_after_duplicate_enqueue": len(ids),
+        "workers": args.workers,
+        "enqueue_seconds": round(enqueue_seconds, 3),
+        "drain_seconds": round(drain_seconds, 3),
+        "jobs_per_second": round(args.jobs / drain_seconds),
+        "statuses": statuses,
+        "attempts": attempts,
+        "expected_attempts": args.jobs + expected_retries,
+        "max_runs_of_one_job": max(count for n, count in runs.items() if n >= 0),
+        "permanent": {"status": permanent.status, "attempts": permanent.attempts},
+        "orphan_after_lease": orphan_status,
+    }
+    print(json.dumps(report, indent=2))
+    ok = (
+        len(ids) == args.jobs
+        and statuses == {jobs.SUCCEEDED: args.jobs}
+        and attempts == report["expected_attempts"]
+        and report["max_runs_of_one_job"] <= 2
+        and permanent.status == jobs.FAILED and permanent.attempts == 1
+        and orphan_status == jobs.SUCCEEDED
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8, help="split across two queues")
+    parser.add_argument("--fail-every", type=int, default=10, help="every Nth job fails its first attempt (0: none)")
+    parser.add_argument("--timeout", type=float, default=120)
+    sys.exit(asyncio.run(main(parser.parse_args())))
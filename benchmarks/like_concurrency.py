@@ -0,0 +1,114 @@
+"""Concurrency check for like ingestion: N parallel likes must count exactly N.
+
+Bulk-seeds one review and ``--students`` students, then has every student like
+the review at once through the real route (each twice, so the duplicate path
+races too). The run fails unless ``feedback.likes_count`` and the number of
+``likes`` rows both equal the number of students. Seeded rows are removed at
+the end.
+
+    python -m benchmarks.like_concurrency --students 1000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+
+from app import models, schemas
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+from app.main import app
+
+
+async def seed(students: int) -> tuple[uuid.UUID, list[dict]]:
+    tag = uuid.uuid4().hex[:8]
+    users = [
+        {"id": uuid.uuid4(), "email": f"like-{tag}-{i}@example.com", "full_name": f"Student {i}",
+         "password": "-", "user_type": models.UserType.STUDENT}
+        for i in range(students)
+    ]
+    student_rows = [
+        {"id": uuid.uuid4(), "user_id": user["id"], "username": user["email"]}
+        for user in users
+    ]
+    scholarship_id, feedback_id = uuid.uuid4(), uuid.uuid4()
+
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), users)
+        await db.execute(insert(models.Student.__table__), student_rows)
+        await db.execute(insert(models.Scholarship).values(id=scholarship_id, title=f"Likes {tag}"))
+        await db.execute(insert(models.Feedback).values(
+            id=feedback_id, scholarship_id=scholarship_id, student_id=student_rows[0]["id"],
+            rating=5, likes_count=0,
+        ))
+        await db.commit()
+
+    return feedback_id, users
+
+
+async def cleanup(feedback_id: uuid.UUID, users: list[dict]) -> None:
+    user_ids = [user["id"] for user in users]
+    async with SessionLocal() as db:
+        feedback = await db.get(models.Feedback, feedback_id)
+        await db.execute(delete(models.Likes).filter(models.Likes.feedback_id == feedback_id))
+        await db.execute(delete(models.Feedback).filter(models.Feedback.id == feedback_id))
+        await db.execute(delete(models.Scholarship).filter(models.Scholarship.id == feedback.scholarship_id))
+        await db.execute(delete(models.Student).filter(models.Student.user_id.in_(user_ids)))
+        await db.execute(delete(models.User).filter(models.User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    feedback_id, users = await seed(args.students)
+    headers = [
+        {"Authorization": f"Bearer {create_token_pair(schemas.User(**user)).access.token}"}
+        for user in users
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(f"/Reviews/{feedback_id}/like", headers=header)
+            for header in headers * 2
+        ))
+        elapsed = time.perf_counter() - started
+
+    async with SessionLocal() as db:
+        likes_count = await db.scalar(
+            select(models.Feedback.likes_count).filter(models.Feedback.id == feedback_id)
+        )
+        like_rows = await db.scalar(
+            select(func.count()).select_from(models.Likes).filter(models.Likes.feedback_id == feedback_id)
+        )
+
+    statuses = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    report = {
+        "students": args.students,
+        "requests": len(responses),
+        "seconds": round(elapsed, 3),
+        "statuses": statuses,
+        "likes_count": likes_count,
+        "like_rows": like_rows,
+        "exact": likes_count == like_rows == args.students,
+    }
+    await cleanup(feedback_id, users)
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+    return 0 if report["exact"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,349 @@
+"""HTTP load test: per-route latency percentiles, throughput and error rate.
+
+Bulk-seeds partners, students, programs, reviews, likes, tips and country
+requirements, then has ``--concurrency`` async clients drive a weighted mix of
+routes for ``--duration`` seconds. The report is JSON, one entry per route, so
+runs can be diffed across commits::
+
+    python -m benchmarks.load_test --duration 30 --concurrency 50 --output before.json
+
+By default the app runs in-process over ``httpx.ASGITransport``. To measure a
+real server, start it against the same database and pass its URL; seeding
+still goes straight to the database configured in ``app.database``::
+
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000
+
+``--mix`` takes ``route=weight`` pairs (see ``DEFAULT_MIX``). Seeded rows are
+deleted at the end unless ``--keep`` is passed.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import random
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app import models, schemas
+from app import requirements as requirements_module
+from app.auth.hash import get_password_hash, password_hasher
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+
+PASSWORD = "load-test"
+COUNTRIES = ["Tunisia", "France", "Germany", "Canada", "Japan", "Brazil", "Kenya", "India"]
+FIELDS = ["engineering", "medicine", "law", "economics", "physics", "design", "music", "biology"]
+DOCUMENTS = ["passport", "transcript", "language certificate", "motivation letter"]
+
+DEFAULT_MIX = {
+    "programs": 25,
+    "programs_filters": 10,
+    "programs_search": 10,
+    "programs_by_rating": 5,
+    "program": 20,
+    "reviews": 10,
+    "like": 5,
+    "tips": 10,
+    "requirements": 8,
+    "login": 2,
+}
+
+
+@dataclass
+class Seed:
+    tag: str
+    users: list = field(default_factory=list)
+    students: list = field(default_factory=list)
+    scholarship_ids: list = field(default_factory=list)
+    feedback_ids: list = field(default_factory=list)
+    requirement_ids: list = field(default_factory=list)
+    countries: list = field(default_factory=list)
+    student_headers: list = field(default_factory=list)
+
+
+async def seed(args) -> Seed:
+    data = Seed(tag=uuid.uuid4().hex[:8])
+    rng = random.Random(args.seed)
+    # bcrypt salts are embedded in the hash, so one hash serves every seeded user.
+    password = get_password_hash(PASSWORD)
+
+    def user(kind: str, i: int) -> dict:
+        return {
+            "id": uuid.uuid4(), "email": f"load-{data.tag}-{kind}-{i}@example.com",
+            "full_name": f"Load {kind} {i}", "password": password, "user_type": kind,
+        }
+
+    partner_users = [user(models.UserType.PARTNER, i) for i in range(args.partners)]
+    student_users = [user(models.UserType.STUDENT, i) for i in range(args.students)]
+    data.users = partner_users + student_users
+
+    partners = [
+        {"id": uuid.uuid4(), "user_id": u["id"], "phone_number": "0", "website": "https://example.com",
+         "address": "1 Main St", "country": rng.choice(COUNTRIES)}
+        for u in partner_users
+    ]
+    data.students = [
+        {"id": uuid.uuid4(), "user_id": u["id"], "university": "University",
+         "username": f"load-{data.tag}-{i}"}
+        for i, u in enumerate(student_users)
+    ]
+    scholarships = [
+        {"id": uuid.uuid4(), "title": f"{rng.choice(FIELDS).title()} scholarship {i}",
+         "description": f"Funding for {rng.choice(FIELDS)} and {rng.choice(FIELDS)} students",
+         "location": rng.choice(COUNTRIES), "application_link": "https://example.com",
+         "field_of_study": rng.choice(FIELDS), "funding_type": rng.choice(["full", "partial"]),
+         "funding_amount": rng.randrange(1000, 50000), "duration": rng.randrange(6, 48),
+         "status": "open", "partner_id": rng.choice(partners)["id"]}
+        for i in range(args.scholarships)
+    ]
+    feedback = [
+        {"id": uuid.uuid4(), "scholarship_id": scholarship["id"], "student_id": rng.choice(data.students)["id"],
+         "rating": rng.randint(1, 5), "review": "Seeded review", "tips_on_applying": "Apply early",
+         "likes_count": 0}
+        for scholarship in scholarships
+        for _ in range(args.reviews_per_program)
+    ]
+    likes = []
+    for review in feedback:
+        likers = rng.sample(data.students, min(args.likes_per_review, len(data.students)))
+        review["likes_count"] = len(likers)
+        likes.extend({"id": uuid.uuid4(), "feedback_id": review["id"], "student_id": s["id"]} for s in likers)
+    summaries = {s["id"]: {"scholarship_id": s["id"], "rating_count": 0, "rating_sum": 0,
+                           **{f"stars_{n}": 0 for n in range(1, 6)}} for s in scholarships}
+    for review in feedback:
+        summary = summaries[review["scholarship_id"]]
+        summary["rating_count"] += 1
+        summary["rating_sum"] += review["rating"]
+        summary[f"stars_{review['rating']}"] += 1
+    tips = [
+        {"id": uuid.uuid4(), "title": "Seeded tip", "content": "Be concise",
+         "scholarship_id": scholarship["id"], "user_id": str(rng.choice(student_users)["id"]),
+         "date_shared": datetime.datetime.utcnow()}
+        for scholarship in scholarships
+    ]
+    data.countries = [f"{country}-{data.tag}" for country in COUNTRIES]
+    requirements = [
+        {"id": uuid.uuid4(), "country": country, "document_type": document, "mandatory": True}
+        for country in data.countries
+        for document in DOCUMENTS
+    ]
+
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), data.users)
+        await db.execute(insert(models.Partner), partners)
+        await db.execute(insert(models.Student.__table__), data.students)
+        await db.execute(insert(models.Scholarship), scholarships)
+        await db.execute(insert(models.ScholarshipRatingSummary), list(summaries.values()))
+        if feedback:
+            await db.execute(insert(models.Feedback), feedback)
+        if likes:
+            await db.execute(insert(models.Likes), likes)
+        await db.execute(insert(models.Tip), tips)
+        await db.execute(insert(models.CountryRequirement), requirements)
+        await requirements_module.bump_version(db)
+        await db.commit()
+    # In-process runs skip the lifespan, so load the snapshot here. Servers
+    # behind --base-url pick the bumped version up on their next sync.
+    await requirements_module.load_requirements()
+
+    data.scholarship_ids = [s["id"] for s in scholarships]
+    data.feedback_ids = [f["id"] for f in feedback]
+    data.requirement_ids = [r["id"] for r in requirements]
+    data.student_headers = [
+        {"Authorization": f"Bearer {create_token_pair(schemas.User(**u)).access.token}"}
+        for u in student_users
+    ]
+    return data
+
+
+async def cleanup(data: Seed) -> None:
+    user_ids = [u["id"] for u in data.users]
+    student_ids = [s["id"] for s in data.students]
+    async with SessionLocal() as db:
+        await db.execute(delete(models.Likes).filter(models.Likes.student_id.in_(student_ids)))
+        await db.execute(delete(models.Feedback).filter(models.Feedback.scholarship_id.in_(data.scholarship_ids)))
+        await db.execute(delete(models.Tip).filter(models.Tip.scholarship_id.in_(data.scholarship_ids)))
+        await db.execute(delete(models.Scholarship).filter(models.Scholarship.id.in_(data.scholarship_ids)))
+        await db.execute(delete(models.CountryRequirement).filter(models.CountryRequirement.id.in_(data.requirement_ids)))
+        await requirements_module.bump_version(db)
+        await db.execute(delete(models.Student).filter(models.Student.user_id.in_(user_ids)))
+        await db.execute(delete(models.Partner).filter(models.Partner.user_id.in_(user_ids)))
+        await db.execute(delete(models.User).filter(models.User.id.in_(user_ids)))
+        await db.commit()
+
+
+def build_request(route: str, data: Seed, rng: random.Random) -> tuple[str, str, dict, set]:
+    """Return ``(method, url, request kwargs, expected statuses)`` for one call to ``route``."""
+    scholarship_id = rng.choice(data.scholarship_ids)
+    if route == "login":
+        user = rng.choice(data.users)
+        return "POST", "/login", {"data": {"username": user["email"], "password": PASSWORD}}, {200}
+    if route == "programs":
+        return "GET", "/api/Programs", {"params": {"limit": 20}}, {200}
+    if route == "programs_filters":
+        return "GET", "/api/Programs/filters", {"params": {"location": rng.choice(COUNTRIES), "limit": 20}}, {200}
+    if route == "programs_by_rating":
+        return "GET", "/api/Programs", {"params": {"sort": "rating", "min_rating": rng.choice([0, 3, 4]), "limit": 20}}, {200}
+    if route == "programs_search":
+        return "GET", "/api/Programs/search", {"params": {"q": rng.choice(FIELDS), "limit": 20}}, {200}
+    if route == "program":
+        return "GET", f"/api/Programs/{scholarship_id}", {}, {200}
+    if route == "reviews":
+        params = {"sort": rng.choice(["created_at", "likes_count"]), "limit": 20}
+        return "GET", f"/api/Reviews/{scholarship_id}", {"params": params, "headers": rng.choice(data.student_headers)}, {200}
+    if route == "like":
+        feedback_id = rng.choice(data.feedback_ids)
+        method = rng.choice(["POST", "DELETE"])
+        # Toggling a random pair is expected to hit "already liked"/"not liked" half the time.
+        return method, f"/Reviews/{feedback_id}/like", {"headers": rng.choice(data.student_headers)}, {200, 400}
+    if route == "tips":
+        return "GET", f"/tips/{scholarship_id}", {}, {200}
+    if route == "requirements":
+        return "GET", f"/requirements/{rng.choice(data.countries).lower()}", {}, {200}
+    raise ValueError(f"Unknown route {route!r}")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def drive(client: httpx.AsyncClient, data: Seed, args) -> tuple[dict, float]:
+    mix = parse_mix(args.mix)
+    routes, weights = list(mix), list(mix.values())
+    samples = {route: [] for route in routes}
+    errors = {route: {} for route in routes}
+    loop = asyncio.get_running_loop()
+    warmup_ends = loop.time() + args.warmup
+    deadline = warmup_ends + args.duration
+
+    async def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        while (now := loop.time()) < deadline:
+            route = rng.choices(routes, weights)[0]
+            method, url, kwargs, expected = build_request(route, data, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                outcome = None if response.status_code in expected else str(response.status_code)
+            except httpx.HTTPError as exc:
+                outcome = type(exc).__name__
+            elapsed = time.perf_counter() - started
+            if now < warmup_ends:
+                continue
+            samples[route].append(elapsed)
+            if outcome is not None:
+                errors[route][outcome] = errors[route].get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+    measured = time.perf_counter() - started - args.warmup
+
+    report = {}
+    for route in routes:
+        latencies = sorted(samples[route])
+        failed = sum(errors[route].values())
+        report[route] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / measured, 2),
+            "error_rate": round(failed / len(latencies), 4) if latencies else 0.0,
+            "errors": errors[route],
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+    return report, measured
+
+
+def parse_mix(mix: str | None) -> dict:
+    if not mix:
+        return DEFAULT_MIX
+    weights = {}
+    for part in mix.split(","):
+        route, _, weight = part.partition("=")
+        if route not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown route {route!r}; choose from {', '.join(DEFAULT_MIX)}")
+        weights[route] = float(weight or 1)
+    return weights
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> None:
+    logging.disable(logging.INFO)
+    parse_mix(args.mix)
+    engine = init_engine()
+    data = await seed(args)
+    try:
+        if args.base_url:
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+            base_url = args.base_url
+        else:
+            from app.main import app
+
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            base_url = "http://load-test"
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+            routes, measured = await drive(client, data, args)
+    finally:
+        if not args.keep:
+            await cleanup(data)
+        password_hasher.shutdown()
+        await engine.dispose()
+
+    total = sum(route["requests"] for route in routes.values())
+    failed = sum(sum(route["errors"].values()) for route in routes.values())
+    report = {
+        "revision": git_revision(),
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_seconds": round(measured, 2),
+        "seed": {
+            "partners": args.partners, "students": args.students, "scholarships": args.scholarships,
+            "reviews_per_program": args.reviews_per_program, "likes_per_review": args.likes_per_review,
+        },
+        "total": {"requests": total, "rps": round(total / measured, 2),
+                  "error_rate": round(failed / total, 4) if total else 0.0},
+        "routes": routes,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--mix", help="comma-separated route=weight pairs, e.g. programs=5,login=1")
+    parser.add_argument("--partners", type=int, default=20)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--scholarships", type=int, default=2000)
+    parser.add_argument("--reviews-per-program", type=int, default=3)
+    parser.add_argument("--likes-per-review", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="random seed for data and traffic")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""Program view counters: request cost, flush cost and exact totals.
+
+Seeds a partner with ``--programs`` programs, then sends ``--views``
+concurrent ``GET /api/Programs/{id}`` requests, skewed towards a few
+programs. The worker's counters are flushed in one statement and the run
+fails unless ``program_view_counts`` holds exactly the views sent, and
+``GET /api/Programs/views`` reports the same totals, most viewed first.
+Seeded rows are removed at the end.
+
+    python -m benchmarks.program_views --programs 50 --views 5000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from app import models, schemas, views
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+from app.main import app
+
+
+async def seed(args, tag: str) -> tuple[dict, list]:
+    user = {"id": uuid.uuid4(), "email": f"views-{tag}@example.com", "full_name": "Partner",
+            "password": "-", "user_type": models.UserType.PARTNER}
+    partner_id = uuid.uuid4()
+    programs = [
+        {"id": uuid.uuid4(), "title": f"Viewed {tag} {i}", "description": "-", "location": "Paris",
+         "application_link": "-", "field_of_study": "CS", "funding_type": "full", "funding_amount": 1000,
+         "duration": 12, "status": "open", "partner_id": partner_id}
+        for i in range(args.programs)
+    ]
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), [user])
+        await db.execute(insert(models.Partner), [{"id": partner_id, "user_id": user["id"]}])
+        await db.execute(insert(models.Scholarship), programs)
+        await db.execute(insert(models.ScholarshipRatingSummary), [{"scholarship_id": p["id"]} for p in programs])
+        await db.commit()
+    return user, [program["id"] for program in programs]
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    rng = random.Random(args.seed)
+    user, program_ids = await seed(args, tag)
+    targets = rng.choices(program_ids, [1 / (rank + 1) for rank in range(len(program_ids))], k=args.views)
+    latencies = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def view(program_id):
+            async with limit:
+                started = time.perf_counter()
+                response = await client.get(f"/api/Programs/{program_id}")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(view(program_id) for program_id in targets))
+        flushes = views.view_counter.flushes
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            written = await views.view_counter.flush(db)
+            flush_seconds = time.perf_counter() - started
+
+        headers = {"Authorization": f"Bearer {create_token_pair(schemas.User(**user)).access.token}"}
+        listed, cursor = [], None
+        while True:
+            response = await client.get(
+                "/api/Programs/views", headers=headers, params={"limit": 7, **({"cursor": cursor} if cursor else {})}
+            )
+            assert response.status_code == 200, response.text
+            page = response.json()
+            listed.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    expected = Counter(targets)
+    async with SessionLocal() as db:
+        stored = dict((await db.execute(
+            select(models.ProgramViewCount.scholarship_id, models.ProgramViewCount.views)
+            .filter(models.ProgramViewCount.scholarship_id.in_(program_ids))
+        )).all())
+        await db.execute(delete(models.ProgramViewCount).filter(models.ProgramViewCount.scholarship_id.in_(program_ids)))
+        await db.execute(delete(models.Scholarship).filter(models.Scholarship.id.in_(program_ids)))
+        await db.execute(delete(models.Partner).filter(models.Partner.user_id == user["id"]))
+        await db.execute(delete(models.User).filter(models.User.id == user["id"]))
+        await db.commit()
+    await engine.dispose()
+
+    counts = [item["views"] for item in listed]
+    latencies.sort()
+    report = {
+        "view_requests": len(latencies),
+        "view_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "view_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "programs_written": written,
+        "flush_statements": views.view_counter.flushes - flushes,
+        "flush_ms": round(flush_seconds * 1000, 2),
+        "stored_counts_match": stored == dict(expected),
+        "listing_matches": {uuid.UUID(item["id"]): item["views"] for item in listed if item["views"]} == dict(expected)
+        and len(listed) == len(program_ids) and counts == sorted(counts, reverse=True),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["stored_counts_match"] and report["listing_matches"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, default=50)
+    parser.add_argument("--views", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
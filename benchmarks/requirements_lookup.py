@@ -0,0 +1,96 @@
+"""Country requirements lookups: snapshot latency and database traffic per request.
+
+Seeds ``--countries`` countries with a few requirements each, loads the
+snapshot, then times ``requirements_store.get`` directly and
+``GET /requirements/{country}`` through the app. Statements run during the HTTP
+phase are counted; the run fails unless there are none. Seeded rows are
+removed at the end.
+
+    python -m benchmarks.requirements_lookup --countries 200 --lookups 100000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+
+import httpx
+from prometheus_client import REGISTRY
+from sqlalchemy import delete, insert
+
+from app import models
+from app.database import SessionLocal, init_engine
+from app.main import app
+from app.requirements import bump_version, load_requirements, requirements_store
+
+DOCUMENTS = ["passport", "visa", "transcript", "language certificate", "bank statement"]
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    countries = [f"Country-{tag}-{i}" for i in range(args.countries)]
+    rows = [
+        {"id": uuid.uuid4(), "country": country, "document_type": document, "description": "Seeded", "mandatory": True}
+        for country in countries
+        for document in DOCUMENTS
+    ]
+    async with SessionLocal() as db:
+        await db.execute(insert(models.CountryRequirement), rows)
+        await bump_version(db)
+        await db.commit()
+
+    started = time.perf_counter()
+    await load_requirements()
+    reload_seconds = time.perf_counter() - started
+
+    rng = random.Random(0)
+    keys = [rng.choice(countries).upper() for _ in range(args.lookups)]
+    started = time.perf_counter()
+    for key in keys:
+        requirements_store.get(key)
+    lookup_seconds = time.perf_counter() - started
+
+    statements_before = int(REGISTRY.get_sample_value("db_statements_total"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        statuses = {}
+        for key in keys[:args.requests]:
+            response = await client.get(f"/requirements/{key}")
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        http_seconds = time.perf_counter() - started
+    statements = int(REGISTRY.get_sample_value("db_statements_total")) - statements_before
+
+    async with SessionLocal() as db:
+        await db.execute(delete(models.CountryRequirement).filter(
+            models.CountryRequirement.id.in_([row["id"] for row in rows])
+        ))
+        await bump_version(db)
+        await db.commit()
+    await engine.dispose()
+
+    report = {
+        "countries": args.countries,
+        "snapshot_rows": len(rows),
+        "reload_ms": round(reload_seconds * 1000, 2),
+        "lookup_us": round(lookup_seconds / args.lookups * 1e6, 3),
+        "http_requests": args.requests,
+        "http_ms_per_request": round(http_seconds / args.requests * 1000, 3),
+        "http_statuses": statuses,
+        "db_statements_during_http": statements,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if statements == 0 and set(statuses) == {200} else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
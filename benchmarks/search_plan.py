@@ -0,0 +1,118 @@
+"""Full-text search plan and latency over a large synthetic catalog.
+
+Seeds ``--rows`` programs inside a transaction, runs the ``/api/Programs/search``
+query under ``EXPLAIN (ANALYZE, BUFFERS)`` and reports whether the GIN index on
+``scholarships.search_vector`` drove the scan. Everything is rolled back at the
+end unless ``--keep`` is passed.
+
+    python -m benchmarks.search_plan --rows 1000000 --query "medicine scholarship"
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import func, select, text
+
+from app import models
+from app.database import init_engine
+
+VOCABULARY = [
+    "engineering", "medicine", "law", "economics", "physics", "chemistry",
+    "biology", "history", "music", "architecture", "nursing", "education",
+    "robotics", "agriculture", "finance", "journalism", "philosophy",
+    "mathematics", "linguistics", "design", "research", "exchange", "masters",
+    "doctoral", "undergraduate", "women", "stem", "leadership", "africa",
+    "europe", "asia", "america", "renewable", "energy", "climate", "health",
+]
+
+SEED = text(
+    """
+    INSERT INTO scholarships (id, title, description, location, field_of_study,
+                              funding_type, funding_amount, duration, status)
+    SELECT gen_random_uuid(),
+           initcap(w[1 + (i % n)]) || ' ' || initcap(w[1 + ((i * 7) % n)]) || ' scholarship',
+           'Funding for ' || w[1 + ((i * 13) % n)] || ' and ' || w[1 + ((i * 17) % n)]
+               || ' students in ' || w[1 + ((i * 19) % n)] || ' ' || i,
+           w[1 + ((i * 23) % n)], w[1 + ((i * 29) % n)],
+           CASE WHEN i % 3 = 0 THEN 'full' ELSE 'partial' END,
+           (i % 50) * 1000, 6 + i % 42, 'open'
+    FROM generate_series(1, :rows) AS i,
+         LATERAL (SELECT CAST(:words AS text[]) AS w,
+                         cardinality(CAST(:words AS text[])) AS n) AS vocabulary
+    """
+)
+
+
+def search_query(q: str, limit: int):
+    ts_query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank(models.Scholarship.search_vector, ts_query)
+    return (
+        select(models.Scholarship.id, rank.label("rank"))
+        .filter(models.Scholarship.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), models.Scholarship.id.desc())
+        .limit(limit)
+    )
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def main(args) -> None:
+    engine = init_engine()
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+
+        started = time.perf_counter()
+        await conn.execute(SEED, {"rows": args.rows, "words": VOCABULARY})
+        await conn.execute(text("ANALYZE scholarships"))
+        seed_seconds = time.perf_counter() - started
+
+        query = search_query(args.query, args.limit)
+        compiled = query.compile(dialect=engine.dialect)
+        explain = await conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}",
+            tuple(compiled.params[name] for name in compiled.positiontup),
+        )
+        plan = explain.scalar()[0]
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            await conn.execute(query)
+            timings.append(time.perf_counter() - started)
+
+        if args.keep:
+            await transaction.commit()
+        else:
+            await transaction.rollback()
+
+    nodes = list(plan_nodes(plan["Plan"]))
+    indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+    report = {
+        "rows": args.rows,
+        "query": args.query,
+        "seed_seconds": round(seed_seconds, 2),
+        "plan_nodes": [node["Node Type"] for node in nodes],
+        "indexes": indexes,
+        "uses_gin_index": "ix_scholarships_search_vector" in indexes,
+        "seq_scan": any(node["Node Type"] == "Seq Scan" for node in nodes),
+        "execution_ms": plan["Execution Time"],
+        "latency_ms_min": round(min(timings) * 1000, 2),
+        "latency_ms_median": round(sorted(timings)[len(timings) // 2] * 1000, 2),
+    }
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--query", default="medicine scholarship")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="commit the seeded rows")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""Listing serialization cost: FastAPI's response_model path against direct model encoding.
+
+Builds ``--sizes`` in-memory programs as ORM objects, with a rating summary
+each, and wraps them in a ``ScholarshipPage``. No database is needed. It
+times each way of turning that page into a response body:
+
+* ``jsonable_encoder``: the old path. The result is walked in Python, then
+  encoded with ``json``.
+* ``response_model``: the route returns the page and declares a
+  ``response_model``. FastAPI validates it again, dumps it and encodes it.
+  This is run once with ``JSONResponse`` and once with ``ORJSONResponse``,
+  the app default.
+* ``model_response``: pydantic-core writes the bytes in one pass. List
+  routes now use this.
+
+Encoder-only timings leave out HTTP. Request timings go through a bare
+FastAPI app over ``httpx.ASGITransport``, so they include routing.
+
+    python -m benchmarks.serialization --sizes 1000 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app import models, schemas
+from app.responses import model_response, to_json
+
+
+def build_page(size: int) -> schemas.ScholarshipPage:
+    started = datetime(2026, 1, 1)
+    programs = [
+        models.Scholarship(
+            id=uuid.uuid4(),
+            title=f"Program {i}",
+            description=f"Generated program {i} " * 10,
+            location=("Paris", "Berlin", "Tunis", "Montreal")[i % 4],
+            application_link=f"https://example.com/apply/{i}",
+            field_of_study=("CS", "Math", "Biology")[i % 3],
+            funding_type=("full", "partial")[i % 2],
+            funding_amount=1000.0 + i,
+            duration=6 + i % 30,
+            status="open",
+            created_at=started + timedelta(minutes=i),
+            rating_summary=models.ScholarshipRatingSummary(
+                rating_count=5, rating_sum=20, average_rating=4.0,
+                stars_1=0, stars_2=0, stars_3=1, stars_4=3, stars_5=1,
+            ),
+        )
+        for i in range(size)
+    ]
+    return schemas.ScholarshipPage(items=programs, next_cursor="cursor")
+
+
+def build_app(page: schemas.ScholarshipPage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=schemas.ScholarshipPage, response_class=JSONResponse)
+    async def default():
+        return page
+
+    @app.get("/response-model-orjson", response_model=schemas.ScholarshipPage, response_class=ORJSONResponse)
+    async def orjson_default():
+        return page
+
+    @app.get("/model-response", response_model=schemas.ScholarshipPage)
+    async def direct():
+        return model_response(page)
+
+    return app
+
+
+def time_encoder(encode, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    return (time.perf_counter() - started) / repeat
+
+
+async def time_requests(client: httpx.AsyncClient, path: str, repeat: int) -> tuple[float, bytes]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+    return (time.perf_counter() - started) / repeat, response.content
+
+
+async def measure(size: int, repeat: int) -> dict:
+    page = build_page(size)
+    encoders = {
+        "jsonable_encoder": lambda: json.dumps(jsonable_encoder(page)).encode(),
+        "model_dump_orjson": lambda: ORJSONResponse(page.model_dump(mode="json")).body,
+        "model_response": lambda: to_json(page),
+    }
+    report = {"items": size, "encode_ms": {}, "request_ms": {}}
+    for name, encode in encoders.items():
+        report["encode_ms"][name] = round(time_encoder(encode, repeat) * 1000, 2)
+
+    bodies = {}
+    transport = httpx.ASGITransport(app=build_app(page))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/response-model", "/response-model-orjson", "/model-response"):
+            seconds, body = await time_requests(client, path, repeat)
+            report["request_ms"][path.lstrip("/")] = round(seconds * 1000, 2)
+            bodies[path] = json.loads(body)
+    # Every path must produce the same document.
+    report["same_body"] = all(body == bodies["/model-response"] for body in bodies.values())
+    report["body_kb"] = round(len(to_json(page)) / 1024, 1)
+    return report
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    reports = [await measure(size, args.repeat) for size in args.sizes]
+    print(json.dumps(reports, indent=2))
+    return 0 if all(report["same_body"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    sys.exit(asyncio.run(main(parser.parse_args())))
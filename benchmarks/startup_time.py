@@ -0,0 +1,89 @@
+"""Cold-start cost: time to import ``app.main`` and to run the app lifespan.
+
+Each import is timed in a fresh interpreter (what a new worker pays). An audit
+hook records every socket connect and file open outside the Python install
+during the import, and sockets still open afterwards are counted (C drivers
+such as libpq connect without raising audit events). Any of these fails the
+run. The lifespan (engine creation, schema check, revoked-token load) is then
+timed in-process against the configured database.
+
+    python -m benchmarks.startup_time --runs 10
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+IMPORT_PROBE = """
+import json, os, sys, sysconfig, time
+stdlib = (sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"])
+io = []
+
+def audit(event, args):
+    if event == "socket.connect":
+        io.append(f"connect {args[1]!r}")
+    elif event == "open" and isinstance(args[0], str) and args[0].startswith("/") \\
+            and not args[0].startswith(stdlib) and not args[0].endswith((".py", ".pyc", ".so", ".pth", ".zip")):
+        io.append(f"open {args[0]}")
+
+def open_sockets():
+    links = set()
+    for fd in os.listdir("/proc/self/fd") if os.path.isdir("/proc/self/fd") else ():
+        try:
+            links.add(os.readlink(f"/proc/self/fd/{fd}"))
+        except OSError:  # the descriptor listdir itself used
+            pass
+    return {link for link in links if link.startswith("socket:")}
+
+inherited = open_sockets()
+sys.addaudithook(audit)
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+io.extend(f"open {link}" for link in open_sockets() - inherited)
+print(json.dumps({"seconds": elapsed, "io": io, "requests_imported": "requests" in sys.modules}))
+"""
+
+
+def time_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", IMPORT_PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def time_lifespan() -> dict:
+    from app.main import app
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter() - started
+        stopping = time.perf_counter()
+    return {"startup_seconds": round(ready, 4), "shutdown_seconds": round(time.perf_counter() - stopping, 4)}
+
+
+def main(args) -> int:
+    imports = [time_import() for _ in range(args.runs)]
+    timings = sorted(run["seconds"] for run in imports)
+    io = sorted({event for run in imports for event in run["io"]})
+    report = {
+        "runs": args.runs,
+        "import_ms_min": round(timings[0] * 1000, 1),
+        "import_ms_median": round(timings[len(timings) // 2] * 1000, 1),
+        "import_ms_max": round(timings[-1] * 1000, 1),
+        "import_io": io,
+        "requests_imported": any(run["requests_imported"] for run in imports),
+    }
+    if not args.skip_lifespan:
+        report["lifespan"] = asyncio.run(time_lifespan())
+    print(json.dumps(report, indent=2))
+    return 1 if io else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--skip-lifespan", action="store_true", help="only time the import (no database needed)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,130 @@
+"""Interest marking and trending ranking: idempotency, request cost and flush cost.
+
+Seeds ``--students`` students and ``--programs`` programs. Each student then
+marks interest in a skewed sample of programs through
+``POST /Programs/mark-interest/{id}``. Every mark is sent twice, and the
+second must change nothing. Some marks are then removed again.
+
+The run flushes the worker's counters and reloads the ranking. It fails
+unless the ranking matches the net marks per program in
+``student_interests``. The timings show what a mark costs in the request,
+and what one flush and one reload cost. Seeded rows are removed at the end.
+
+    python -m benchmarks.trending --students 200 --programs 50 --marks 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+
+from app import models, schemas, trending
+from app.auth.jwt import create_token_pair
+from app.database import SessionLocal, init_engine
+from app.main import app
+
+
+async def seed(args, tag: str) -> tuple[list, list]:
+    users = [
+        {"id": uuid.uuid4(), "email": f"trend-{tag}-{i}@example.com", "full_name": f"Student {i}",
+         "password": "-", "user_type": models.UserType.STUDENT}
+        for i in range(args.students)
+    ]
+    programs = [
+        {"id": uuid.uuid4(), "title": f"Trending {tag} {i}", "description": "-", "location": "Paris",
+         "application_link": "-", "field_of_study": "CS", "funding_type": "full", "funding_amount": 1000,
+         "duration": 12, "status": "open"}
+        for i in range(args.programs)
+    ]
+    async with SessionLocal() as db:
+        await db.execute(insert(models.User), users)
+        await db.execute(insert(models.Student), [{"id": uuid.uuid4(), "user_id": user["id"]} for user in users])
+        await db.execute(insert(models.Scholarship), programs)
+        await db.execute(insert(models.ScholarshipRatingSummary), [{"scholarship_id": p["id"]} for p in programs])
+        await db.commit()
+    return users, [program["id"] for program in programs]
+
+
+async def main(args) -> int:
+    logging.disable(logging.INFO)
+    engine = init_engine()
+    tag = uuid.uuid4().hex[:8]
+    rng = random.Random(args.seed)
+    users, program_ids = await seed(args, tag)
+    # Skewed popularity, so the ranking has a clear order.
+    popularity = [1 / (rank + 1) for rank in range(len(program_ids))]
+
+    marks, unmarks, latencies = [], [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for user in users:
+            headers = {"Authorization": f"Bearer {create_token_pair(schemas.User(**user)).access.token}"}
+            chosen = set(rng.choices(program_ids, popularity, k=args.marks))
+            for program_id in chosen:
+                for _ in range(2):
+                    started = time.perf_counter()
+                    response = await client.post(f"/Programs/mark-interest/{program_id}", headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.text
+                marks.append(program_id)
+            for program_id in list(chosen)[:args.unmark]:
+                response = await client.delete(f"/Programs/mark-interest/{program_id}", headers=headers)
+                assert response.status_code == 200, response.text
+                unmarks.append(program_id)
+
+        pending = trending.trending_programs.pending
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            await trending.trending_programs.flush(db)
+            flushed = time.perf_counter()
+            await trending.trending_programs.refresh(db, 24)
+            refreshed = time.perf_counter()
+        response = await client.get("/api/Programs/trending", params={"limit": trending.MAX_TRENDING})
+        ranked = {item["id"]: item["interests"] for item in response.json()["items"]}
+
+    expected = Counter(marks)
+    expected.subtract(unmarks)
+    async with SessionLocal() as db:
+        stored = dict((await db.execute(
+            select(models.StudentInterest.scholarship_id, func.count())
+            .filter(models.StudentInterest.scholarship_id.in_(program_ids))
+            .group_by(models.StudentInterest.scholarship_id)
+        )).all())
+        await db.execute(delete(models.ProgramInterestBucket).filter(models.ProgramInterestBucket.scholarship_id.in_(program_ids)))
+        await db.execute(delete(models.Scholarship).filter(models.Scholarship.id.in_(program_ids)))
+        await db.execute(delete(models.Student).filter(models.Student.user_id.in_([user["id"] for user in users])))
+        await db.execute(delete(models.User).filter(models.User.email.like(f"trend-{tag}-%")))
+        await db.commit()
+    await engine.dispose()
+
+    ours = {str(program_id): count for program_id, count in expected.items() if count > 0}
+    latencies.sort()
+    report = {
+        "mark_requests": len(latencies),
+        "mark_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "mark_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "pending_counts_before_flush": pending,
+        "flush_ms": round((flushed - started) * 1000, 2),
+        "refresh_ms": round((refreshed - flushed) * 1000, 2),
+        "interest_rows_match": {str(k): v for k, v in stored.items()} == ours,
+        "ranking_matches": {k: v for k, v in ranked.items() if k in ours} == ours,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["interest_rows_match"] and report["ranking_matches"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--programs", type=int, default=50)
+    parser.add_argument("--marks", type=int, default=5, help="programs sampled per student")
+    parser.add_argument("--unmark", type=int, default=1, help="marks each student removes again")
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,6 +1,6 @@
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import create_engine, make_url
 from sqlalchemy import pool
 
 from alembic import context
@@ -19,7 +19,14 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from app.database import Base  # Import your Base model
+from app import models  # noqa: F401  registers every table on Base.metadata
+from app.config import get_settings
 target_metadata = Base.metadata
+
+
+def database_url():
+    """DATABASE_URL from the app settings, with the async driver swapped for the default sync one."""
+    return make_url(get_settings().database_url).set(drivername="postgresql")
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -38,7 +45,7 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
+    url = database_url()
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -57,11 +64,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
         context.configure(
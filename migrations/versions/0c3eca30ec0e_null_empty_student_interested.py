@@ -0,0 +1,40 @@
+"""null empty student interested
+
+Revision ID: 0c3eca30ec0e
+Revises: 8db7cce06147
+Create Date: 2026-10-16 21:40:02.518214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c3eca30ec0e'
+down_revision: Union[str, None] = '8db7cce06147'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # students.interested is unique; an empty string may only appear once.
+    # A schema created by create_all after 6163b4fb1611 has no such column.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'students' AND column_name = 'interested'
+            ) THEN
+                UPDATE students SET interested = NULL WHERE interested = '';
+            END IF;
+        END $$
+        """
+    )
+
+
+def downgrade() -> None:
+    pass
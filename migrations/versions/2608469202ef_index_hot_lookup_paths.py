@@ -0,0 +1,49 @@
+"""index hot lookup paths
+
+Revision ID: 2608469202ef
+Revises: 94b2903b2f04
+Create Date: 2026-10-16 20:44:09.297267
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2608469202ef'
+down_revision: Union[str, None] = '94b2903b2f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) for every index backing a route lookup.
+INDEXES = [
+    ("ix_partners_user_id", "partners", ["user_id"]),
+    ("ix_students_user_id", "students", ["user_id"]),
+    ("ix_feedback_scholarship_id", "feedback", ["scholarship_id"]),
+    ("ix_tips_scholarship_id", "tips", ["scholarship_id"]),
+    ("ix_likes_feedback_id_student_id", "likes", ["feedback_id", "student_id"]),
+    ("ix_scholarships_location_created_at_id", "scholarships", ["location", "created_at", "id"]),
+    ("ix_scholarships_field_of_study_created_at_id", "scholarships", ["field_of_study", "created_at", "id"]),
+    ("ix_scholarships_funding_type_created_at_id", "scholarships", ["funding_type", "created_at", "id"]),
+    ("ix_country_requirements_country_lower", "country_requirements", [sa.text("lower(country)")]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
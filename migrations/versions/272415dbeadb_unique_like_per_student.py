@@ -0,0 +1,69 @@
+"""unique like per student
+
+Revision ID: 272415dbeadb
+Revises: 2608469202ef
+Create Date: 2026-10-16 20:45:43.833972
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '272415dbeadb'
+down_revision: Union[str, None] = '2608469202ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Likes lost to the old read-then-insert race may have left duplicates:
+    # keep one row per (feedback, student) and recount.
+    op.execute(
+        "DELETE FROM likes a USING likes b "
+        "WHERE a.feedback_id = b.feedback_id AND a.student_id = b.student_id "
+        "AND a.ctid > b.ctid"
+    )
+    op.execute(
+        "UPDATE feedback SET likes_count = "
+        "(SELECT count(*) FROM likes WHERE likes.feedback_id = feedback.id)"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_likes_feedback_id_student_id",
+            "likes",
+            ["feedback_id", "student_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+    op.execute(
+        "DO $$ BEGIN "
+        "IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_likes_feedback_id_student_id') THEN "
+        "ALTER TABLE likes ADD CONSTRAINT uq_likes_feedback_id_student_id "
+        "UNIQUE USING INDEX uq_likes_feedback_id_student_id; "
+        "END IF; END $$"
+    )
+    # The unique index covers every lookup the plain one served.
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_likes_feedback_id_student_id",
+            table_name="likes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_likes_feedback_id_student_id",
+            "likes",
+            ["feedback_id", "student_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+    op.drop_constraint("uq_likes_feedback_id_student_id", "likes", type_="unique")
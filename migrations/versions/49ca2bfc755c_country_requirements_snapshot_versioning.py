@@ -0,0 +1,77 @@
+"""country requirements snapshot versioning
+
+Revision ID: 49ca2bfc755c
+Revises: f8eb3ead5e69
+Create Date: 2026-10-16 21:04:43.807276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '49ca2bfc755c'
+down_revision: Union[str, None] = 'f8eb3ead5e69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UNIQUE_INDEX = "uq_country_requirements_country_document_type"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reference_data_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+
+    # Keep one row per (country, document type) before enforcing it.
+    op.execute(
+        """
+        DELETE FROM country_requirements AS older
+        USING country_requirements AS newer
+        WHERE lower(older.country) = lower(newer.country)
+          AND older.document_type = newer.document_type
+          AND older.id < newer.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            UNIQUE_INDEX,
+            "country_requirements",
+            [sa.text("lower(country)"), "document_type"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Superseded: the unique index leads with lower(country).
+        op.drop_index(
+            "ix_country_requirements_country_lower",
+            table_name="country_requirements",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_country_requirements_country_lower",
+            "country_requirements",
+            [sa.text("lower(country)")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            UNIQUE_INDEX,
+            table_name="country_requirements",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_table("reference_data_versions", if_exists=True)
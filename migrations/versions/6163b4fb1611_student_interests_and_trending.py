@@ -0,0 +1,82 @@
+"""student interests and trending buckets
+
+Revision ID: 6163b4fb1611
+Revises: ca925e6e167b
+Create Date: 2026-10-16 22:41:19.904517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6163b4fb1611'
+down_revision: Union[str, None] = 'ca925e6e167b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "student_interests",
+        sa.Column("student_id", sa.UUID(), sa.ForeignKey("students.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("scholarship_id", sa.UUID(), sa.ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_student_interests_scholarship_id", "student_interests", ["scholarship_id"], if_not_exists=True
+    )
+    op.create_table(
+        "program_interest_buckets",
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("scholarship_id", sa.UUID(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    # Carry over the single interest each student could hold, where it still
+    # names an existing program. A schema created by create_all from the
+    # current models never had the column.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'students' AND column_name = 'interested'
+            ) THEN
+                INSERT INTO student_interests (student_id, scholarship_id)
+                SELECT students.id, scholarships.id
+                FROM students JOIN scholarships ON scholarships.id::text = students.interested
+                ON CONFLICT DO NOTHING;
+            END IF;
+        END $$
+        """
+    )
+    op.execute("ALTER TABLE students DROP COLUMN IF EXISTS interested")
+
+
+def downgrade() -> None:
+    op.add_column("students", sa.Column("interested", sa.String(), nullable=True, unique=True))
+    # Only one interest fits the old column, and it is unique: keep the
+    # latest per student, and only the first student per program.
+    op.execute(
+        """
+        UPDATE students SET interested = picked.scholarship_id::text
+        FROM (
+            SELECT DISTINCT ON (scholarship_id) student_id, scholarship_id
+            FROM (
+                SELECT DISTINCT ON (student_id) student_id, scholarship_id, created_at
+                FROM student_interests ORDER BY student_id, created_at DESC
+            ) latest
+            ORDER BY scholarship_id, created_at
+        ) picked
+        WHERE students.id = picked.student_id
+        """
+    )
+    op.drop_table("program_interest_buckets", if_exists=True)
+    op.drop_table("student_interests", if_exists=True)
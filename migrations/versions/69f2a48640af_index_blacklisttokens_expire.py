@@ -0,0 +1,30 @@
+"""index blacklisttokens expire
+
+Revision ID: 69f2a48640af
+Revises: c007275cf78a
+Create Date: 2026-10-16 20:40:15.706148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '69f2a48640af'
+down_revision: Union[str, None] = 'c007275cf78a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the periodic purge of expired rows and the startup load.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blacklisttokens_expire "
+        "ON blacklisttokens (expire)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_blacklisttokens_expire", table_name="blacklisttokens")
@@ -0,0 +1,53 @@
+"""add jobs table
+
+Revision ID: 8db7cce06147
+Revises: 49ca2bfc755c
+Create Date: 2026-10-16 21:14:14.180802
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8db7cce06147'
+down_revision: Union[str, None] = '49ca2bfc755c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.UUID(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), unique=True),
+        sa.Column("run_at", sa.DateTime(), nullable=False, server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")),
+        sa.Column("locked_by", sa.String()),
+        sa.Column("locked_at", sa.DateTime()),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("result", postgresql.JSONB()),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")),
+        sa.Column("finished_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_jobs_due", "jobs", ["run_at"], postgresql_where=sa.text("status = 'queued'"), if_not_exists=True)
+    op.create_index("ix_jobs_leased", "jobs", ["locked_at"], postgresql_where=sa.text("status = 'running'"), if_not_exists=True)
+    op.create_index(
+        "ix_jobs_finished",
+        "jobs",
+        ["finished_at"],
+        postgresql_where=sa.text("status IN ('succeeded', 'failed')"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jobs", if_exists=True)
@@ -0,0 +1,37 @@
+"""add scholarships search_vector
+
+Revision ID: 94b2903b2f04
+Revises: 69f2a48640af
+Create Date: 2026-10-16 20:41:44.701735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94b2903b2f04'
+down_revision: Union[str, None] = '69f2a48640af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE scholarships ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scholarships_search_vector "
+        "ON scholarships USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scholarships_search_vector", table_name="scholarships")
+    op.drop_column("scholarships", "search_vector")
@@ -0,0 +1,36 @@
+"""program view counts and partner program index
+
+Revision ID: b71d0c94e2a3
+Revises: 6163b4fb1611
+Create Date: 2026-10-16 23:58:02.118346
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d0c94e2a3'
+down_revision: Union[str, None] = '6163b4fb1611'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "program_view_counts",
+        sa.Column("scholarship_id", sa.UUID(), primary_key=True),
+        sa.Column("views", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+        if_not_exists=True,
+    )
+    op.create_index("ix_scholarships_partner_id", "scholarships", ["partner_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scholarships_partner_id", table_name="scholarships", if_exists=True)
+    op.drop_table("program_view_counts", if_exists=True)
@@ -0,0 +1,38 @@
+"""add scholarships created_at keyset index
+
+Revision ID: c007275cf78a
+Revises: 
+Create Date: 2026-10-16 20:38:18.704195
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c007275cf78a'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables are still bootstrapped by ``Base.metadata.create_all`` on startup, so
+# this revision must also apply cleanly to a schema that already has the column.
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE scholarships ADD COLUMN IF NOT EXISTS created_at TIMESTAMP "
+        "NOT NULL DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scholarships_created_at_id "
+        "ON scholarships (created_at, id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scholarships_created_at_id", table_name="scholarships")
+    op.drop_column("scholarships", "created_at")
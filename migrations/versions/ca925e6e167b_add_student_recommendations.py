@@ -0,0 +1,35 @@
+"""add student recommendations
+
+Revision ID: ca925e6e167b
+Revises: 0c3eca30ec0e
+Create Date: 2026-10-16 22:05:47.310126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca925e6e167b'
+down_revision: Union[str, None] = '0c3eca30ec0e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The (student_id, rank) primary key serves each student's list as one range scan.
+    op.create_table(
+        "student_recommendations",
+        sa.Column("student_id", sa.UUID(), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("scholarship_id", sa.UUID(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False, server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("student_recommendations", if_exists=True)
@@ -0,0 +1,77 @@
+"""add scholarship rating summary
+
+Revision ID: e3e85b2d274c
+Revises: 272415dbeadb
+Create Date: 2026-10-16 20:57:17.740147
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3e85b2d274c'
+down_revision: Union[str, None] = '272415dbeadb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+STAR_COLUMNS = [f"stars_{stars}" for stars in range(1, 6)]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scholarship_rating_summary",
+        sa.Column(
+            "scholarship_id",
+            sa.UUID(),
+            sa.ForeignKey("scholarships.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in ["rating_count", "rating_sum", *STAR_COLUMNS]
+        ),
+        sa.Column(
+            "average_rating",
+            sa.Float(),
+            sa.Computed(
+                "CASE WHEN rating_count > 0 THEN rating_sum::float8 / rating_count ELSE 0 END",
+                persisted=True,
+            ),
+        ),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_scholarship_rating_summary_average_rating",
+        "scholarship_rating_summary",
+        ["average_rating", "scholarship_id"],
+        if_not_exists=True,
+    )
+
+    # Backfill (or repair) one row per program from existing reviews; same
+    # statement as ``python -m app.ratings``.
+    stars = ", ".join(STAR_COLUMNS)
+    star_counts = ", ".join(
+        f"count(f.id) FILTER (WHERE f.rating = {n})" for n in range(1, 6)
+    )
+    updates = ", ".join(
+        f"{name} = excluded.{name}" for name in ["rating_count", "rating_sum", *STAR_COLUMNS]
+    )
+    op.execute(
+        f"INSERT INTO scholarship_rating_summary (scholarship_id, rating_count, rating_sum, {stars}) "
+        f"SELECT s.id, count(f.id), coalesce(sum(f.rating), 0), {star_counts} "
+        "FROM scholarships s LEFT JOIN feedback f ON f.scholarship_id = s.id GROUP BY s.id "
+        f"ON CONFLICT (scholarship_id) DO UPDATE SET {updates}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_scholarship_rating_summary_average_rating",
+        table_name="scholarship_rating_summary",
+        if_exists=True,
+    )
+    op.drop_table("scholarship_rating_summary", if_exists=True)
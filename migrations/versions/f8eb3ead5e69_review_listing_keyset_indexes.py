@@ -0,0 +1,69 @@
+"""review listing keyset indexes
+
+Revision ID: f8eb3ead5e69
+Revises: e3e85b2d274c
+Create Date: 2026-10-16 20:59:16.460235
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8eb3ead5e69'
+down_revision: Union[str, None] = 'e3e85b2d274c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_feedback_scholarship_id_created_at_id", ["scholarship_id", "created_at", "id"]),
+    ("ix_feedback_scholarship_id_likes_count_id", ["scholarship_id", "likes_count", "id"]),
+]
+
+
+def upgrade() -> None:
+    # Keyset comparisons need non-null sort keys.
+    op.execute("UPDATE feedback SET created_at = TIMEZONE('utc', CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    op.execute("UPDATE feedback SET likes_count = 0 WHERE likes_count IS NULL")
+    op.alter_column(
+        "feedback",
+        "created_at",
+        nullable=False,
+        server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"),
+    )
+    op.alter_column("feedback", "likes_count", nullable=False, server_default="0")
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name, "feedback", columns, postgresql_concurrently=True, if_not_exists=True
+            )
+        # Superseded: both new indexes lead with scholarship_id.
+        op.drop_index(
+            "ix_feedback_scholarship_id",
+            table_name="feedback",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_feedback_scholarship_id",
+            "feedback",
+            ["scholarship_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name="feedback", postgresql_concurrently=True, if_exists=True
+            )
+
+    op.alter_column("feedback", "likes_count", nullable=True, server_default=None)
+    op.alter_column("feedback", "created_at", nullable=True, server_default=None)